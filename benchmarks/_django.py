@@ -0,0 +1,8 @@
+"""Bootstrap Django untuk skrip benchmark (jalankan dari root repo: ``python -m benchmarks.<nama>``)."""
+import os
+
+
+def setup():
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "warehouse.settings")
+    import django
+    django.setup()
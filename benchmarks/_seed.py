@@ -0,0 +1,66 @@
+"""Seeding data sintetis cepat lewat generate_series (Postgres, tanpa signal)."""
+from django.db import connection, transaction
+
+
+def seed_products(n, categories=50):
+    """Tambah ``n`` produk BENCH (sku ``B00000001``...). Return (min_id, max_id) produk BENCH."""
+    with transaction.atomic(), connection.cursor() as cur:
+        cur.execute("""
+            INSERT INTO inventory_category (name, is_active, created_at, updated_at)
+            SELECT 'BENCH-CAT-' || g, true, now(), now() FROM generate_series(1, %s) g
+            ON CONFLICT (name) DO NOTHING""", [categories])
+        cur.execute("""
+            INSERT INTO inventory_uom (name, created_at, updated_at) VALUES ('BENCH-PCS', now(), now())
+            ON CONFLICT (name) DO NOTHING""")
+        cur.execute("""
+            INSERT INTO inventory_product (sku, name, category_id, uom_id, min_stock, is_active, qty_on_hand, created_at, updated_at)
+            SELECT 'B' || lpad(g::text, 8, '0'),
+                   (ARRAY['Baut','Mur','Kabel','Pipa','Lampu','Saklar','Cat','Lem','Kuas','Obeng'])[1 + g %% 10]
+                     || ' ' || (ARRAY['Besi','Tembaga','PVC','Baja','Kuningan','Plastik'])[1 + (g / 10) %% 6]
+                     || ' ' || (g %% 997) || 'mm #' || g,
+                   (SELECT min(id) FROM inventory_category WHERE name LIKE 'BENCH-CAT-%%') + (g %% %s),
+                   (SELECT id FROM inventory_uom WHERE name = 'BENCH-PCS'),
+                   (random() * 50)::int, random() > 0.1, 0, now(), now()
+            FROM generate_series(1, %s) g
+            ON CONFLICT (sku) DO NOTHING""", [categories, n])
+        cur.execute("SELECT min(id), max(id) FROM inventory_product WHERE sku LIKE 'B%%'", [])
+        lo, hi = cur.fetchone()
+        cur.execute("ANALYZE inventory_product")
+    return lo, hi
+
+
+def seed_transactions(n, days, product_range):
+    """
+    Tambah ``n`` transaksi acak (skew: sebagian kecil produk dapat sebagian besar
+    baris) dalam ``days`` hari terakhir, lalu selaraskan qty_on_hand, saldo
+    berjalan ledger & rollup.
+    """
+    from datetime import timedelta
+
+    from django.utils import timezone
+    from inventory import partitions
+    from inventory.ledger import recompute
+    from inventory.rollup import rebuild
+    from inventory.services import sync_low_stock
+
+    lo, hi = product_range
+    partitions.ensure(since=timezone.now() - timedelta(days=days))
+    with transaction.atomic(), connection.cursor() as cur:
+        cur.execute("""
+            INSERT INTO inventory_transaction (product_id, trx_type, quantity, note, trx_date, created_at, updated_at)
+            SELECT %s + floor(power(random(), 3) * (%s - %s + 1))::bigint,
+                   CASE WHEN random() < 0.55 THEN 'IN' ELSE 'OUT' END,
+                   (1 + random() * 20)::numeric(12,2), '',
+                   now() - random() * make_interval(days => %s), now(), now()
+            FROM generate_series(1, %s)""", [lo, hi, lo, days, n])
+        cur.execute("""
+            UPDATE inventory_product p SET qty_on_hand = s.q
+                + COALESCE((SELECT quantity FROM inventory_openingbalance o WHERE o.product_id = p.id), 0) FROM (
+                SELECT product_id, sum(CASE WHEN trx_type = 'IN' THEN quantity ELSE -quantity END) q
+                FROM inventory_transaction GROUP BY product_id) s
+            WHERE p.id = s.product_id""")
+        sync_low_stock()
+        recompute()
+        cur.execute("ANALYZE inventory_product")
+        cur.execute("ANALYZE inventory_transaction")
+    rebuild()
@@ -0,0 +1,120 @@
+"""
+Benchmark export CSV ringkasan/detail: peak RSS & time-to-first-byte.
+
+    python -m benchmarks.csv_export --kind detail [--start 2020-01-01 --end 2025-12-31]
+
+Tiap varian jalan di subprocess terpisah (ru_maxrss per proses):
+``legacy`` = implementasi lama (StringIO + instance model + HttpResponse),
+``stream`` = StreamingHttpResponse + server-side cursor, ``stream-gz`` = sama + gzip.
+"""
+import argparse
+import csv
+import json
+import resource
+import subprocess
+import sys
+import time
+from io import StringIO
+
+from benchmarks._django import setup
+
+VARIANTS = ("legacy", "stream", "stream-gz")
+
+
+def _legacy_detail(trx_qs):
+    from django.http import HttpResponse
+    buf = StringIO()
+    w = csv.writer(buf)
+    w.writerow(["Tanggal", "SKU", "Produk", "Kategori", "Satuan", "Tipe", "Qty", "Catatan"])
+    for t in trx_qs.order_by("trx_date", "id"):
+        p = t.product
+        w.writerow([t.trx_date.strftime("%Y-%m-%d %H:%M:%S"), p.sku, p.name, str(p.category), str(p.uom),
+                    t.trx_type, t.quantity, t.note or ""])
+    return HttpResponse(buf.getvalue(), content_type="text/csv; charset=utf-8")
+
+
+def _legacy_summary(view):
+    from django.http import HttpResponse
+    from inventory.views_report import Product
+    from django.db.models import Q, F, Sum, Value, DecimalField
+    from django.db.models.functions import Coalesce
+    _, _, _, start_dt, end_dt, cat_id, prod_id = view._filtered_trx_qs()
+    base = Product.objects.all()
+    if cat_id:
+        base = base.filter(category_id=cat_id)
+    if prod_id:
+        base = base.filter(id=prod_id)
+    date_filter = Q()
+    if start_dt:
+        date_filter &= Q(transactions__trx_date__gte=start_dt)
+    if end_dt:
+        date_filter &= Q(transactions__trx_date__lt=end_dt)
+    dec = DecimalField(max_digits=12, decimal_places=2)
+    per_product = base.annotate(
+        in_qty=Coalesce(Sum("transactions__quantity", filter=Q(transactions__trx_type="IN") & date_filter), Value(0), output_field=dec),
+        out_qty=Coalesce(Sum("transactions__quantity", filter=Q(transactions__trx_type="OUT") & date_filter), Value(0), output_field=dec),
+    ).annotate(net=F("in_qty") - F("out_qty")).order_by("name")
+    buf = StringIO()
+    w = csv.writer(buf)
+    w.writerow(["SKU", "Nama", "Kategori", "Satuan", "Masuk", "Keluar", "Net", "On Hand", "Min"])
+    for p in per_product:
+        w.writerow([p.sku, p.name, str(p.category), str(p.uom), p.in_qty, p.out_qty, p.net, p.qty_on_hand, p.min_stock])
+    return HttpResponse(buf.getvalue(), content_type="text/csv; charset=utf-8")
+
+
+def run_one(variant, kind, query):
+    setup()
+    from django.contrib.auth.models import AnonymousUser
+    from django.test import RequestFactory
+    from inventory.views_report import InventorySummaryView
+
+    params = {**query, "export": "csv", "kind": kind}
+    if variant == "stream-gz":
+        params["gzip"] = "1"
+    request = RequestFactory().get("/inventory/summary/", params)
+    request.user = type("U", (AnonymousUser,), {"is_authenticated": True})()
+
+    t0 = time.perf_counter()
+    if variant == "legacy":
+        view = InventorySummaryView()
+        view.setup(request)
+        resp = _legacy_detail(view._filtered_trx_qs()[0]) if kind == "detail" else _legacy_summary(view)
+    else:
+        resp = InventorySummaryView.as_view()(request)
+
+    ttfb, size = None, 0
+    chunks = resp.streaming_content if resp.streaming else [resp.content]
+    for chunk in chunks:
+        if ttfb is None:
+            ttfb = time.perf_counter() - t0
+        size += len(chunk)
+    total = time.perf_counter() - t0
+    maxrss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return {"variant": variant, "kind": kind, "ttfb_s": round(ttfb or total, 4), "total_s": round(total, 4),
+            "bytes": size, "peak_rss_mb": round(maxrss_kb / 1024, 1)}
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--kind", choices=["summary", "detail"], default="detail")
+    ap.add_argument("--start")
+    ap.add_argument("--end")
+    ap.add_argument("--variant", choices=VARIANTS, help=argparse.SUPPRESS)
+    args = ap.parse_args()
+    query = {k: v for k, v in (("start", args.start), ("end", args.end)) if v}
+
+    if args.variant:
+        print(json.dumps(run_one(args.variant, args.kind, query)))
+        return
+
+    print(f"{'variant':<10} {'ttfb_s':>8} {'total_s':>8} {'MB out':>8} {'peak RSS MB':>12}")
+    for variant in VARIANTS:
+        cmd = [sys.executable, "-m", "benchmarks.csv_export", "--variant", variant, "--kind", args.kind]
+        for k, v in query.items():
+            cmd += [f"--{k}", v]
+        r = json.loads(subprocess.run(cmd, check=True, capture_output=True, text=True).stdout.strip().splitlines()[-1])
+        print(f"{variant:<10} {r['ttfb_s']:>8} {r['total_s']:>8} {r['bytes'] / 1e6:>8.1f} {r['peak_rss_mb']:>12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Benchmark autocomplete produk (pg_trgm) atas katalog besar.
+
+    python -m benchmarks.product_search --seed 1000000 --runs 200
+
+Mengukur latensi ``search.autocomplete`` (top-N) dan list ``ProductList``-style
+filter icontains untuk campuran query: SKU persis, prefix SKU, potongan nama,
+dan nama salah ketik. Laporan p50/p95/max per jenis query.
+"""
+import argparse
+import random
+import statistics
+import time
+
+from benchmarks._django import setup
+
+
+def percentile(xs, p):
+    xs = sorted(xs)
+    return xs[min(len(xs) - 1, int(round(p / 100 * (len(xs) - 1))))]
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--seed", type=int, default=0, help="tambah N produk BENCH sebelum benchmark")
+    ap.add_argument("--runs", type=int, default=200)
+    ap.add_argument("--limit", type=int, default=10)
+    args = ap.parse_args()
+
+    setup()
+    from inventory.models import Product
+    from inventory.search import autocomplete, filter_products
+
+    if args.seed:
+        from benchmarks._seed import seed_products
+        seed_products(args.seed)
+
+    total = Product.objects.count()
+    skus = list(Product.objects.order_by("?").values_list("sku", "name")[:500])
+    rnd = random.Random(42)
+
+    def typo(s):
+        i = rnd.randrange(len(s))
+        return s[:i] + s[i + 1:]
+
+    kinds = {
+        "sku_exact": lambda: rnd.choice(skus)[0],
+        "sku_prefix": lambda: rnd.choice(skus)[0][:5],
+        "name_fragment": lambda: rnd.choice(skus)[1].split()[1],
+        "name_typo": lambda: typo(" ".join(rnd.choice(skus)[1].split()[:2])),
+    }
+    print(f"katalog: {total} produk, {args.runs} run per jenis")
+    print(f"{'query':<15} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8} {'list p50':>9}")
+    for name, gen in kinds.items():
+        ac, lst = [], []
+        for _ in range(args.runs):
+            q = gen()
+            t0 = time.perf_counter()
+            autocomplete(q, limit=args.limit)
+            ac.append((time.perf_counter() - t0) * 1000)
+            t0 = time.perf_counter()
+            list(filter_products(Product.objects.all(), q).values_list("id", flat=True)[:20])
+            lst.append((time.perf_counter() - t0) * 1000)
+        print(f"{name:<15} {statistics.median(ac):>8.2f} {percentile(ac, 95):>8.2f} {max(ac):>8.2f} "
+              f"{statistics.median(lst):>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+EXPLAIN ANALYZE query laporan & list, sebelum vs sesudah index 0003 (+0005).
+
+    python -m benchmarks.query_plans --seed --products 50000 --transactions 5000000
+    python -m benchmarks.query_plans            # pakai data yang sudah ada
+
+``--seed`` mengisi data sintetis lewat ``generate_series`` (cepat, tanpa signal),
+lalu menyelaraskan ``qty_on_hand`` dan rollup. "Sebelum" diukur dengan index
+``NEW_INDEXES`` di-DROP di dalam transaksi yang kemudian di-ROLLBACK (DDL Postgres
+transaksional), jadi skema tidak berubah. Hanya untuk Postgres.
+"""
+import argparse
+import json
+import re
+from datetime import timedelta
+
+from benchmarks._django import setup
+
+NEW_INDEXES = ("product_low_stock_idx", "product_low_since_idx", "product_category_name_idx", "trx_product_date_idx",
+               "trx_product_date_id_idx", "trx_date_id_idx")
+
+
+def seed(products, transactions, days):
+    from benchmarks._seed import seed_products, seed_transactions
+    seed_transactions(transactions, days, seed_products(products))
+
+
+def queries():
+    """(nama, queryset) untuk query panas di views_report / views_master."""
+    from django.db.models import Sum
+    from django.utils import timezone
+    from inventory.models import Product, Transaction
+
+    now = timezone.now()
+    start, end = now - timedelta(days=30), now
+    cat_id = Product.objects.order_by("category_id").values_list("category_id", flat=True).first()
+    prod_id = Transaction.objects.order_by().values_list("product_id", flat=True).first()
+    rng = Transaction.objects.filter(trx_date__gte=start, trx_date__lt=end)
+    return [
+        ("report_kpi_range", rng.order_by().values("trx_type").annotate(s=Sum("quantity"))),
+        ("report_detail_range_cat", rng.filter(product__category_id=cat_id).order_by("trx_date", "id")[:1000]),
+        ("report_detail_product", rng.filter(product_id=prod_id).order_by("trx_date", "id")),
+        ("transaction_list_page", Transaction.objects.select_related("product")[:50]),
+        ("product_low_active_count", Product.objects.filter(low_since__isnull=False, is_active=True).order_by()),
+        ("product_list_low", Product.objects.filter(low_since__isnull=False)[:20]),
+        ("product_low_recent", Product.objects.filter(low_since__isnull=False, is_active=True).order_by("-low_since")[:20]),
+        ("product_list_category", Product.objects.filter(category_id=cat_id)[:20]),
+    ]
+
+
+def explain(qs):
+    plan = qs.explain(analyze=True, buffers=True)
+    m = re.search(r"Execution Time: ([\d.]+) ms", plan)
+    return float(m.group(1)) if m else None, plan
+
+
+def run(drop_new, repeat):
+    from django.db import connection, transaction
+
+    out = {}
+    with transaction.atomic():
+        if drop_new:
+            with connection.cursor() as cur:
+                for name in NEW_INDEXES:
+                    cur.execute(f'DROP INDEX IF EXISTS "{name}"')
+        for name, qs in queries():
+            times, plan = [], ""
+            for _ in range(repeat):
+                t, plan = explain(qs)
+                times.append(t)
+            out[name] = {"ms": min(times), "plan": plan}
+        transaction.set_rollback(True)
+    return out
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--seed", action="store_true")
+    ap.add_argument("--products", type=int, default=50_000)
+    ap.add_argument("--transactions", type=int, default=5_000_000)
+    ap.add_argument("--days", type=int, default=730)
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--json", help="tulis hasil lengkap (termasuk plan) ke file ini")
+    args = ap.parse_args()
+
+    setup()
+    if args.seed:
+        seed(args.products, args.transactions, args.days)
+
+    before = run(drop_new=True, repeat=args.repeat)
+    after = run(drop_new=False, repeat=args.repeat)
+    print(f"{'query':<28} {'before ms':>10} {'after ms':>10} {'speedup':>8}")
+    for name in after:
+        b, a = before[name]["ms"], after[name]["ms"]
+        print(f"{name:<28} {b:>10.2f} {a:>10.2f} {b / a if a else float('inf'):>7.1f}x")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"before": before, "after": after}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
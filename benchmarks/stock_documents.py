@@ -0,0 +1,83 @@
+"""
+Benchmark posting dokumen multi-baris vs posting baris satu per satu.
+
+    python -m benchmarks.stock_documents --lines 200 --products 50 --repeat 5
+
+Satu-per-satu = ``Transaction.save()`` per baris (jalur signal yang sama dengan
+``TransactionCreate``: lock baris, UPDATE stok, rollup, ledger per baris).
+Dokumen = ``documents.post_document``: satu lock produk, bulk insert, satu
+UPDATE stok per produk. Dicetak baris/detik dan query per baris; setelah tiap
+putaran baris dihapus lagi (lewat signal, jadi stok kembali). Butuh Postgres,
+jangan di database produksi.
+"""
+import argparse
+import random
+import statistics
+import time
+from decimal import Decimal
+
+from benchmarks._django import setup
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--lines", type=int, default=200, help="baris per dokumen")
+    ap.add_argument("--products", type=int, default=50, help="jumlah produk berbeda yang dipakai")
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--seed", type=int, default=1)
+    args = ap.parse_args()
+
+    setup()
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+    from inventory.documents import post_document
+    from inventory.models import Product, StockDocument, Transaction
+
+    rnd = random.Random(args.seed)
+    pids = list(Product.objects.order_by("pk").values_list("pk", flat=True)[:args.products])
+    if not pids:
+        raise SystemExit("Belum ada produk; jalankan generate_data dulu.")
+    on_hand_before = dict(Product.objects.filter(pk__in=pids).values_list("pk", "qty_on_hand"))
+
+    def make_lines():
+        return [{"product_id": rnd.choice(pids), "quantity": Decimal(rnd.randint(1, 20)), "note": "BENCH-DOC"}
+                for _ in range(args.lines)]
+
+    def one_by_one(lines):
+        for r in lines:
+            Transaction(product_id=r["product_id"], trx_type=Transaction.IN,
+                        quantity=r["quantity"], note=r["note"]).save()
+
+    def as_document(lines):
+        post_document(Transaction.IN, lines, note="BENCH-DOC")
+
+    results = {}
+    for name, fn in (("one_by_one", one_by_one), ("document", as_document)):
+        times, queries = [], []
+        for _ in range(args.repeat):
+            lines = make_lines()
+            connection.queries_log.clear()
+            with CaptureQueriesContext(connection) as ctx:
+                t0 = time.perf_counter()
+                fn(lines)
+                times.append(time.perf_counter() - t0)
+            queries.append(len(ctx.captured_queries))
+            # bersihkan lewat signal -> stok, rollup & ledger kembali
+            for trx in Transaction.objects.filter(note="BENCH-DOC"):
+                trx.delete()
+            StockDocument.objects.filter(note="BENCH-DOC").delete()
+        p50 = statistics.median(times)
+        results[name] = {"p50_ms": p50 * 1000, "lines_per_s": args.lines / p50,
+                         "queries_per_line": statistics.fmean(queries) / args.lines}
+        print(f"{name:<12} p50={p50 * 1000:>9.1f}ms  {args.lines / p50:>9.1f} baris/s  "
+              f"{results[name]['queries_per_line']:.2f} query/baris")
+    print(f"speedup dokumen: {results['one_by_one']['p50_ms'] / results['document']['p50_ms']:.1f}x")
+
+    drift = {pk: q for pk, q in Product.objects.filter(pk__in=pids).values_list("pk", "qty_on_hand")
+             if q != on_hand_before[pk]}
+    if drift:
+        raise SystemExit(f"FAIL: qty_on_hand berubah setelah cleanup: {drift}")
+
+
+if __name__ == "__main__":
+    main()
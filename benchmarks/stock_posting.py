@@ -0,0 +1,102 @@
+"""
+Benchmark throughput posting stok: banyak writer paralel ke SATU produk.
+
+    python -m benchmarks.stock_posting --writers 16 --posts 200 --shards 0,8
+
+Tiap thread punya koneksi DB sendiri. Dijalankan sekali per nilai ``--shards``
+(0 = counter biasa, N = counter bergaris N garis, lihat ``inventory.shards``).
+Setelah selesai produk di-fold, lalu stok tepat (qty_on_hand + garis) dan saldo
+ledger baris terakhir dicek terhadap jumlah ledger — selisih berarti ada lost
+update. Butuh Postgres (SQLite mengunci seluruh file).
+"""
+import argparse
+import random
+import threading
+import time
+from decimal import Decimal
+
+from benchmarks._django import setup
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--writers", type=int, default=16)
+    ap.add_argument("--posts", type=int, default=200, help="jumlah posting per writer")
+    ap.add_argument("--out-ratio", type=float, default=0.4)
+    ap.add_argument("--shards", default="0,8", help="daftar jumlah garis yang diukur, 0 = counter biasa")
+    args = ap.parse_args()
+    modes = [int(n) for n in args.shards.split(",")]
+
+    setup()
+    from django.core.exceptions import ValidationError
+    from django.db import connection
+    from django.db.models import Sum, Q
+    from inventory import ledger as ledger_mod, shards
+    from inventory.models import Category, UoM, Product, Transaction
+
+    cat, _ = Category.objects.get_or_create(name="BENCH")
+    uom, _ = UoM.objects.get_or_create(name="BENCH")
+    prod, _ = Product.objects.get_or_create(
+        sku="BENCH-HOT", defaults={"name": "Bench hot SKU", "category": cat, "uom": uom})
+
+    def run(n_shards):
+        shards.disable(prod.pk)
+        Transaction.objects.filter(product=prod).delete()
+        # saldo awal arsip (jika produk bench pernah ikut archive_transactions) tetap dihitung
+        opening = ledger_mod.opening(prod.pk)
+        Product.objects.filter(pk=prod.pk).update(qty_on_hand=opening)
+        if n_shards:
+            shards.enable(prod.pk, n_shards)
+
+        ok = [0] * args.writers
+        rejected = [0] * args.writers
+
+        def writer(i):
+            rnd = random.Random(i)
+            try:
+                for _ in range(args.posts):
+                    t_type = Transaction.OUT if rnd.random() < args.out_ratio else Transaction.IN
+                    trx = Transaction(product_id=prod.pk, trx_type=t_type, quantity=Decimal(rnd.randint(1, 5)))
+                    try:
+                        trx.save()
+                        ok[i] += 1
+                    except ValidationError:
+                        rejected[i] += 1
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=writer, args=(i,)) for i in range(args.writers)]
+        t0 = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        elapsed = time.perf_counter() - t0
+        shards.fold(prod.pk)
+
+        agg = Transaction.objects.filter(product=prod).aggregate(
+            i=Sum("quantity", filter=Q(trx_type="IN")), o=Sum("quantity", filter=Q(trx_type="OUT")))
+        ledger = opening + (agg["i"] or 0) - (agg["o"] or 0)
+        on_hand = shards.annotate_on_hand(Product.objects.filter(pk=prod.pk)).values_list("on_hand", flat=True).get()
+        last = (Transaction.objects.filter(product=prod).order_by("-trx_date", "-id")
+                .values_list("balance_after", flat=True).first())
+        pending = Transaction.objects.filter(product=prod, balance_after__isnull=True).count()
+
+        total = sum(ok)
+        print(f"shards={n_shards} writers={args.writers} posted={total} rejected={sum(rejected)} "
+              f"elapsed={elapsed:.2f}s throughput={total / elapsed:.1f} posts/s")
+        print(f"  on_hand={on_hand} ledger={ledger} drift={on_hand - ledger} "
+              f"balance_after={last} pending={pending}")
+        if on_hand != ledger or on_hand < 0 or (total and (last != ledger or pending)):
+            raise SystemExit("FAIL: stok tidak konsisten dengan ledger")
+        return total / elapsed
+
+    results = {n: run(n) for n in modes}
+    shards.disable(prod.pk)
+    base = results[modes[0]]
+    for n in modes[1:]:
+        print(f"shards={n} vs shards={modes[0]}: {results[n] / base:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,239 @@
+"""
+Benchmark end-to-end jalur panas aplikasi inventory, hasil ke JSON.
+
+    python manage.py generate_data --products 5000 --transactions 200000
+    python -m benchmarks.suite --out bench-$(git rev-parse --short HEAD).json
+    python -m benchmarks.suite --compare bench-abc123.json
+
+Request dijalankan lewat ``django.test.Client`` (middleware, view, template
+lengkap) dengan user ``bench`` yang sudah login. Tiap kasus: ``--warmup`` kali
+dibuang, lalu ``--repeat`` kali diukur; dicatat min/p50/p95/mean (ms) dan jumlah
+query. Kasus tulis (create/update/delete) memakai ``Transaction.save()/delete()``
+sehingga melewati signal, posting stok, ledger dan rollup. Jalankan di Postgres
+lokal — jangan di database produksi (kasus tulis membuat lalu menghapus baris).
+"""
+import argparse
+import json
+import platform
+import random
+import statistics
+import subprocess
+import time
+from datetime import timedelta
+from decimal import Decimal
+
+from benchmarks._django import setup
+
+
+def _stats(times, queries):
+    times = sorted(times)
+    return {
+        "n": len(times),
+        "min_ms": round(times[0], 3),
+        "p50_ms": round(statistics.median(times), 3),
+        "p95_ms": round(times[min(len(times) - 1, int(len(times) * 0.95))], 3),
+        "mean_ms": round(statistics.fmean(times), 3),
+        "queries": queries,
+    }
+
+
+def _timed(fn, repeat, warmup):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    for _ in range(warmup):
+        fn()
+    times = []
+    with CaptureQueriesContext(connection) as ctx:
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            fn()
+            times.append((time.perf_counter() - t0) * 1000)
+        queries = round(len(ctx.captured_queries) / repeat, 1) if repeat else 0
+    return _stats(times, queries)
+
+
+def _get(client, url, params=None):
+    def run():
+        resp = client.get(url, params or {})
+        assert resp.status_code == 200, f"{url} {params} -> {resp.status_code}"
+        if resp.streaming:
+            for _ in resp.streaming_content:
+                pass
+        else:
+            resp.content  # noqa: B018
+    return run
+
+
+def read_cases(client):
+    """(nama, fungsi) untuk endpoint baca; parameter diambil dari data yang ada."""
+    from django.db.models import Count
+    from django.urls import reverse
+    from django.utils import timezone
+    from inventory.models import Product, Transaction
+    from inventory.views_master import TransactionList
+
+    summary = reverse("inventory:summary")
+    products = reverse("inventory:product-list")
+    trx = reverse("inventory:transaction-list")
+
+    now = timezone.localtime()
+    d30 = (now - timedelta(days=30)).strftime("%Y-%m-%d")
+    d365 = (now - timedelta(days=365)).strftime("%Y-%m-%d")
+    today = now.strftime("%Y-%m-%d")
+    mid = (now - timedelta(days=10)).strftime("%Y-%m-%dT%H:%M")
+    cat = Product.objects.order_by("category_id").values_list("category_id", flat=True).first() or ""
+    # produk paling ramai = kasus terburuk filter per produk
+    hot = (Transaction.objects.order_by().values("product_id").annotate(n=Count("id"))
+           .order_by("-n").values_list("product_id", flat=True).first()) or ""
+    word = (Product.objects.values_list("name", flat=True).first() or "a").split()[0]
+
+    # halaman ke-20 TransactionList: cursor dari baris terakhir halaman 19
+    view = TransactionList()
+    pos = view.paginate_by * 19
+    rows = list(view._ordered(Transaction.objects.all(), True)[pos - 1:pos])
+    deep = {"after": view._encode(rows[0])} if rows else {}
+
+    return [
+        ("summary_default", _get(client, summary)),
+        ("summary_30d", _get(client, summary, {"start": d30, "end": today})),
+        ("summary_365d", _get(client, summary, {"start": d365, "end": today})),
+        ("summary_30d_partial_days", _get(client, summary, {"start": d30 + "T09:30", "end": mid})),
+        ("summary_30d_category", _get(client, summary, {"start": d30, "end": today, "cat": cat})),
+        ("summary_365d_hot_product", _get(client, summary, {"start": d365, "end": today, "prod": hot})),
+        ("export_summary_csv_365d", _get(client, summary, {"export": "csv", "kind": "summary",
+                                                           "start": d365, "end": today})),
+        ("export_detail_csv_30d", _get(client, summary, {"export": "csv", "kind": "detail",
+                                                         "start": d30, "end": today})),
+        ("export_detail_csv_30d_gzip", _get(client, summary, {"export": "csv", "kind": "detail",
+                                                              "start": d30, "end": today, "gzip": "1"})),
+        ("product_list", _get(client, products)),
+        ("product_list_search", _get(client, products, {"q": word})),
+        ("product_list_search_sku", _get(client, products, {"q": "GEN-00001"})),
+        ("product_list_category", _get(client, products, {"cat": cat})),
+        ("product_list_low_active", _get(client, products, {"low": "1", "active": "1"})),
+        ("transaction_list", _get(client, trx)),
+        ("transaction_list_page20", _get(client, trx, deep)),
+    ]
+
+
+def write_cases(n, seed):
+    """Throughput create/update/delete lewat signal path; baris yang dibuat dihapus lagi."""
+    from django.core.exceptions import ValidationError
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+    from django.utils import timezone
+    from inventory.models import Product, Transaction
+
+    rnd = random.Random(seed)
+    pids = list(Product.objects.order_by("pk").values_list("pk", flat=True)[:500])
+    if not pids:
+        return {}
+    now = timezone.now()
+    out, created = {}, []
+
+    def run(name, items, op):
+        times, rejected = [], 0
+        with CaptureQueriesContext(connection) as ctx:
+            for item in items:
+                t0 = time.perf_counter()
+                try:
+                    op(item)
+                except ValidationError:
+                    rejected += 1
+                times.append((time.perf_counter() - t0) * 1000)
+        res = _stats(times, round(len(ctx.captured_queries) / max(len(items), 1), 1))
+        res["ops_per_s"] = round(len(items) / (sum(times) / 1000), 1) if times else 0
+        res["rejected"] = rejected
+        out[name] = res
+
+    def create(i):
+        # ~20% back-dated supaya shift saldo ledger ikut teruji
+        back = timedelta(days=rnd.randint(1, 90)) if i % 5 == 0 else timedelta(0)
+        trx = Transaction(product_id=rnd.choice(pids), trx_type=Transaction.IN,
+                          quantity=Decimal(rnd.randint(1, 20)), trx_date=now - back, note="BENCH")
+        trx.save()
+        created.append(trx)
+
+    def update(trx):
+        trx.quantity += 1
+        trx.save()
+
+    run("trx_create", range(n), create)
+    run("trx_update", list(created), update)
+    run("trx_delete", list(created), lambda trx: trx.delete())
+    return out
+
+
+def git_rev():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(base, cur):
+    print(f"{'kasus':<30} {'base p50':>10} {'now p50':>10} {'rasio':>7}")
+    for name, res in cur.items():
+        old = base.get(name)
+        if not old:
+            print(f"{name:<30} {'-':>10} {res['p50_ms']:>10.2f}")
+            continue
+        ratio = res["p50_ms"] / old["p50_ms"] if old["p50_ms"] else float("inf")
+        print(f"{name:<30} {old['p50_ms']:>10.2f} {res['p50_ms']:>10.2f} {ratio:>6.2f}x")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--repeat", type=int, default=10)
+    ap.add_argument("--warmup", type=int, default=2)
+    ap.add_argument("--writes", type=int, default=200, help="jumlah create/update/delete")
+    ap.add_argument("--only", help="hanya kasus yang namanya mengandung teks ini")
+    ap.add_argument("--skip-writes", action="store_true")
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--out", help="tulis hasil JSON ke file ini")
+    ap.add_argument("--compare", help="file JSON run sebelumnya untuk dibandingkan")
+    args = ap.parse_args()
+
+    setup()
+    from django.contrib.auth import get_user_model
+    from django.db import connection
+    from django.test import Client
+    from inventory.models import Category, Product, Transaction, UoM
+
+    user, _ = get_user_model().objects.get_or_create(username="bench", defaults={"is_staff": True})
+    client = Client()
+    client.force_login(user)
+
+    results = {}
+    for name, fn in read_cases(client):
+        if args.only and args.only not in name:
+            continue
+        results[name] = _timed(fn, args.repeat, args.warmup)
+        print(f"{name:<30} p50={results[name]['p50_ms']:>9.2f}ms  q={results[name]['queries']}")
+    if not args.skip_writes and (not args.only or "trx_" in args.only):
+        for name, res in write_cases(args.writes, args.seed).items():
+            results[name] = res
+            print(f"{name:<30} p50={res['p50_ms']:>9.2f}ms  {res['ops_per_s']} ops/s")
+
+    report = {
+        "meta": {
+            "git_rev": git_rev(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "db_vendor": connection.vendor,
+            "repeat": args.repeat,
+            "rows": {m.__name__: m.objects.count() for m in (Category, UoM, Product, Transaction)},
+        },
+        "results": results,
+    }
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            compare(json.load(f)["results"], results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Ringkasan stok: view sync (query berurutan) vs view async (query bersamaan).
+
+    python -m benchmarks.summary_async --repeat 10 --start 2025-10-01 --end 2026-10-01
+
+Sync diukur lewat handler WSGI (``Client``), async lewat handler ASGI
+(``AsyncClient``), keduanya in-process dengan user ``bench`` yang sudah login.
+Juga dicetak durasi tiap bagian ``summary_parts`` sendiri-sendiri dan durasi
+semuanya lewat ``run_concurrently``: targetnya mendekati bagian terlambat, bukan
+jumlah semuanya. Selisih view HTML juga dipengaruhi render template (sama di
+kedua versi). Butuh Postgres.
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+from benchmarks._django import setup
+
+
+def _p50(times):
+    return statistics.median(times) * 1000
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--repeat", type=int, default=10)
+    ap.add_argument("--start", default="")
+    ap.add_argument("--end", default="")
+    ap.add_argument("--cat", default="")
+    ap.add_argument("--json", help="tulis hasil ke file ini")
+    args = ap.parse_args()
+
+    setup()
+    from django.contrib.auth import get_user_model
+    from django.test import AsyncClient, Client
+    from django.urls import reverse
+    from inventory.views_async import run_concurrently
+    from inventory.views_report import SummaryFilterMixin, summary_parts
+
+    params = {k: v for k, v in (("start", args.start), ("end", args.end), ("cat", args.cat)) if v}
+    user, _ = get_user_model().objects.get_or_create(username="bench", defaults={"is_staff": True})
+
+    # durasi tiap bagian, berurutan
+    class _Req:
+        GET = params
+    flt = SummaryFilterMixin()
+    flt.request = _Req()
+    _, _, _, start_dt, end_dt, cat_id, prod_id = flt._filtered_trx_qs()
+    parts = {}
+    for name, run in summary_parts(start_dt, end_dt, cat_id, prod_id).items():
+        times = []
+        for _ in range(args.repeat):
+            t0 = time.perf_counter()
+            run()
+            times.append(time.perf_counter() - t0)
+        parts[name] = round(_p50(times), 2)
+
+    client = Client()
+    client.force_login(user)
+    sync_times = []
+    for _ in range(args.repeat + 1):
+        t0 = time.perf_counter()
+        assert client.get(reverse("inventory:summary"), params).status_code == 200
+        sync_times.append(time.perf_counter() - t0)
+
+    async def run_async():
+        aclient = AsyncClient()
+        await aclient.aforce_login(user)
+        times = {"view": [], "api": [], "parts": []}
+        for _ in range(args.repeat + 1):
+            for key, url in (("view", "inventory:summary-async"), ("api", "inventory:summary-api")):
+                t0 = time.perf_counter()
+                resp = await aclient.get(reverse(url), params)
+                assert resp.status_code == 200, resp.status_code
+                times[key].append(time.perf_counter() - t0)
+            t0 = time.perf_counter()
+            await run_concurrently(summary_parts(start_dt, end_dt, cat_id, prod_id))
+            times["parts"].append(time.perf_counter() - t0)
+        return times
+    async_times = asyncio.run(run_async())
+
+    out = {
+        "params": params,
+        "parts_ms": parts,
+        "parts_sum_ms": round(sum(parts.values()), 2),
+        "parts_max_ms": max(parts.values()),
+        # run pertama = pemanasan (template cache, koneksi)
+        "sync_p50_ms": round(_p50(sync_times[1:]), 2),
+        "async_p50_ms": round(_p50(async_times["view"][1:]), 2),
+        "async_api_p50_ms": round(_p50(async_times["api"][1:]), 2),
+        # query saja, tanpa render: langsung sebanding dengan parts_sum_ms / parts_max_ms
+        "async_parts_p50_ms": round(_p50(async_times["parts"][1:]), 2),
+    }
+    for name, ms in parts.items():
+        print(f"  {name:<16} {ms:>9.2f} ms")
+    print(f"sum parts={out['parts_sum_ms']:.2f}ms  max part={out['parts_max_ms']:.2f}ms  "
+          f"concurrent parts={out['async_parts_p50_ms']:.2f}ms")
+    print(f"sync view p50={out['sync_p50_ms']:.2f}ms  async view p50={out['async_p50_ms']:.2f}ms  "
+          f"speedup={out['sync_p50_ms'] / out['async_p50_ms']:.2f}x  json api p50={out['async_api_p50_ms']:.2f}ms")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(out, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
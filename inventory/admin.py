@@ -1,20 +1,71 @@
+from datetime import datetime
+
 from django.contrib import admin
+from django.contrib.admin.options import IncorrectLookupParameters
+from django.utils import timezone
+from unfold.admin import ModelAdmin
+from unfold.contrib.filters.admin import AutocompleteSelectFilter, DropdownFilter, RangeDateTimeFilter
+
+from . import partitions, services, shards
 from .models import Category, UoM, Product, Transaction
+from .pagination import EstimatedCountPaginator
+
+
+class LargeTableAdmin(ModelAdmin):
+    """Changelist tabel besar: total dari estimasi planner, tanpa COUNT(*) kedua & facet."""
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    show_facets = admin.ShowFacets.NEVER
+    list_filter_submit = True
+
+
+class TrxMonthFilter(DropdownFilter):
+    """Drilldown per bulan dari daftar partisi (katalog), bukan SELECT DISTINCT tanggal atas seluruh tabel."""
+    title, parameter_name = 'bulan', 'month'
+
+    def lookups(self, request, model_admin):
+        now = timezone.now()
+        return [(f"{lo:%Y-%m}", f"{lo:%b %Y}") for _, lo, _ in reversed(partitions.partitions()) if lo <= now]
+
+    def queryset(self, request, queryset):
+        if not self.value():
+            return queryset
+        try:
+            month = partitions.month_start(datetime.strptime(self.value(), "%Y-%m"))
+        except ValueError:
+            raise IncorrectLookupParameters(self.value())
+        # rentang satu bulan = tepat satu partisi
+        return queryset.filter(trx_date__gte=month, trx_date__lt=partitions.add_months(month, 1))
+
 
 @admin.register(Category)
-class CategoryAdmin(admin.ModelAdmin):
+class CategoryAdmin(ModelAdmin):
     list_display=('name','is_active','created_at')
     list_filter=('is_active',)
+    search_fields=('name',)
 @admin.register(UoM)
-class UoMAdmin(admin.ModelAdmin):
+class UoMAdmin(ModelAdmin):
     list_display=('name','created_at')
+    search_fields=('name',)
 @admin.register(Product)
-class ProductAdmin(admin.ModelAdmin):
-    list_display=('sku','name','category','uom','qty_on_hand','min_stock','is_active')
+class ProductAdmin(LargeTableAdmin):
+    list_display=('sku','name','category','uom','on_hand','min_stock','is_active')
     search_fields=('sku','name')
-    list_filter=('category','is_active')
+    list_filter=(('category',AutocompleteSelectFilter),'is_active')
+    list_select_related=('category','uom')
+    autocomplete_fields=('category','uom')
+    # stok hanya berubah lewat transaksi (services.apply_deltas), bukan diketik di form
+    readonly_fields=('qty_on_hand','shard_count','low_since')
+    def get_queryset(self, request):
+        return shards.annotate_on_hand(super().get_queryset(request))
+    def save_model(self, request, obj, form, change):
+        services.save_product(obj, form.changed_data)
+    @admin.display(description='Stok', ordering='on_hand')
+    def on_hand(self, obj): return obj.on_hand
 @admin.register(Transaction)
-class TransactionAdmin(admin.ModelAdmin):
+class TransactionAdmin(LargeTableAdmin):
     list_display=('trx_date','product','trx_type','quantity','note')
-    list_filter=('trx_type','product')
-    date_hierarchy='trx_date'
+    # produk: autocomplete (bukan ribuan link); tanggal: bulan (partisi) atau rentang bebas
+    list_filter=('trx_type',('product',AutocompleteSelectFilter),TrxMonthFilter,('trx_date',RangeDateTimeFilter))
+    list_select_related=('product',)
+    autocomplete_fields=('product',)
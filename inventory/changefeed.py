@@ -0,0 +1,86 @@
+# inventory/changefeed.py
+"""
+Change feed transaksi stok untuk sinkronisasi incremental (ERP/BI).
+
+Setiap insert/edit/hapus Transaction — lewat signal, import massal, dokumen —
+menulis satu baris ``StockChange`` di transaksi DB yang sama, jadi feed tidak
+pernah berisi perubahan yang di-rollback dan tidak pernah kehilangan yang commit.
+Baris berisi keadaan transaksi sesudah perubahan (hapus: keadaan terakhir);
+konsumen cukup upsert/hapus per ``trx_id`` sesuai urutan feed.
+
+Urutan & cursor: id saja tidak cukup — id diambil saat INSERT, commit bisa
+berbeda urutan, sehingga baris id kecil bisa muncul SESUDAH konsumen melewati
+id yang lebih besar. Karena itu tiap baris menyimpan xid transaksi penulisnya,
+feed diurutkan (txid, id) dan hanya menyajikan txid < xmin snapshot saat ini:
+semua transaksi di bawah xmin sudah selesai, jadi bagian feed itu final dan
+cursor ``"<txid>-<id>"`` tidak pernah melompati baris. Harganya: perubahan baru
+terlihat setelah transaksi lebih tua yang masih berjalan selesai.
+
+Feed append-only; ``prune()`` (command ``prune_change_feed``) membuang baris lama.
+"""
+from django.db import connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+from .models import StockChange, Transaction
+
+DEFAULT_LIMIT = 1000
+MAX_LIMIT = 10000
+FIELDS = ("id", "txid", "action", "trx_id", "product_id", "trx_type", "quantity",
+          "trx_date", "note", "document_id", "changed_at")
+_SAFE_TXID = RawSQL("pg_snapshot_xmin(pg_current_snapshot())::text::bigint", [])
+
+
+def record(action, trxs):
+    """Tulis perubahan ``trxs`` (instance Transaction yang sudah punya pk); satu INSERT."""
+    StockChange.objects.bulk_create([
+        StockChange(action=action, trx_id=t.pk, product_id=t.product_id, trx_type=t.trx_type,
+                    quantity=t.quantity, trx_date=t.trx_date, note=t.note or "", document_id=t.document_id)
+        for t in trxs
+    ], batch_size=1000)
+
+
+def record_product_deleted(product_id):
+    """Hapus produk meng-cascade transaksinya: semua masuk feed sebagai DELETED dalam satu INSERT ... SELECT."""
+    qn = connection.ops.quote_name
+    cols = "trx_id, product_id, trx_type, quantity, trx_date, note, document_id"
+    with connection.cursor() as cur:
+        cur.execute(
+            f"INSERT INTO {qn(StockChange._meta.db_table)} (action, {cols}, changed_at) "
+            f"SELECT %s, id, product_id, trx_type, quantity, trx_date, note, document_id, now() "
+            f"FROM {qn(Transaction._meta.db_table)} WHERE product_id = %s", [StockChange.DELETED, product_id])
+
+
+def format_cursor(txid, pk):
+    return f"{txid}-{pk}"
+
+
+def parse_cursor(raw):
+    """``"<txid>-<id>"`` -> (txid, id); ValueError jika tidak valid."""
+    txid, sep, pk = (raw or "").partition("-")
+    if not sep or not txid.isdigit() or not pk.isdigit():
+        raise ValueError(raw)
+    return int(txid), int(pk)
+
+
+def changes(after=None, limit=DEFAULT_LIMIT):
+    """
+    Perubahan final sesudah cursor ``after`` ((txid, id) atau None = dari awal).
+    Return (rows, next_cursor, more); ``next_cursor`` = ``after`` jika belum ada yang baru
+    (``"0-0"`` = awal feed).
+    """
+    qs = StockChange.objects.filter(txid__lt=_SAFE_TXID)
+    if after:
+        txid, pk = after
+        # txid >= ... dilayani index (txid, id); OR hanya memilah baris txid yang sama
+        qs = qs.filter(txid__gte=txid).filter(Q(txid__gt=txid) | Q(id__gt=pk))
+    rows = list(qs.order_by("txid", "id").values(*FIELDS)[:limit + 1])
+    more, rows = len(rows) > limit, rows[:limit]
+    if rows:
+        after = (rows[-1]["txid"], rows[-1]["id"])
+    return rows, format_cursor(*(after or (0, 0))), more
+
+
+def prune(before):
+    """Hapus baris feed yang ``changed_at`` < ``before``. Return jumlah baris."""
+    return StockChange.objects.filter(changed_at__lt=before).delete()[0]
@@ -0,0 +1,148 @@
+# inventory/documents.py
+"""
+Dokumen stok multi-baris (penerimaan/pengeluaran barang) diposting sekaligus.
+
+Alur: validasi semua baris dulu (SKU/id produk di-resolve dalam satu query),
+lalu dalam satu transaksi DB: lock produk terkait (urut id, sama seperti
+``services.apply_deltas`` -> tidak deadlock dengan writer lain), cek stok per
+produk untuk dokumen keluar, hitung saldo ledger baris baru, ``bulk_create``
+semua baris, dan terapkan SATU update stok per produk + rollup lewat
+``services.post_changes``. Semua-atau-tidak: satu baris salah = tidak ada yang
+tersimpan, semua error dilaporkan per nomor baris.
+"""
+import csv
+import io
+import uuid
+
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from . import changefeed, ledger, partitions, services, shards
+from .models import CLOSED_PERIOD_MSG, INSUFFICIENT_STOCK_MSG, Product, StockChange, StockDocument, Transaction
+
+MAX_LINES = 2000
+NUMBER_PREFIX = {Transaction.IN: "GR", Transaction.OUT: "GI"}
+
+
+def parse_lines_text(text):
+    """Textarea ``sku,qty[,catatan]`` per baris -> list dict; baris kosong dilewati."""
+    rows = []
+    for rec in csv.reader(io.StringIO(text or "")):
+        if not any(c.strip() for c in rec):
+            continue
+        rows.append({"sku": rec[0], "quantity": rec[1] if len(rec) > 1 else "",
+                     "note": ",".join(rec[2:]).strip()})
+    return rows
+
+
+def _resolve_products(lines):
+    """{sku: id} dan {id: id} untuk semua referensi produk di ``lines``, satu query."""
+    skus = {str(r.get("sku") or "").strip() for r in lines} - {""}
+    ids = set()
+    for r in lines:
+        try:
+            ids.add(int(r.get("product_id")))
+        except (TypeError, ValueError):
+            pass
+    if not skus and not ids:
+        return {}, set()
+    found = list(Product.objects.filter(Q(sku__in=skus) | Q(pk__in=ids)).values_list("sku", "pk"))
+    return {sku: pk for sku, pk in found}, {pk for _, pk in found}
+
+
+def validate_lines(doc_type, lines):
+    """-> list ``Transaction`` (belum disimpan); ``ValidationError`` berisi semua error per baris."""
+    if doc_type not in NUMBER_PREFIX:
+        raise ValidationError("Jenis dokumen harus IN atau OUT.")
+    if not lines:
+        raise ValidationError("Dokumen tidak punya baris.")
+    if len(lines) > MAX_LINES:
+        raise ValidationError(f"Maksimal {MAX_LINES} baris per dokumen.")
+    by_sku, known_ids = _resolve_products(lines)
+    errors, trxs = [], []
+    for lineno, r in enumerate(lines, start=1):
+        try:
+            sku = str(r.get("sku") or "").strip()
+            if sku:
+                if sku not in by_sku:
+                    raise ValueError(f"SKU tidak ditemukan: {sku!r}")
+                pid = by_sku[sku]
+            else:
+                try:
+                    pid = int(r.get("product_id"))
+                except (TypeError, ValueError):
+                    raise ValueError("sku atau product_id wajib diisi")
+                if pid not in known_ids:
+                    raise ValueError(f"Produk #{pid} tidak ditemukan")
+            qty = services.parse_quantity(r.get("quantity"))
+        except ValueError as e:
+            errors.append(f"Baris {lineno}: {e}")
+            continue
+        trxs.append(Transaction(product_id=pid, trx_type=doc_type, quantity=qty,
+                                note=str(r.get("note") or "")[:255]))
+    if errors:
+        raise ValidationError(errors)
+    return trxs
+
+
+def _check_stock(trxs, on_hand):
+    """Dokumen keluar: total per produk tidak boleh melebihi stok; error di baris yang membuatnya minus."""
+    errors, left = [], dict(on_hand)
+    for lineno, t in enumerate(trxs, start=1):
+        left[t.product_id] -= t.quantity
+        if left[t.product_id] < 0:
+            errors.append(f"Baris {lineno}: {INSUFFICIENT_STOCK_MSG} "
+                          f"(stok {on_hand[t.product_id]})")
+    if errors:
+        raise ValidationError(errors)
+
+
+def post_document(doc_type, lines, number="", doc_date=None, note="", user=None, batch_size=1000):
+    """
+    Posting dokumen ``doc_type`` (IN/OUT) dengan ``lines`` = list dict
+    ``{sku | product_id, quantity, note}``. Return ``StockDocument``; ``ValidationError``
+    jika ada baris tidak valid atau stok tidak cukup (tidak ada yang tersimpan).
+    """
+    trxs = validate_lines(doc_type, lines)
+    doc_date = doc_date or timezone.now()
+    if timezone.is_naive(doc_date):
+        doc_date = timezone.make_aware(doc_date)
+    closed = partitions.closed_until()
+    if closed and doc_date < closed:
+        raise ValidationError(CLOSED_PERIOD_MSG)
+    number = (number or "").strip() or f"{NUMBER_PREFIX[doc_type]}-{doc_date:%Y%m%d}-{uuid.uuid4().hex[:6].upper()}"
+    max_len = StockDocument._meta.get_field("number").max_length
+    if len(number) > max_len:
+        raise ValidationError(f"Nomor dokumen maksimal {max_len} karakter.")
+
+    with transaction.atomic():
+        pids = {t.product_id for t in trxs}
+        # urutan lock: advisory produk bergaris dulu, baru baris produk; NO KEY UPDATE tidak bentrok
+        # dengan KEY SHARE dari cek FK (deferred, saat commit) insert transaksi writer lain
+        shards.lock_shared(pids)
+        on_hand = dict(
+            shards.annotate_on_hand(Product.objects.select_for_update(no_key=True).filter(pk__in=pids).order_by("pk"))
+            .values_list("pk", "on_hand")
+        )
+        if doc_type == Transaction.OUT:
+            _check_stock(trxs, on_hand)
+        # unique index yang memutuskan (cek exists() dulu = race antar posting nomor sama)
+        try:
+            with transaction.atomic():
+                doc = StockDocument.objects.create(number=number, doc_type=doc_type, doc_date=doc_date,
+                                                   note=note[:255], line_count=len(trxs), posted_by=user)
+        except IntegrityError:
+            raise ValidationError(f"Nomor dokumen {number} sudah dipakai.")
+        for t in trxs:
+            t.document = doc
+            t.trx_date = doc_date
+        partitions.cover([doc_date])
+        deltas = ledger.place_new(trxs, doc_date)
+        Transaction.objects.bulk_create(trxs, batch_size=batch_size)
+        changefeed.record(StockChange.CREATED, trxs)
+        # cek stok final tetap di UPDATE bersyarat (check=True)
+        striped = services.post_changes([(t.product_id, t.trx_date, t.trx_type, t.quantity) for t in trxs])
+        ledger.shift_later({pid: d for pid, d in deltas.items() if pid not in striped}, doc_date)
+    return doc
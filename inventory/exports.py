@@ -0,0 +1,183 @@
+# inventory/exports.py
+"""
+Job export CSV di background tanpa broker: tabel ``ExportJob`` adalah antreannya.
+
+Web hanya membuat job (``enqueue``); worker lokal (command ``export_worker``)
+mengklaim job dengan ``SELECT ... FOR UPDATE SKIP LOCKED`` sehingga beberapa
+worker aman jalan bersamaan, lalu menulis CSV ter-gzip per chunk ke
+``EXPORT_ROOT`` (file .tmp, di-rename saat selesai) sambil memperbarui progres.
+Setiap klaim menaikkan ``attempt``: job yang di-requeue karena dikira mati bisa
+saja masih dikerjakan worker lamanya, jadi file .tmp dibedakan per attempt dan
+progres/rename/selesai hanya boleh oleh pemilik attempt terbaru.
+
+Pemakaian ulang: job dengan filter sama (``filter_key``) dan watermark ledger
+(``summary_cache.version()``) sama dengan sekarang dipakai lagi selama filenya
+masih ada; job yang masih antre (dibaca saat dijalankan) atau sedang berjalan
+dengan watermark sama juga dipakai, bukan dibuat dobel.
+"""
+import csv
+import gzip
+import hashlib
+import json
+import os
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from . import summary_cache
+from .models import ExportJob, Product
+from .views_report import EXPORT_CHUNK_SIZE, export_rows, filtered_trx_qs
+
+FILTER_KEYS = ("start", "end", "cat", "prod")
+
+
+def export_root():
+    return Path(getattr(settings, "EXPORT_ROOT", settings.BASE_DIR / "exports"))
+
+
+def normalize_filters(params):
+    return {k: params.get(k) or "" for k in FILTER_KEYS}
+
+
+def filter_key(kind, filters):
+    raw = json.dumps([kind, normalize_filters(filters)], sort_keys=True)
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+def _products(filters):
+    qs = Product.objects.all()
+    if filters.get("cat"):
+        qs = qs.filter(category_id=filters["cat"])
+    if filters.get("prod"):
+        qs = qs.filter(id=filters["prod"])
+    return qs
+
+
+def ledger_watermark():
+    """
+    Sidik data yang akan diekspor = versi ledger: satu SELECT sequence, naik setiap
+    transaksi/produk/master berubah (summary_cache.bump). Konservatif: perubahan di
+    luar filter juga membuat export berikutnya diulang.
+    """
+    return str(summary_cache.version())
+
+
+def _rows_total(kind, filters):
+    if kind == "detail":
+        return filtered_trx_qs(filters)[0].select_related(None).order_by().count()
+    return _products(filters).count()
+
+
+def enqueue(kind, params, user=None):
+    """
+    -> (job, dipakai_ulang). Job selesai/berjalan dengan filter & watermark sama dipakai
+    lagi; job yang masih antre juga (datanya baru dibaca saat dijalankan, watermark-nya
+    ditetapkan ulang di ``run_job``). Job berjalan dengan watermark lebih lama tidak:
+    snapshot-nya sudah tertinggal dari ledger saat ini.
+    """
+    filters = normalize_filters(params)
+    key = filter_key(kind, filters)
+    wm = ledger_watermark()
+    done = (ExportJob.objects.filter(filter_key=key, status=ExportJob.DONE, watermark=wm)
+            .order_by("-finished_at").first())
+    if done and Path(done.file_path).is_file():
+        return done, True
+    pending = (ExportJob.objects.filter(filter_key=key)
+               .filter(Q(status=ExportJob.QUEUED) | Q(status=ExportJob.RUNNING, watermark=wm))
+               .order_by("-created_at").first())
+    if pending:
+        return pending, True
+    job = ExportJob.objects.create(kind=kind, filters=filters, filter_key=key, watermark=wm,
+                                   requested_by=user if user and user.is_authenticated else None)
+    return job, False
+
+
+def claim_next():
+    """Ambil job antre tertua dan tandai running; None jika antrean kosong."""
+    with transaction.atomic():
+        job = (ExportJob.objects.select_for_update(skip_locked=True)
+               .filter(status=ExportJob.QUEUED).order_by("created_at").first())
+        if job is None:
+            return None
+        job.status = ExportJob.RUNNING
+        job.started_at = timezone.now()
+        job.attempt += 1
+        job.save(update_fields=["status", "started_at", "attempt", "updated_at"])
+    return job
+
+
+class JobSuperseded(Exception):
+    """Job sudah di-requeue & diklaim ulang; worker ini berhenti tanpa menyentuh job."""
+
+
+def _owned(job):
+    return ExportJob.objects.filter(pk=job.pk, status=ExportJob.RUNNING, attempt=job.attempt)
+
+
+def requeue_stale(minutes):
+    """Job running tanpa progres ``minutes`` menit (worker mati) dikembalikan ke antrean."""
+    limit = timezone.now() - timedelta(minutes=minutes)
+    return ExportJob.objects.filter(status=ExportJob.RUNNING, updated_at__lt=limit).update(
+        status=ExportJob.QUEUED, rows_written=0, updated_at=timezone.now())
+
+
+def run_job(job, progress_every=EXPORT_CHUNK_SIZE):
+    """
+    Tulis file job ke ``EXPORT_ROOT``; status akhir done/failed disimpan di job.
+    ``JobSuperseded`` jika job sudah diklaim ulang worker lain (job tidak diubah).
+    """
+    # watermark diambil sebelum data dibaca: perubahan di tengah jalan -> permintaan
+    # berikutnya melihat watermark berbeda dan mengekspor ulang (tidak pernah basi)
+    wm = ledger_watermark()
+    total = _rows_total(job.kind, job.filters)
+    if not _owned(job).update(watermark=wm, rows_total=total, updated_at=timezone.now()):
+        raise JobSuperseded(f"{job}: attempt {job.attempt} sudah digantikan")
+
+    root = export_root()
+    root.mkdir(parents=True, exist_ok=True)
+    final = root / f"{job.kind}-{job.pk}-{job.filter_key[:12]}.csv.gz"
+    tmp = final.with_name(f"{final.name}.{job.attempt}.tmp")
+    written = 0
+    try:
+        header, rows = export_rows(job.kind, job.filters)
+        with gzip.open(tmp, "wt", encoding="utf-8", newline="", compresslevel=6) as f:
+            w = csv.writer(f)
+            w.writerow(header)
+            for row in rows:
+                w.writerow(row)
+                written += 1
+                if written % progress_every == 0 and not _owned(job).update(
+                        rows_written=written, updated_at=timezone.now()):
+                    raise JobSuperseded(f"{job}: attempt {job.attempt} sudah digantikan")
+        # lock baris job selama rename + done: requeue_stale menunggu, lalu tidak lagi cocok
+        with transaction.atomic():
+            if not _owned(job).select_for_update().exists():
+                raise JobSuperseded(f"{job}: attempt {job.attempt} sudah digantikan")
+            os.replace(tmp, final)
+            _owned(job).update(
+                status=ExportJob.DONE, rows_written=written, file_path=str(final), file_size=final.stat().st_size,
+                finished_at=timezone.now(), updated_at=timezone.now())
+    except JobSuperseded:
+        tmp.unlink(missing_ok=True)
+        raise
+    except Exception as e:
+        tmp.unlink(missing_ok=True)
+        _owned(job).update(
+            status=ExportJob.FAILED, error=f"{type(e).__name__}: {e}", rows_written=written,
+            finished_at=timezone.now(), updated_at=timezone.now())
+        raise
+    job.refresh_from_db()
+    return job
+
+
+def purge(days):
+    """Hapus job selesai/gagal yang lebih tua dari ``days`` hari beserta filenya."""
+    old = ExportJob.objects.filter(status__in=[ExportJob.DONE, ExportJob.FAILED],
+                                   created_at__lt=timezone.now() - timedelta(days=days))
+    for path in old.exclude(file_path="").values_list("file_path", flat=True):
+        Path(path).unlink(missing_ok=True)
+    return old.delete()[0]
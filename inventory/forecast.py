@@ -0,0 +1,174 @@
+# inventory/forecast.py
+"""
+Kecepatan keluar stok & titik pesan ulang untuk seluruh katalog sekaligus.
+
+Pemakaian harian diambil dari rollup (``DailyStock``, arah OUT) untuk ``days``
+hari penuh terakhir (hari ini belum selesai, jadi tidak ikut). Satu query
+mengagregasi per produk jumlah, jumlah kuadrat dan jumlah hari aktif; hasilnya
+satu baris per produk (bukan per produk x hari), jadi ukuran transfer tidak
+tumbuh dengan panjang jendela. Produk bergaris dijumlahkan per hari dulu
+(rollup-nya bisa beberapa baris per hari). Semua turunan dihitung vektor
+dengan NumPy di atas array yang diurutkan per id produk, tanpa loop per produk.
+
+Hari tanpa keluar dihitung nol. Dengan L = lead time, R = periode review,
+z = kuantil normal untuk ``service_level``:
+
+- ``rop``         = rata2 * L + z * sd * sqrt(L)          (titik pesan ulang)
+- ``order_up_to`` = rata2 * (L+R) + z * sd * sqrt(L+R)
+- ``suggest``     = order_up_to - stok, hanya jika stok <= rop
+- ``cover``       = stok / rata2 (hari, stok negatif = 0; NaN jika tidak ada pemakaian)
+"""
+from datetime import timedelta
+from statistics import NormalDist
+
+import numpy as np
+from django.db import connection, connections, router
+from django.utils import timezone
+
+from . import shards
+from .models import DailyStock, Product, Transaction
+
+DEFAULT_DAYS = 90
+DEFAULT_LEAD_TIME = 7
+DEFAULT_REVIEW = 14
+DEFAULT_SERVICE_LEVEL = 0.95
+MAX_DAYS = 3660
+EXPORT_CHUNK = 2000
+
+
+def qn(name):
+    return connection.ops.quote_name(name)
+
+
+def window(days=DEFAULT_DAYS, end=None):
+    """(hari pertama, hari sesudah terakhir) jendela ``days`` hari penuh sebelum ``end`` (default hari ini)."""
+    end = end or timezone.localdate()
+    return end - timedelta(days=days), end
+
+
+def usage(days=DEFAULT_DAYS, end=None):
+    """
+    Statistik keluar per produk yang punya pemakaian di jendela: dict array
+    ``ids`` (urut naik), ``total``, ``sumsq`` (jumlah kuadrat total harian) dan ``active``
+    (jumlah hari dengan keluar). Satu query.
+    """
+    start, end = window(days, end)
+    daily, product = qn(DailyStock._meta.db_table), qn(Product._meta.db_table)
+    # laporan: ikut replica baca bila view memintanya (warehouse/replica.py)
+    with connections[router.db_for_read(DailyStock)].cursor() as cur:
+        cur.execute(
+            f"SELECT product_id, SUM(q), SUM(q * q), COUNT(*) FROM ("
+            f" SELECT d.product_id, d.quantity::float8 AS q FROM {daily} d"
+            f" JOIN {product} p ON p.id = d.product_id AND p.shard_count = 0"
+            f" WHERE d.trx_type = %s AND d.day >= %s AND d.day < %s"
+            f" UNION ALL"
+            f" SELECT d.product_id, SUM(d.quantity)::float8 FROM {daily} d"
+            f" JOIN {product} p ON p.id = d.product_id AND p.shard_count > 0"
+            f" WHERE d.trx_type = %s AND d.day >= %s AND d.day < %s GROUP BY d.product_id, d.day"
+            f") x WHERE q <> 0 GROUP BY product_id ORDER BY product_id",
+            [Transaction.OUT, start, end] * 2)
+        rows = cur.fetchall()
+    a = np.array(rows, dtype=np.float64).reshape(-1, 4)
+    return {"ids": a[:, 0].astype(np.int64), "total": a[:, 1], "sumsq": a[:, 2], "active": a[:, 3].astype(np.int64)}
+
+
+def _ceil_cent(x):
+    return np.ceil(np.round(x * 100, 6)) / 100
+
+
+def forecast(qs=None, days=DEFAULT_DAYS, lead_time=DEFAULT_LEAD_TIME, review=DEFAULT_REVIEW,
+             service_level=DEFAULT_SERVICE_LEVEL, end=None):
+    """
+    Proyeksi untuk semua produk di ``qs`` (default semua): dict array sejajar urut id —
+    ``ids``, ``on_hand``, ``min_stock``, ``avg``, ``sd``, ``active``, ``cover``, ``rop``,
+    ``order_up_to``, ``suggest``. Dua query (pemakaian + stok saat ini).
+    ``ValueError`` untuk parameter di luar batas.
+    """
+    if not 1 <= days <= MAX_DAYS:
+        raise ValueError(f"Jendela harus 1..{MAX_DAYS} hari.")
+    if lead_time < 0 or review < 0:
+        raise ValueError("Lead time dan periode review tidak boleh negatif.")
+    if not 0.5 <= service_level < 1:
+        raise ValueError("Service level harus 0.5 .. <1.")
+    qs = Product.objects.all() if qs is None else qs
+    stock = list(shards.annotate_on_hand(qs.order_by("pk")).values_list("pk", "on_hand", "min_stock"))
+    s = np.array(stock, dtype=np.float64).reshape(-1, 3)
+    ids = s[:, 0].astype(np.int64)
+    on_hand, min_stock = s[:, 1], s[:, 2]
+
+    u = usage(days, end)
+    total, sumsq, active = np.zeros(len(ids)), np.zeros(len(ids)), np.zeros(len(ids), dtype=np.int64)
+    if len(u["ids"]):
+        pos = np.searchsorted(u["ids"], ids)
+        pos[pos == len(u["ids"])] = 0
+        hit = u["ids"][pos] == ids
+        total[hit], sumsq[hit], active[hit] = u["total"][pos[hit]], u["sumsq"][pos[hit]], u["active"][pos[hit]]
+
+    avg = total / days
+    # simpangan baku sampel total harian (hari tanpa keluar = 0)
+    var = (sumsq - days * avg * avg) / (days - 1) if days > 1 else np.zeros(len(ids))
+    sd = np.sqrt(np.clip(var, 0, None))
+    z = NormalDist().inv_cdf(service_level)
+    rop = _ceil_cent(avg * lead_time + z * sd * np.sqrt(lead_time))
+    order_up_to = _ceil_cent(avg * (lead_time + review) + z * sd * np.sqrt(lead_time + review))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cover = np.where(avg > 0, np.clip(on_hand, 0, None) / avg, np.nan)
+    suggest = np.where((avg > 0) & (on_hand <= rop), np.clip(order_up_to - on_hand, 0, None), 0.0)
+    return {"ids": ids, "on_hand": on_hand, "min_stock": min_stock, "avg": avg, "sd": sd, "active": active,
+            "cover": cover, "rop": rop, "order_up_to": order_up_to, "suggest": _ceil_cent(suggest)}
+
+
+def urgent(fc, limit=None):
+    """Indeks produk yang perlu dipesan (suggest > 0), urut cover tersingkat lalu pemakaian terbesar."""
+    idx = np.flatnonzero(fc["suggest"] > 0)
+    idx = idx[np.lexsort((-fc["avg"][idx], fc["cover"][idx]))]
+    return idx if limit is None else idx[:limit]
+
+
+EXPORT_HEADER = ["SKU", "Nama", "On Hand", "Min", "Rata2/Hari", "SD/Hari", "Hari Aktif", "Cover (hari)",
+                 "Reorder Point", "Order Up To", "Saran Pesan"]
+
+
+def _row(fc, i, sku, name):
+    cover = fc["cover"][i]
+    return {"id": int(fc["ids"][i]), "sku": sku, "name": name,
+            "on_hand": round(float(fc["on_hand"][i]), 2), "min_stock": round(float(fc["min_stock"][i]), 2),
+            "avg": round(float(fc["avg"][i]), 2), "sd": round(float(fc["sd"][i]), 2),
+            "active": int(fc["active"][i]), "cover": None if np.isnan(cover) else round(float(cover), 1),
+            "rop": float(fc["rop"][i]), "order_up_to": float(fc["order_up_to"][i]),
+            "suggest": float(fc["suggest"][i])}
+
+
+def rows(fc, idx):
+    """Baris (dict) untuk indeks ``idx`` dari ``forecast()``, sku/nama diambil dalam satu query."""
+    names = dict((pk, (sku, name)) for pk, sku, name in
+                 Product.objects.filter(pk__in=fc["ids"][idx].tolist()).values_list("pk", "sku", "name"))
+    return [_row(fc, i, *names.get(int(fc["ids"][i]), ("", ""))) for i in idx]
+
+
+def export_rows(fc, qs=None, chunk=EXPORT_CHUNK):
+    """
+    Iterator baris CSV semua produk ``fc`` urut id. sku/nama dibaca per ``chunk`` produk
+    (keyset ``id > id terakhir``, bukan satu ``pk__in`` berisi seluruh katalog), jadi tiap
+    chunk bisa ditulis begitu selesai. ``qs`` = queryset yang sama dengan ``forecast()``;
+    produk yang dibuat sesudah proyeksi dilewati.
+    """
+    qs = (Product.objects.all() if qs is None else qs).order_by("pk").values_list("pk", "sku", "name")
+    ids, last = fc["ids"], None
+    while len(ids):
+        page = list((qs if last is None else qs.filter(pk__gt=last))[:chunk])
+        if not page:
+            return
+        pos = np.searchsorted(ids, np.array([pk for pk, _, _ in page], dtype=np.int64))
+        pos[pos == len(ids)] = 0
+        for (pk, sku, name), i in zip(page, pos):
+            if ids[i] == pk:
+                yield export_row(_row(fc, i, sku, name))
+        if len(page) < chunk:
+            return
+        last = page[-1][0]
+
+
+def export_row(r):
+    return (r["sku"], r["name"], r["on_hand"], r["min_stock"], r["avg"], r["sd"], r["active"],
+            "" if r["cover"] is None else r["cover"], r["rop"], r["order_up_to"], r["suggest"])
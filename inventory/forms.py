@@ -1,9 +1,16 @@
 from django import forms
-from .models import Product, Category, UoM, Transaction
+from . import services
+from .models import Product, Category, UoM, Transaction, StockDocument
+from .widgets import RemoteSelect
 class ProductForm(forms.ModelForm):
     class Meta:
         model=Product
         fields=['sku','name','category','uom','min_stock','is_active']
+        widgets={'category':RemoteSelect('inventory:category-lookup'),'uom':RemoteSelect('inventory:uom-lookup')}
+    def save(self, commit=True):
+        # edit: hanya field master yang ditulis; stok milik services.apply_deltas
+        if not commit or self.instance._state.adding: return super().save(commit)
+        return services.save_product(self.instance, self.changed_data)
 class CategoryForm(forms.ModelForm):
     class Meta:
         model=Category
@@ -16,3 +23,17 @@ class TransactionForm(forms.ModelForm):
     class Meta:
         model=Transaction
         fields=['product','trx_type','quantity','note','trx_date']
+        widgets={'product':RemoteSelect('inventory:product-autocomplete')}
+class TransactionImportForm(forms.Form):
+    file=forms.FileField(label='File CSV/JSON', help_text='Kolom: sku, trx_type (IN/OUT), quantity, note, trx_date')
+    dry_run=forms.BooleanField(label='Validasi saja (tanpa simpan)', required=False)
+class StockDocumentForm(forms.ModelForm):
+    lines=forms.CharField(label='Baris', widget=forms.Textarea(attrs={'rows':12,'placeholder':'SKU-001,10,catatan\nSKU-002,5'}),
+                          help_text='Satu baris per produk: sku,quantity[,catatan]')
+    class Meta:
+        model=StockDocument
+        fields=['doc_type','number','doc_date','note']
+        help_texts={'number':'Kosongkan untuk nomor otomatis.'}
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields['number'].required=False
@@ -0,0 +1,115 @@
+# inventory/importer.py
+"""
+Import transaksi massal (CSV/JSON).
+
+Alur: parse + validasi semua baris dulu (SKU di-resolve dalam satu query),
+lalu dalam satu transaksi DB: lock produk terkait (urut id), simulasikan saldo
+per produk sesuai urutan file untuk menolak baris yang bikin stok minus,
+``bulk_create`` baris valid per batch, dan terapkan SATU update stok per produk (plus rollup harian).
+Baris yang gagal dilaporkan per nomor baris tanpa membatalkan seluruh file.
+"""
+import csv
+import io
+import json
+from datetime import datetime
+
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from . import changefeed, ledger, partitions, services, shards
+from .models import CLOSED_PERIOD_MSG, INSUFFICIENT_STOCK_MSG, Product, StockChange, Transaction
+
+COLUMNS = ("sku", "trx_type", "quantity", "note", "trx_date")
+TYPE_ALIASES = {"IN": Transaction.IN, "MASUK": Transaction.IN, "OUT": Transaction.OUT, "KELUAR": Transaction.OUT}
+
+
+def read_rows(fileobj, fmt):
+    """Baca file (bytes/teks) jadi list dict. ``fmt``: "csv" | "json"."""
+    data = fileobj.read()
+    if isinstance(data, bytes):
+        data = data.decode("utf-8-sig")
+    if fmt == "json":
+        rows = json.loads(data)
+        if isinstance(rows, dict):
+            rows = rows.get("rows") or []
+        return [r for r in rows if isinstance(r, dict)]
+    return list(csv.DictReader(io.StringIO(data)))
+
+
+def _parse_date(raw, default):
+    if not raw:
+        return default
+    dt = parse_datetime(raw)
+    if dt is None:
+        d = parse_date(raw)
+        if d is None:
+            raise ValueError(f"trx_date tidak valid: {raw!r}")
+        dt = datetime.combine(d, datetime.min.time())
+    if timezone.is_naive(dt):
+        dt = timezone.make_aware(dt)
+    return dt
+
+
+def import_rows(rows, batch_size=1000, dry_run=False):
+    """
+    Validasi + posting ``rows`` (list dict dgn kolom ``COLUMNS``).
+    Return ``(created, errors)``; ``errors`` = list ``(baris, pesan)``,
+    nomor baris 1-based sesuai urutan data (tanpa header).
+    """
+    errors, parsed = [], []
+    now = timezone.now()
+    skus = {str(r.get("sku") or "").strip() for r in rows} - {""}
+    product_ids = dict(Product.objects.filter(sku__in=skus).values_list("sku", "id"))
+    closed = partitions.closed_until()
+
+    for lineno, r in enumerate(rows, start=1):
+        sku = str(r.get("sku") or "").strip()
+        try:
+            if sku not in product_ids:
+                raise ValueError(f"SKU tidak ditemukan: {sku!r}")
+            trx_type = TYPE_ALIASES.get(str(r.get("trx_type") or "").strip().upper())
+            if trx_type is None:
+                raise ValueError(f"trx_type harus IN/OUT, bukan {r.get('trx_type')!r}")
+            qty = services.parse_quantity(r.get("quantity"))
+            trx_date = _parse_date(str(r.get("trx_date") or "").strip(), now)
+            if closed and trx_date < closed:
+                raise ValueError(CLOSED_PERIOD_MSG)
+        except ValueError as e:
+            errors.append((lineno, str(e)))
+            continue
+        parsed.append((lineno, Transaction(
+            product_id=product_ids[sku], trx_type=trx_type, quantity=qty,
+            note=str(r.get("note") or "")[:255], trx_date=trx_date,
+        )))
+
+    with transaction.atomic():
+        pids = {t.product_id for _, t in parsed}
+        shards.lock_shared(pids)
+        balance = dict(
+            shards.annotate_on_hand(Product.objects.select_for_update(no_key=True).filter(pk__in=pids).order_by("pk"))
+            .values_list("pk", "on_hand")
+        )
+        accepted = []
+        for lineno, trx in parsed:
+            delta = services.stock_delta(trx.trx_type, trx.quantity)
+            if balance[trx.product_id] + delta < 0:
+                errors.append((lineno, INSUFFICIENT_STOCK_MSG))
+                continue
+            balance[trx.product_id] += delta
+            accepted.append(trx)
+
+        if not dry_run:
+            partitions.cover({t.trx_date for t in accepted})
+            Transaction.objects.bulk_create(accepted, batch_size=batch_size)
+            changefeed.record(StockChange.CREATED, accepted)
+            striped = services.post_changes([(t.product_id, t.trx_date, t.trx_type, t.quantity) for t in accepted])
+            # saldo berjalan dihitung ulang hanya mulai baris import terawal per produk
+            since = {}
+            for t in accepted:
+                if t.product_id not in striped:
+                    since[t.product_id] = min(since.get(t.product_id, t.trx_date), t.trx_date)
+            ledger.recompute_since(since)
+
+    errors.sort()
+    return len(accepted), errors
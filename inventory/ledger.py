@@ -0,0 +1,227 @@
+# inventory/ledger.py
+"""
+Saldo berjalan per produk di ledger (``Transaction.balance_after``).
+
+``balance_after`` = stok produk setelah baris ini, urut (trx_date, id). Insert,
+edit dan hapus (termasuk back-dated) menggeser saldo semua baris sesudahnya
+dengan satu UPDATE aritmetika; dokumen multi-baris menghitung saldo barisnya
+sebelum bulk insert (``place_new``); import massal menghitung ulang dengan window
+function mulai tanggal terawal baris import per produk (``recompute_since``), rebuild
+seluruh riwayat (``recompute``). Stok per tanggal D = ``balance_after`` baris terakhir sebelum D,
+dicari lewat index (product_id, trx_date, id) — O(log n), bukan scan riwayat.
+Periode yang sudah diarsip (``partitions.archive``) masuk sebagai saldo awal
+``OpeningBalance``: saldo baris pertama yang tersisa dihitung di atasnya.
+
+Dipanggil setelah ``services.apply_deltas`` dalam transaksi yang sama, jadi
+baris produk sudah terkunci dan writer per produk terserialisasi.
+
+Pengecualian: produk bergaris (``inventory.shards``) tidak mengunci baris produk,
+jadi saldonya tidak bisa digeser per posting. Writer-nya menandai baris mulai
+tanggal posting sebagai tertunda (``balance_after`` NULL, ``defer``) — baris
+tertunda selalu berupa ekor (trx_date, id) — dan fold menghitungnya
+(``fold_pending``). Lookup stok per tanggal menambahkan delta baris tertunda
+di atas saldo terakhir yang sudah dihitung, jadi hasilnya tetap tepat.
+"""
+from datetime import timedelta
+
+from django.db import connection
+from django.db.models import Case, DecimalField, F, OuterRef, Q, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import OpeningBalance, Product, Transaction
+
+DEC = DecimalField(max_digits=14, decimal_places=2)
+
+
+# (trx_date, id) > posisi; syarat trx_date >= d dipisah supaya jadi range scan index
+def _after(product_id, trx_date, trx_id):
+    return Transaction.objects.filter(product_id=product_id, trx_date__gte=trx_date).filter(
+        Q(trx_date__gt=trx_date) | Q(id__gt=trx_id))
+
+
+def _before(product_id, trx_date, trx_id):
+    return Transaction.objects.filter(product_id=product_id, trx_date__lte=trx_date).filter(
+        Q(trx_date__lt=trx_date) | Q(id__lt=trx_id))
+
+
+def shift(product_id, trx_date, trx_id, delta):
+    """Geser saldo semua baris produk sesudah posisi (trx_date, id) sebesar ``delta``."""
+    if delta:
+        _after(product_id, trx_date, trx_id).update(balance_after=F("balance_after") + delta)
+
+
+def place(trx, delta):
+    """Hitung saldo baris ``trx`` sendiri dari baris sebelumnya, lalu geser baris sesudahnya."""
+    # baris sebelumnya, atau saldo awal arsip jika ini baris pertama produk — satu query
+    prev = _before(trx.product_id, trx.trx_date, trx.pk).order_by("-trx_date", "-id").values("balance_after")[:1]
+    start = OpeningBalance.objects.filter(product_id=trx.product_id).values("quantity")
+    balance = Product.objects.filter(pk=trx.product_id).values_list(
+        Coalesce(Subquery(prev), Subquery(start), Value(0), output_field=DEC), flat=True).get() + delta
+    # trx_date ikut di filter supaya hanya partisi baris ini yang disentuh
+    Transaction.objects.filter(pk=trx.pk, trx_date=trx.trx_date).update(balance_after=balance)
+    trx.balance_after = balance
+    shift(trx.product_id, trx.trx_date, trx.pk, delta)
+
+
+def place_new(trxs, at):
+    """
+    Isi ``balance_after`` baris baru (belum disimpan) yang semuanya bertanggal
+    ``at`` — untuk ``bulk_create`` dokumen. Saldo awal per produk = baris terakhir
+    ber-trx_date <= ``at`` (id baru selalu lebih besar), satu query untuk semua
+    produk; selanjutnya kumulatif sesuai urutan ``trxs``.
+    Return ``{product_id: delta}`` untuk ``shift_later`` setelah insert.
+    """
+    at = _aware(at)
+    pids = {t.product_id for t in trxs}
+    balance = dict(
+        annotate_stock_as_of(Product.objects.filter(pk__in=pids).order_by(), at + timedelta(microseconds=1), "bal")
+        .values_list("pk", "bal")
+    )
+    deltas = {}
+    for t in trxs:
+        delta = t.quantity if t.trx_type == Transaction.IN else -t.quantity
+        balance[t.product_id] += delta
+        deltas[t.product_id] = deltas.get(t.product_id, 0) + delta
+        t.balance_after = balance[t.product_id]
+    return deltas
+
+
+def shift_later(deltas, at):
+    """Geser saldo baris semua produk ``deltas`` yang trx_date > ``at``; satu UPDATE."""
+    deltas = {pid: d for pid, d in deltas.items() if d}
+    if deltas:
+        Transaction.objects.filter(product_id__in=deltas, trx_date__gt=_aware(at)).update(
+            balance_after=F("balance_after") + Case(
+                *(When(product_id=pid, then=Value(d)) for pid, d in deltas.items()), output_field=DEC))
+
+
+def defer(since):
+    """Tandai tertunda baris produk bergaris ``{product_id: trx_date}`` mulai tanggal itu."""
+    for pid, trx_date in sorted(since.items()):
+        Transaction.objects.filter(product_id=pid, trx_date__gte=trx_date, balance_after__isnull=False).update(
+            balance_after=None)
+
+
+def fold_pending(product_id):
+    """
+    Hitung saldo baris tertunda ``product_id`` (window SUM mulai baris tertunda
+    pertama, di atas saldo baris sebelumnya / saldo awal). Pemanggil memegang
+    lock eksklusif produk (``shards.fold``). Return jumlah baris yang diisi.
+    """
+    table = connection.ops.quote_name(Transaction._meta.db_table)
+    opening_table = connection.ops.quote_name(OpeningBalance._meta.db_table)
+    with connection.cursor() as cur:
+        cur.execute(
+            f"WITH p AS (SELECT trx_date, id FROM {table} WHERE product_id = %s AND balance_after IS NULL"
+            f" ORDER BY trx_date, id LIMIT 1)"
+            f" UPDATE {table} SET balance_after = s.bal FROM ("
+            f" SELECT t.id, t.trx_date, COALESCE("
+            f"  (SELECT b.balance_after FROM {table} b WHERE b.product_id = %s AND (b.trx_date, b.id) < (p.trx_date, p.id)"
+            f"   ORDER BY b.trx_date DESC, b.id DESC LIMIT 1),"
+            f"  (SELECT o.quantity FROM {opening_table} o WHERE o.product_id = %s), 0)"
+            f" + SUM(CASE WHEN t.trx_type = 'IN' THEN t.quantity ELSE -t.quantity END)"
+            f" OVER (ORDER BY t.trx_date, t.id) AS bal"
+            f" FROM {table} t, p WHERE t.product_id = %s AND (t.trx_date, t.id) >= (p.trx_date, p.id)"
+            f") s WHERE {table}.id = s.id AND {table}.trx_date = s.trx_date"
+            f" AND {table}.balance_after IS DISTINCT FROM s.bal",
+            [product_id] * 4,
+        )
+        return cur.rowcount
+
+
+def recompute(product_ids=None):
+    """
+    Hitung ulang seluruh ``balance_after`` (window SUM per produk). ``product_ids``
+    None = semua produk. Dipakai rebuild dan migrasi awal.
+    """
+    table = connection.ops.quote_name(Transaction._meta.db_table)
+    opening_table = connection.ops.quote_name(OpeningBalance._meta.db_table)
+    where, params = "", []
+    if product_ids is not None:
+        product_ids = list(product_ids)
+        if not product_ids:
+            return
+        where = f"WHERE t.product_id IN ({', '.join(['%s'] * len(product_ids))})"
+        params = product_ids
+    with connection.cursor() as cur:
+        cur.execute(
+            f"UPDATE {table} SET balance_after = s.bal FROM ("
+            f" SELECT t.id, t.trx_date, COALESCE(o.quantity, 0)"
+            f" + SUM(CASE WHEN t.trx_type = 'IN' THEN t.quantity ELSE -t.quantity END)"
+            f" OVER (PARTITION BY t.product_id ORDER BY t.trx_date, t.id) AS bal"
+            f" FROM {table} t LEFT JOIN {opening_table} o ON o.product_id = t.product_id {where}"
+            f") s WHERE {table}.id = s.id AND {table}.trx_date = s.trx_date AND {table}.balance_after IS DISTINCT FROM s.bal",
+            params,
+        )
+
+
+def recompute_since(since):
+    """
+    Hitung ulang ``balance_after`` baris ``{product_id: trx_date}`` mulai tanggal itu
+    (window SUM di atas saldo baris terakhir sebelumnya / saldo awal), satu statement
+    untuk semua produk. Biayanya sebanding dengan ekor riwayat, bukan seluruh riwayat.
+    """
+    if not since:
+        return
+    table = connection.ops.quote_name(Transaction._meta.db_table)
+    opening_table = connection.ops.quote_name(OpeningBalance._meta.db_table)
+    items = sorted(since.items())
+    values = ", ".join(["(%s::bigint, %s::timestamptz)"] * len(items))
+    with connection.cursor() as cur:
+        cur.execute(
+            f"WITH s AS (SELECT v.pid, v.since, COALESCE("
+            f"  (SELECT b.balance_after FROM {table} b WHERE b.product_id = v.pid AND b.trx_date < v.since"
+            f"   ORDER BY b.trx_date DESC, b.id DESC LIMIT 1),"
+            f"  (SELECT o.quantity FROM {opening_table} o WHERE o.product_id = v.pid), 0) AS base"
+            f" FROM (VALUES {values}) v(pid, since))"
+            f" UPDATE {table} SET balance_after = x.bal FROM ("
+            f" SELECT t.id, t.trx_date, s.base"
+            f" + SUM(CASE WHEN t.trx_type = 'IN' THEN t.quantity ELSE -t.quantity END)"
+            f" OVER (PARTITION BY t.product_id ORDER BY t.trx_date, t.id) AS bal"
+            f" FROM {table} t JOIN s ON t.product_id = s.pid AND t.trx_date >= s.since"
+            f") x WHERE {table}.id = x.id AND {table}.trx_date = x.trx_date"
+            f" AND {table}.balance_after IS DISTINCT FROM x.bal",
+            [p for item in items for p in item],
+        )
+
+
+# ------------- lookup -------------
+def _aware(at):
+    return timezone.make_aware(at) if timezone.is_naive(at) else at
+
+
+def opening(product_id, at=None):
+    """Saldo awal arsip ``product_id`` (0 jika belum ada arsip atau ``at`` sebelum batas arsip)."""
+    qs = OpeningBalance.objects.filter(product_id=product_id)
+    if at is not None:
+        qs = qs.filter(as_of__lte=_aware(at))
+    return qs.values_list("quantity", flat=True).first() or 0
+
+
+def stock_as_of(product_id, at):
+    """Stok ``product_id`` tepat sebelum waktu ``at`` (transaksi ber-trx_date < at); satu query."""
+    bal = (annotate_stock_as_of(Product.objects.filter(pk=product_id).order_by(), at, "bal")
+           .values_list("bal", flat=True).first())
+    return 0 if bal is None else bal
+
+
+def annotate_stock_as_of(product_qs, at, name="stock_on_date"):
+    """
+    Anotasi stok per produk pada ``at`` — satu index seek per produk; produk
+    bergaris ditambah jumlah delta baris tertunda sebelum ``at`` (index parsial).
+    """
+    at = _aware(at)
+    sq = (Transaction.objects.filter(product=OuterRef("pk"), trx_date__lt=at, balance_after__isnull=False)
+          .order_by("-trx_date", "-id").values("balance_after")[:1])
+    osq = OpeningBalance.objects.filter(product=OuterRef("pk"), as_of__lte=at).values("quantity")
+    pending = (Transaction.objects.filter(product=OuterRef("pk"), trx_date__lt=at, balance_after__isnull=True)
+               .order_by().values("product")
+               .annotate(s=Sum(Case(When(trx_type=Transaction.IN, then=F("quantity")), default=-F("quantity"),
+                                    output_field=DEC)))
+               .values("s"))
+    return product_qs.annotate(**{name: Coalesce(Subquery(sq, output_field=DEC), Subquery(osq, output_field=DEC),
+                                                 Value(0), output_field=DEC)
+                                  + Case(When(shard_count=0, then=Value(0)),
+                                         default=Coalesce(Subquery(pending, output_field=DEC), Value(0)),
+                                         output_field=DEC)})
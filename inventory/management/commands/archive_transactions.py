@@ -0,0 +1,42 @@
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from inventory import partitions
+from inventory.models import Transaction
+
+
+class Command(BaseCommand):
+    help = ("Tutup periode transaksi sebelum bulan --before: saldo bersih per produk masuk ke "
+            "OpeningBalance, partisi bulan lama di-detach jadi tabel arsip (atau di-drop dengan --drop).")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--before", required=True, help="bulan pertama yang TIDAK diarsip, format YYYY-MM")
+        parser.add_argument("--drop", action="store_true", help="hapus data lama, jangan simpan tabel arsip")
+        parser.add_argument("--dry-run", action="store_true", help="hanya cetak apa yang akan diarsip")
+
+    def handle(self, *args, **opts):
+        if not partitions.is_partitioned():
+            raise CommandError("Tabel Transaction belum dipartisi (butuh Postgres + migrasi 0009).")
+        try:
+            before = timezone.make_aware(datetime.strptime(opts["before"], "%Y-%m"))
+        except ValueError:
+            raise CommandError("--before harus berformat YYYY-MM.")
+        closed = partitions.closed_until()
+        if closed and before <= closed:
+            raise CommandError(f"Periode sebelum {timezone.localtime(closed):%Y-%m} sudah diarsip.")
+
+        if opts["dry_run"]:
+            old = [p[0] for p in partitions.partitions() if p[2] <= before]
+            rows = Transaction.objects.filter(trx_date__lt=before).count()
+            self.stdout.write(f"{rows} transaksi < {before:%Y-%m-%d} di {len(old)} partisi: {', '.join(old) or '-'}")
+            return
+        try:
+            res = partitions.archive(before, drop=opts["drop"])
+        except ValueError as e:
+            raise CommandError(str(e))
+        action = "di-drop" if opts["drop"] else "di-detach"
+        self.stdout.write(self.style.SUCCESS(
+            f"Periode < {res['cutoff']:%Y-%m-%d} ditutup: {len(res['partitions'])} partisi {action}, "
+            f"saldo awal {res['products']} produk."))
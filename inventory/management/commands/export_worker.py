@@ -0,0 +1,44 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from inventory.exports import JobSuperseded, claim_next, purge, requeue_stale, run_job
+
+
+class Command(BaseCommand):
+    help = "Worker export CSV di background: ambil ExportJob antre dan tulis file .csv.gz ke EXPORT_ROOT."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="kerjakan antrean yang ada lalu berhenti")
+        parser.add_argument("--poll", type=float, default=2.0, help="jeda (detik) saat antrean kosong")
+        parser.add_argument("--stale-minutes", type=int, default=30,
+                            help="job running tanpa progres selama ini dianggap worker-nya mati")
+        parser.add_argument("--purge-days", type=int, default=7,
+                            help="hapus job selesai/gagal (beserta file) yang lebih tua; 0 = tidak")
+
+    def handle(self, *args, **opts):
+        if opts["purge_days"]:
+            n = purge(opts["purge_days"])
+            if n:
+                self.stdout.write(f"{n} job lama dihapus.")
+        while True:
+            close_old_connections()
+            requeue_stale(opts["stale_minutes"])
+            job = claim_next()
+            if job is None:
+                if opts["once"]:
+                    return
+                time.sleep(opts["poll"])
+                continue
+            t0 = time.perf_counter()
+            try:
+                job = run_job(job)
+            except JobSuperseded as e:  # di-requeue saat macet; attempt baru yang menyelesaikan
+                self.stderr.write(self.style.WARNING(str(e)))
+                continue
+            except Exception as e:  # job sudah ditandai failed; worker tetap jalan
+                self.stderr.write(self.style.ERROR(f"{job}: {type(e).__name__}: {e}"))
+                continue
+            self.stdout.write(self.style.SUCCESS(
+                f"{job}: {job.rows_written} baris, {job.file_size} byte, {time.perf_counter() - t0:.1f}s"))
@@ -0,0 +1,56 @@
+import csv
+
+import numpy as np
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from inventory import forecast, summary_cache
+from inventory.models import Product
+from inventory.services import sync_low_stock
+
+
+class Command(BaseCommand):
+    help = ("Proyeksi pemakaian & titik pesan ulang seluruh katalog dari rollup harian: tampilkan yang paling "
+            "mendesak, tulis CSV semua produk (--csv), atau jadikan reorder point sebagai min_stock (--update-min-stock).")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=forecast.DEFAULT_DAYS, help="jendela histori (hari penuh)")
+        parser.add_argument("--lead-time", type=int, default=forecast.DEFAULT_LEAD_TIME, help="lead time pemasok (hari)")
+        parser.add_argument("--review", type=int, default=forecast.DEFAULT_REVIEW, help="periode review/pesan (hari)")
+        parser.add_argument("--service-level", type=float, default=forecast.DEFAULT_SERVICE_LEVEL)
+        parser.add_argument("--limit", type=int, default=20, help="jumlah produk mendesak yang ditampilkan")
+        parser.add_argument("--csv", help="tulis proyeksi semua produk ke file ini")
+        parser.add_argument("--update-min-stock", action="store_true",
+                            help="set min_stock = reorder point untuk produk yang punya pemakaian di jendela")
+
+    def handle(self, *args, **opts):
+        try:
+            fc = forecast.forecast(days=opts["days"], lead_time=opts["lead_time"], review=opts["review"],
+                                   service_level=opts["service_level"])
+        except ValueError as e:
+            raise CommandError(str(e))
+        used = int((fc["avg"] > 0).sum())
+        idx = forecast.urgent(fc)
+        self.stdout.write(f"{len(fc['ids'])} produk, {used} dengan pemakaian {opts['days']} hari terakhir, "
+                          f"{len(idx)} perlu dipesan.")
+        for r in forecast.rows(fc, idx[:opts["limit"]]):
+            self.stdout.write(f"  {r['sku']}: stok {r['on_hand']}, {r['avg']}/hari, cover {r['cover']} hari, "
+                              f"ROP {r['rop']}, pesan {r['suggest']}")
+
+        if opts["csv"]:
+            with open(opts["csv"], "w", newline="", encoding="utf-8") as f:
+                w = csv.writer(f)
+                w.writerow(forecast.EXPORT_HEADER)
+                for row in forecast.export_rows(fc):
+                    w.writerow(row)
+            self.stdout.write(f"CSV: {opts['csv']}")
+
+        if opts["update_min_stock"]:
+            sel = np.flatnonzero((fc["avg"] > 0) & (fc["rop"] != fc["min_stock"]))
+            objs = [Product(pk=int(fc["ids"][i]), min_stock=f"{fc['rop'][i]:.2f}") for i in sel]
+            with transaction.atomic():
+                Product.objects.bulk_update(objs, ["min_stock"], batch_size=1000)
+                sync_low_stock()
+                if objs:
+                    summary_cache.bump()
+            self.stdout.write(self.style.SUCCESS(f"min_stock diperbarui: {len(objs)} produk."))
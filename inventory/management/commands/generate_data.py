@@ -0,0 +1,140 @@
+import math
+import random
+import time
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Case, DecimalField, F, Sum, When
+from django.utils import timezone
+
+from inventory import ledger, partitions, rollup
+from inventory.models import Category, OpeningBalance, Product, Transaction, UoM
+from inventory.services import sync_low_stock
+
+WORDS_A = ["Baut", "Mur", "Kabel", "Pipa", "Lampu", "Saklar", "Cat", "Lem", "Kuas", "Obeng",
+           "Tang", "Kunci", "Engsel", "Paku", "Selang", "Keran", "Stop Kontak", "Fitting", "Ring", "Sekrup"]
+WORDS_B = ["Besi", "Tembaga", "PVC", "Baja", "Kuningan", "Plastik", "Galvanis", "Stainless", "Aluminium"]
+UOMS = ["PCS", "BOX", "ROLL", "METER", "KG", "LITER", "PACK", "SET", "LUSIN", "DUS"]
+
+
+class Command(BaseCommand):
+    help = ("Isi database dengan data sintetis realistis: SKU 'panas' (distribusi Zipf), "
+            "tanggal musiman, OUT tidak pernah membuat stok minus. Untuk benchmark.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--categories", type=int, default=30)
+        parser.add_argument("--uoms", type=int, default=len(UOMS))
+        parser.add_argument("--products", type=int, default=5000)
+        parser.add_argument("--transactions", type=int, default=200_000)
+        parser.add_argument("--days", type=int, default=730, help="rentang riwayat sampai hari ini")
+        parser.add_argument("--zipf", type=float, default=1.1, help="skew popularitas SKU (0 = rata)")
+        parser.add_argument("--out-ratio", type=float, default=0.55, help="porsi transaksi OUT")
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument("--seed", type=int, default=1)
+        parser.add_argument("--prefix", default="GEN", help="prefix nama/SKU agar tidak bentrok data asli")
+
+    def handle(self, *args, **o):
+        rnd = random.Random(o["seed"])
+        prefix = o["prefix"]
+        t0 = time.perf_counter()
+
+        with transaction.atomic():
+            cats = self._masters(Category, [f"{prefix} Kategori {i + 1}" for i in range(o["categories"])])
+            uoms = self._masters(UoM, [f"{prefix}-{UOMS[i % len(UOMS)]}{'' if i < len(UOMS) else i}"
+                                       for i in range(o["uoms"])])
+            products = self._products(rnd, o, cats, uoms)
+            n = self._transactions(rnd, o, products)
+            # bulk_create melewati signal: selaraskan turunan ledger sekali di akhir
+            ledger.recompute()
+            self._sync_on_hand(products)
+        rollup.rebuild()
+        self.stdout.write(self.style.SUCCESS(
+            f"{len(cats)} kategori, {len(uoms)} satuan, {len(products)} produk, {n} transaksi "
+            f"dalam {time.perf_counter() - t0:.1f}s."))
+
+    def _masters(self, model, names):
+        existing = set(model.objects.filter(name__in=names).values_list("name", flat=True))
+        model.objects.bulk_create([model(name=n) for n in names if n not in existing])
+        return list(model.objects.filter(name__in=names).order_by("pk"))
+
+    def _products(self, rnd, o, cats, uoms):
+        prefix = o["prefix"]
+        start = Product.objects.filter(sku__startswith=f"{prefix}-").count()
+        batch = []
+        for i in range(start, start + o["products"]):
+            batch.append(Product(
+                sku=f"{prefix}-{i + 1:07d}",
+                name=f"{rnd.choice(WORDS_A)} {rnd.choice(WORDS_B)} {rnd.randint(1, 120)}mm {prefix}{i + 1}",
+                category=cats[i % len(cats)], uom=rnd.choice(uoms),
+                min_stock=Decimal(rnd.choice([0, 5, 10, 20, 50])), is_active=rnd.random() > 0.05,
+            ))
+        Product.objects.bulk_create(batch, batch_size=o["batch_size"])
+        return list(Product.objects.filter(sku__startswith=f"{prefix}-").order_by("pk"))
+
+    def _transactions(self, rnd, o, products):
+        # bobot Zipf: produk ke-k (acak) mendapat porsi ~ 1/k^s
+        order = list(range(len(products)))
+        rnd.shuffle(order)
+        weights = [0.0] * len(products)
+        for rank, idx in enumerate(order, start=1):
+            weights[idx] = 1 / rank ** o["zipf"] if o["zipf"] else 1.0
+        cum, acc = [], 0.0
+        for w in weights:
+            acc += w
+            cum.append(acc)
+
+        # tanggal musiman: puncak akhir tahun & awal bulan, sepi akhir pekan
+        now = timezone.now()
+        start = now - timedelta(days=o["days"])
+        day_w = []
+        for d in range(o["days"]):
+            day = start + timedelta(days=d)
+            w = 1 + 0.5 * math.sin(2 * math.pi * (day.timetuple().tm_yday - 250) / 365)
+            w *= 1.3 if day.day <= 5 else 1.0
+            w *= 0.3 if day.weekday() >= 5 else 1.0
+            day_w.append(w)
+        if partitions.is_partitioned():
+            # partisi bulanan untuk seluruh rentang tanggal sebelum bulk insert
+            partitions.ensure(since=start)
+        dates = sorted(
+            start + timedelta(days=d, seconds=rnd.randint(6 * 3600, 20 * 3600))
+            for d in rnd.choices(range(o["days"]), weights=day_w, k=o["transactions"])
+        )
+
+        stock = {p.pk: p.qty_on_hand for p in products}
+        picks = rnd.choices(range(len(products)), cum_weights=cum, k=o["transactions"])
+        batch, n = [], 0
+        for trx_date, idx in zip(dates, picks):
+            pid = products[idx].pk
+            qty = Decimal(rnd.randint(1, 40))
+            t_type = Transaction.OUT if rnd.random() < o["out_ratio"] else Transaction.IN
+            if t_type == Transaction.OUT:
+                if stock[pid] <= 0:
+                    t_type = Transaction.IN
+                else:
+                    qty = min(qty, stock[pid])
+            stock[pid] += qty if t_type == Transaction.IN else -qty
+            batch.append(Transaction(product_id=pid, trx_type=t_type, quantity=qty, trx_date=trx_date,
+                                     note="" if rnd.random() < 0.8 else f"PO-{rnd.randint(1000, 99999)}"))
+            if len(batch) >= o["batch_size"]:
+                Transaction.objects.bulk_create(batch)
+                n += len(batch)
+                batch = []
+                self.stdout.write(f"  {n} transaksi...")
+        Transaction.objects.bulk_create(batch)
+        return n + len(batch)
+
+    def _sync_on_hand(self, products):
+        sums = dict(
+            Transaction.objects.filter(product__in=products).order_by().values("product_id")
+            .annotate(s=Sum(Case(When(trx_type=Transaction.IN, then=F("quantity")), default=-F("quantity"),
+                                 output_field=DecimalField(max_digits=14, decimal_places=2))))
+            .values_list("product_id", "s")
+        )
+        opening = dict(OpeningBalance.objects.filter(product__in=products).values_list("product_id", "quantity"))
+        for p in products:
+            p.qty_on_hand = sums.get(p.pk, 0) + opening.get(p.pk, 0)
+        Product.objects.bulk_update(products, ["qty_on_hand"], batch_size=5000)
+        sync_low_stock(Product.objects.filter(pk__in=[p.pk for p in products]))
@@ -0,0 +1,29 @@
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from inventory.importer import COLUMNS, import_rows, read_rows
+
+
+class Command(BaseCommand):
+    help = "Import transaksi massal dari CSV/JSON (kolom: %s)." % ", ".join(COLUMNS)
+
+    def add_arguments(self, parser):
+        parser.add_argument("path")
+        parser.add_argument("--format", choices=["csv", "json"], help="default: dari ekstensi file")
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument("--dry-run", action="store_true", help="validasi saja, tidak menyimpan")
+
+    def handle(self, *args, **opts):
+        path = Path(opts["path"])
+        if not path.exists():
+            raise CommandError(f"File tidak ditemukan: {path}")
+        fmt = opts["format"] or ("json" if path.suffix.lower() == ".json" else "csv")
+        with path.open("rb") as f:
+            rows = read_rows(f, fmt)
+
+        created, errors = import_rows(rows, batch_size=opts["batch_size"], dry_run=opts["dry_run"])
+        for lineno, msg in errors:
+            self.stderr.write(f"baris {lineno}: {msg}")
+        verb = "valid" if opts["dry_run"] else "diposting"
+        self.stdout.write(self.style.SUCCESS(f"{created} baris {verb}, {len(errors)} baris gagal dari {len(rows)}."))
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from inventory import partitions
+
+
+class Command(BaseCommand):
+    help = ("Buat partisi bulanan Transaction yang belum ada s/d --ahead bulan ke depan. "
+            "Jalankan harian (cron).")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--ahead", type=int, default=3, help="jumlah bulan ke depan yang disiapkan")
+        parser.add_argument("--list", action="store_true", help="cetak daftar partisi")
+
+    def handle(self, *args, **opts):
+        if not partitions.is_partitioned():
+            raise CommandError("Tabel Transaction belum dipartisi (butuh Postgres + migrasi 0009).")
+        created = partitions.ensure(ahead=opts["ahead"])
+        for name in created:
+            self.stdout.write(f"  dibuat: {name}")
+        if opts["list"]:
+            for name, lo, hi in partitions.partitions():
+                self.stdout.write(f"  {name}: {lo:%Y-%m-%d} .. {hi:%Y-%m-%d}")
+        closed = partitions.closed_until()
+        self.stdout.write(self.style.SUCCESS(
+            f"{len(created)} partisi baru." + (f" Periode tertutup s/d {timezone.localtime(closed):%Y-%m-%d}." if closed else "")))
@@ -0,0 +1,21 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from inventory import changefeed
+
+
+class Command(BaseCommand):
+    help = ("Hapus baris change feed (StockChange) yang lebih tua dari --days hari. "
+            "Pastikan semua konsumen sudah membaca melewati batas itu.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=30, help="umur minimal baris yang dihapus (hari)")
+
+    def handle(self, *args, **opts):
+        if opts["days"] < 1:
+            raise CommandError("--days minimal 1.")
+        before = timezone.now() - timedelta(days=opts["days"])
+        n = changefeed.prune(before)
+        self.stdout.write(self.style.SUCCESS(f"{n} baris change feed sebelum {timezone.localtime(before):%Y-%m-%d %H:%M} dihapus."))
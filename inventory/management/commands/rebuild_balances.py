@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from inventory.ledger import recompute
+
+
+class Command(BaseCommand):
+    help = "Hitung ulang saldo berjalan (Transaction.balance_after) seluruh ledger."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--product", type=int, action="append", help="batasi ke id produk (boleh berulang)")
+
+    def handle(self, *args, **opts):
+        with transaction.atomic():
+            recompute(opts["product"])
+        self.stdout.write(self.style.SUCCESS("Saldo berjalan dihitung ulang."))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from inventory.rollup import rebuild
+
+
+class Command(BaseCommand):
+    help = "Bangun ulang rollup harian (DailyStock) dari seluruh tabel Transaction."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=5000)
+
+    def handle(self, *args, **opts):
+        n = rebuild(batch_size=opts["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Rollup dibangun ulang: {n} baris."))
@@ -0,0 +1,156 @@
+import json
+import multiprocessing
+import os
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, transaction
+from django.db.models import Case, DecimalField, F, Q, Sum, Value, When
+from django.db.models.functions import Coalesce
+
+from inventory import shards, summary_cache
+from inventory.models import OpeningBalance, Product, StockShard, Transaction
+from inventory.services import sync_low_stock
+
+DEC = DecimalField(max_digits=14, decimal_places=2)
+
+
+def _ledger_sum(prefix=""):
+    return Coalesce(
+        Sum(Case(
+            When(**{f"{prefix}trx_type": Transaction.IN, "then": F(f"{prefix}quantity")}),
+            default=-F(f"{prefix}quantity"), output_field=DEC,
+        )),
+        Value(0), output_field=DEC,
+    )
+
+
+def scan_chunk(bounds):
+    """Worker: produk id [lo, hi) yang stok tepat (qty_on_hand + garis) != jumlah ledger. Satu query per chunk."""
+    lo, hi = bounds
+    try:
+        qs = Product.objects.filter(pk__gte=lo, pk__lt=hi)
+        scanned = qs.count()
+        rows = list(
+            # + saldo awal periode yang sudah diarsip (one-to-one, tidak menggandakan baris)
+            qs.order_by().annotate(ledger=_ledger_sum("transactions__")
+                                   + Coalesce(F("opening_balance__quantity"), Value(0), output_field=DEC),
+                                   on_hand=shards.on_hand_expr())
+            .filter(~Q(ledger=F("on_hand")))
+            .values_list("id", "sku", "on_hand", "ledger")
+        )
+        return lo, scanned, rows
+    finally:
+        connections.close_all()
+
+
+def fix_batch(product_ids):
+    """
+    Samakan stok dgn ledger untuk ``product_ids``; dihitung ulang di bawah row lock.
+    Produk bergaris di-fold dulu (lock eksklusif ditahan sampai commit), garisnya
+    dikosongkan dan seluruh stok masuk qty_on_hand.
+    """
+    with transaction.atomic():
+        striped = list(Product.objects.filter(pk__in=product_ids, shard_count__gt=0).values_list("pk", flat=True))
+        for pid in striped:
+            shards.fold(pid)
+        products = list(Product.objects.select_for_update(no_key=True).filter(pk__in=product_ids).order_by("pk"))
+        sums = dict(
+            Transaction.objects.filter(product_id__in=product_ids).order_by()
+            .values("product_id").annotate(s=_ledger_sum()).values_list("product_id", "s")
+        )
+        opening = dict(OpeningBalance.objects.filter(product_id__in=product_ids)
+                       .values_list("product_id", "quantity"))
+        if striped:
+            # garis diisi lagi oleh jalur lambat shards.apply berikutnya
+            StockShard.objects.filter(product_id__in=striped).update(quantity=0)
+        changed = []
+        for p in products:
+            ledger = sums.get(p.pk, 0) + opening.get(p.pk, 0)
+            if p.qty_on_hand != ledger or p.pk in striped:
+                p.qty_on_hand = ledger
+                changed.append(p)
+        Product.objects.bulk_update(changed, ["qty_on_hand"])
+        sync_low_stock(Product.objects.filter(pk__in=[p.pk for p in changed]))
+        if changed:
+            summary_cache.bump()
+        return len(changed)
+
+
+class Command(BaseCommand):
+    help = ("Rekonsiliasi Product.qty_on_hand terhadap jumlah ledger Transaction "
+            "secara paralel per chunk id produk; opsional memperbaiki selisih.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=os.cpu_count() or 2)
+        parser.add_argument("--chunk-size", type=int, default=5000, help="rentang id produk per chunk")
+        parser.add_argument("--fix", action="store_true", help="perbaiki qty_on_hand yang selisih")
+        parser.add_argument("--fix-batch-size", type=int, default=500)
+        parser.add_argument("--dry-run", action="store_true", help="tidak menulis apa pun (fix & state)")
+        parser.add_argument("--state", default=".reconcile_stock.json", help="file progres untuk --resume")
+        parser.add_argument("--resume", action="store_true", help="lewati chunk yang sudah selesai di --state")
+        parser.add_argument("--limit-report", type=int, default=50, help="maks baris selisih yang dicetak")
+
+    def handle(self, *args, **opts):
+        chunk = opts["chunk_size"]
+        state_path = Path(opts["state"])
+        done = set()
+        if opts["resume"] and state_path.exists():
+            state = json.loads(state_path.read_text())
+            if state.get("chunk_size") != chunk or state.get("fix") != opts["fix"]:
+                raise CommandError(f"--chunk-size/--fix harus sama dengan run sebelumnya "
+                                   f"(chunk_size={state.get('chunk_size')}, fix={state.get('fix')}).")
+            done = set(state.get("done", []))
+
+        lo_id = Product.objects.order_by("pk").values_list("pk", flat=True).first()
+        hi_id = Product.objects.order_by("-pk").values_list("pk", flat=True).first()
+        if lo_id is None:
+            self.stdout.write("Tidak ada produk.")
+            return
+        start = lo_id - lo_id % chunk
+        bounds = [(lo, lo + chunk) for lo in range(start, hi_id + 1, chunk) if lo not in done]
+        total_chunks = len(bounds) + len(done)
+        self.stdout.write(f"{len(bounds)} chunk dijadwalkan ({len(done)} sudah selesai), {opts['workers']} worker.")
+
+        def save_state():
+            if not opts["dry_run"]:
+                state_path.write_text(json.dumps({"chunk_size": chunk, "fix": opts["fix"], "done": sorted(done)}))
+
+        # koneksi parent tidak boleh diwarisi proses anak (fork)
+        connections.close_all()
+        scanned = mismatched = fixed = reported = 0
+        pending = []
+        t0 = time.perf_counter()
+        with multiprocessing.get_context("fork").Pool(opts["workers"]) as pool:
+            for lo, n, rows in pool.imap_unordered(scan_chunk, bounds):
+                scanned += n
+                mismatched += len(rows)
+                for pid, sku, on_hand, ledger in rows:
+                    if reported < opts["limit_report"]:
+                        self.stdout.write(f"  {sku} (#{pid}): on_hand={on_hand} ledger={ledger} "
+                                          f"selisih={on_hand - ledger}")
+                        reported += 1
+                if opts["fix"] and not opts["dry_run"]:
+                    pending.extend(pid for pid, *_ in rows)
+                    while len(pending) >= opts["fix_batch_size"]:
+                        batch, pending = pending[:opts["fix_batch_size"]], pending[opts["fix_batch_size"]:]
+                        fixed += fix_batch(batch)
+                done.add(lo)
+                # chunk dianggap selesai hanya jika fix-nya juga sudah ditulis
+                if not pending:
+                    save_state()
+                elapsed = time.perf_counter() - t0
+                self.stdout.write(
+                    f"[{len(done)}/{total_chunks}] {scanned} produk dicek, {mismatched} selisih, "
+                    f"{scanned / elapsed if elapsed else 0:.0f} produk/s"
+                )
+        if pending:
+            fixed += fix_batch(pending)
+        save_state()
+
+        elapsed = time.perf_counter() - t0
+        summary = f"Selesai {elapsed:.1f}s: {scanned} produk dicek, {mismatched} selisih"
+        if opts["fix"]:
+            summary += " (dry-run, tidak ada yang diubah)" if opts["dry_run"] else f", {fixed} diperbaiki"
+        self.stdout.write(self.style.SUCCESS(summary + "."))
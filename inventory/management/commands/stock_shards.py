@@ -0,0 +1,50 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from inventory import shards
+from inventory.models import Product
+
+
+class Command(BaseCommand):
+    help = ("Counter stok bergaris untuk produk panas: aktifkan (--sku X --shards N), matikan (--sku X --off), "
+            "fold semua produk bergaris (--fold, jalankan berkala) atau tampilkan daftarnya (--list).")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sku", action="append", default=[], help="SKU produk (boleh berulang)")
+        parser.add_argument("--shards", type=int, help=f"jumlah garis (1..{shards.MAX_SHARDS})")
+        parser.add_argument("--off", action="store_true", help="kembalikan ke counter biasa")
+        parser.add_argument("--fold", action="store_true",
+                            help="hitung saldo ledger tertunda, gabung rollup per garis, segarkan low stock")
+        parser.add_argument("--list", action="store_true", help="daftar produk bergaris")
+
+    def handle(self, *args, **opts):
+        if opts["list"]:
+            for sku, n, on_hand in (shards.annotate_on_hand(Product.objects.filter(shard_count__gt=0))
+                                    .order_by("sku").values_list("sku", "shard_count", "on_hand")):
+                self.stdout.write(f"  {sku}: {n} garis, stok {on_hand}")
+            return
+        if opts["fold"] and not opts["sku"]:
+            n = shards.fold_all()
+            self.stdout.write(self.style.SUCCESS(f"{n} produk bergaris di-fold."))
+            return
+        if not opts["sku"]:
+            raise CommandError("--sku wajib (kecuali --fold/--list).")
+        if opts["off"] + (opts["shards"] is not None) + opts["fold"] != 1:
+            raise CommandError("Pilih salah satu: --shards N, --off, atau --fold.")
+        products = dict(Product.objects.filter(sku__in=opts["sku"]).values_list("sku", "pk"))
+        missing = set(opts["sku"]) - set(products)
+        if missing:
+            raise CommandError(f"SKU tidak ditemukan: {', '.join(sorted(missing))}")
+        for sku, pid in sorted(products.items()):
+            if opts["off"]:
+                shards.disable(pid)
+                self.stdout.write(f"  {sku}: counter biasa")
+            elif opts["shards"] is not None:
+                try:
+                    shards.enable(pid, opts["shards"])
+                except ValueError as e:
+                    raise CommandError(str(e))
+                self.stdout.write(f"  {sku}: {opts['shards']} garis")
+            else:
+                shards.fold(pid)
+                self.stdout.write(f"  {sku}: di-fold")
+        self.stdout.write(self.style.SUCCESS("Selesai."))
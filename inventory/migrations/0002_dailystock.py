@@ -0,0 +1,49 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:49
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Sum
+from django.db.models.functions import TruncDate
+
+
+def populate_rollup(apps, schema_editor):
+    Transaction = apps.get_model('inventory', 'Transaction')
+    DailyStock = apps.get_model('inventory', 'DailyStock')
+    rows = (
+        Transaction.objects.order_by()
+        .annotate(day=TruncDate('trx_date'))
+        .values('product_id', 'day', 'trx_type')
+        .annotate(q=Sum('quantity'))
+    )
+    batch = []
+    for r in rows.iterator(chunk_size=5000):
+        batch.append(DailyStock(product_id=r['product_id'], day=r['day'], trx_type=r['trx_type'], quantity=r['q']))
+        if len(batch) >= 5000:
+            DailyStock.objects.bulk_create(batch)
+            batch = []
+    DailyStock.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyStock',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('trx_type', models.CharField(choices=[('IN', 'Masuk'), ('OUT', 'Keluar')], max_length=3)),
+                ('quantity', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_stock', to='inventory.product')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['day'], name='dailystock_day_idx')],
+                'constraints': [models.UniqueConstraint(fields=('product', 'day', 'trx_type'), name='dailystock_product_day_type_uniq')],
+            },
+        ),
+        migrations.RunPython(populate_rollup, migrations.RunPython.noop),
+    ]
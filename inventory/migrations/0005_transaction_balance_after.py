@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:58
+
+from django.db import migrations, models
+
+
+def populate_balances(apps, schema_editor):
+    Transaction = apps.get_model('inventory', 'Transaction')
+    table = schema_editor.quote_name(Transaction._meta.db_table)
+    schema_editor.execute(
+        f"UPDATE {table} SET balance_after = s.bal FROM ("
+        f" SELECT id, SUM(CASE WHEN trx_type = 'IN' THEN quantity ELSE -quantity END)"
+        f" OVER (PARTITION BY product_id ORDER BY trx_date, id) AS bal FROM {table}"
+        f") s WHERE {table}.id = s.id"
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0004_product_trigram_search'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='transaction',
+            name='balance_after',
+            field=models.DecimalField(decimal_places=2, default=0, editable=False, max_digits=14),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['product', 'trx_date', 'id'], name='trx_product_date_id_idx'),
+        ),
+        migrations.RemoveIndex(
+            model_name='transaction',
+            name='trx_product_date_idx',
+        ),
+        migrations.RunPython(populate_balances, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:20
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0005_transaction_balance_after'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExportJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('kind', models.CharField(choices=[('summary', 'Ringkasan per produk'), ('detail', 'Detail transaksi')], max_length=10)),
+                ('filters', models.JSONField(default=dict)),
+                ('filter_key', models.CharField(max_length=64)),
+                ('watermark', models.CharField(blank=True, max_length=128)),
+                ('status', models.CharField(choices=[('queued', 'Antre'), ('running', 'Berjalan'), ('done', 'Selesai'), ('failed', 'Gagal')], default='queued', max_length=10)),
+                ('rows_total', models.PositiveBigIntegerField(blank=True, null=True)),
+                ('rows_written', models.PositiveBigIntegerField(default=0)),
+                ('file_path', models.CharField(blank=True, max_length=500)),
+                ('file_size', models.PositiveBigIntegerField(default=0)),
+                ('error', models.TextField(blank=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('requested_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['filter_key', 'status'], name='exportjob_key_status_idx'), models.Index(condition=models.Q(('status', 'queued')), fields=['created_at'], name='exportjob_queued_idx')],
+            },
+        ),
+    ]
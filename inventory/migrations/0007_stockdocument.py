@@ -0,0 +1,47 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:22
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0006_exportjob'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StockDocument',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('number', models.CharField(max_length=50, unique=True, verbose_name='Nomor')),
+                ('doc_type', models.CharField(choices=[('IN', 'Masuk'), ('OUT', 'Keluar')], max_length=3, verbose_name='Jenis')),
+                ('doc_date', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Tanggal')),
+                ('note', models.CharField(blank=True, max_length=255, verbose_name='Catatan')),
+                ('line_count', models.PositiveIntegerField(default=0)),
+                ('posted_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-doc_date', '-id'],
+            },
+        ),
+        migrations.AddField(
+            model_name='transaction',
+            name='document',
+            field=models.ForeignKey(blank=True, db_index=False, editable=False, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='lines', to='inventory.stockdocument'),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(condition=models.Q(('document__isnull', False)), fields=['document'], name='trx_document_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='stockdocument',
+            index=models.Index(fields=['doc_date', 'id'], name='stockdoc_date_id_idx'),
+        ),
+    ]
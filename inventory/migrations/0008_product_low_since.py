@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:25
+
+import django.utils.timezone
+from django.db import migrations, models
+from django.db.models import F
+
+
+def populate_low_since(apps, schema_editor):
+    # waktu transisi sebenarnya tidak diketahui: produk yang sudah low dianggap low sejak migrasi
+    Product = apps.get_model('inventory', 'Product')
+    Product.objects.filter(qty_on_hand__lt=F('min_stock')).update(low_since=django.utils.timezone.now())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0007_stockdocument'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='product',
+            name='product_low_stock_idx',
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='low_since',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(populate_low_since, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(condition=models.Q(('low_since__isnull', False)), fields=['is_active', 'name', 'id'], name='product_low_stock_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(condition=models.Q(('is_active', True), ('low_since__isnull', False)), fields=['low_since'], name='product_low_since_idx'),
+        ),
+    ]
@@ -0,0 +1,100 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:29
+
+from datetime import datetime
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.utils import timezone
+
+TABLE = 'inventory_transaction'
+OLD = 'inventory_transaction_unpartitioned'
+MONTHS_AHEAD = 3
+
+
+def _month(dt):
+    local = timezone.localtime(dt)
+    return timezone.make_aware(datetime(local.year, local.month, 1))
+
+
+def _next_month(m):
+    return timezone.make_aware(datetime(m.year + m.month // 12, m.month % 12 + 1, 1))
+
+
+def _rebuild(schema_editor, partitioned):
+    """
+    Salin tabel Transaction ke tabel baru (dipartisi per bulan trx_date atau biasa).
+    Index & FK dibuat ulang dari definisi lama; identity diganti sequence biasa
+    karena Postgres < 17 tidak mendukung identity di tabel partisi. PK tabel
+    partisi = (id, trx_date) (kolom partisi wajib ada di PK); id tetap unik dari sequence.
+    Tanpa partisi DEFAULT (lihat inventory.partitions): bulan pertama data s/d
+    bulan terakhir data atau ``MONTHS_AHEAD`` bulan ke depan (mana yang lebih jauh)
+    dibuat di sini, sisanya oleh ``manage_partitions``.
+    """
+    ex = schema_editor.execute
+    with schema_editor.connection.cursor() as cur:
+        cur.execute("SELECT indexdef FROM pg_indexes WHERE schemaname = current_schema() "
+                    "AND tablename = %s AND indexname <> %s", [TABLE, TABLE + '_pkey'])
+        index_defs = [r[0] for r in cur.fetchall()]
+        cur.execute("SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+                    "WHERE conrelid = %s::regclass AND contype = 'f'", [TABLE])
+        fks = cur.fetchall()
+        cur.execute(f"SELECT min(trx_date), max(trx_date), COALESCE(max(id), 0) + 1 FROM {TABLE}")
+        first, newest, next_id = cur.fetchone()
+
+    ex(f'ALTER TABLE {TABLE} RENAME TO {OLD}')
+    if partitioned:
+        ex(f'CREATE TABLE {TABLE} (LIKE {OLD} INCLUDING DEFAULTS) PARTITION BY RANGE (trx_date)')
+        m, last = _month(first or timezone.now()), _month(timezone.now())
+        for _ in range(MONTHS_AHEAD):
+            last = _next_month(last)
+        # transaksi bertanggal jauh ke depan juga harus punya partisi, kalau tidak INSERT di bawah gagal
+        if newest:
+            last = max(last, _month(newest))
+        while m <= last:
+            hi = _next_month(m)
+            ex(f"CREATE TABLE {TABLE}_p{m:%Y%m} PARTITION OF {TABLE} "
+               f"FOR VALUES FROM ('{m.isoformat()}') TO ('{hi.isoformat()}')")
+            m = hi
+    else:
+        ex(f'CREATE TABLE {TABLE} (LIKE {OLD} INCLUDING DEFAULTS)')
+    ex(f'INSERT INTO {TABLE} SELECT * FROM {OLD}')
+    ex(f'DROP TABLE {OLD} CASCADE')
+
+    ex(f'CREATE SEQUENCE {TABLE}_id_seq OWNED BY {TABLE}.id')
+    ex(f"SELECT setval('{TABLE}_id_seq', {next_id}, false)")
+    ex(f"ALTER TABLE {TABLE} ALTER COLUMN id SET DEFAULT nextval('{TABLE}_id_seq')")
+    ex(f'ALTER TABLE {TABLE} ADD PRIMARY KEY ({"id, trx_date" if partitioned else "id"})')
+    for d in index_defs:
+        ex(d)
+    for name, d in fks:
+        ex(f'ALTER TABLE {TABLE} ADD CONSTRAINT {name} {d}')
+    ex(f'ANALYZE {TABLE}')
+
+
+def partition(apps, schema_editor):
+    _rebuild(schema_editor, partitioned=True)
+
+
+def unpartition(apps, schema_editor):
+    # arsip (OpeningBalance) tidak dikembalikan; partisi yang sudah di-detach tetap tabel terpisah
+    _rebuild(schema_editor, partitioned=False)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0008_product_low_since'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OpeningBalance',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('as_of', models.DateTimeField()),
+                ('quantity', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('product', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='opening_balance', to='inventory.product')),
+            ],
+        ),
+        migrations.RunPython(partition, unpartition),
+    ]
@@ -0,0 +1,17 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0009_transaction_partitioning'),
+    ]
+
+    operations = [
+        # versi ledger untuk cache ringkasan (inventory.summary_cache); sequence: tanpa row lock antar writer.
+        # setval: last_value langsung "terpakai", jadi nextval pertama sudah mengubah versi yang terbaca
+        migrations.RunSQL(
+            ["CREATE SEQUENCE inventory_ledger_version", "SELECT setval('inventory_ledger_version', 1)"],
+            'DROP SEQUENCE inventory_ledger_version',
+        ),
+    ]
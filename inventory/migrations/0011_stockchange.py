@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:47
+
+import django.utils.timezone
+import inventory.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0010_ledger_version_sequence'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StockChange',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('txid', models.BigIntegerField(db_default=inventory.models.CurrentTxid(), editable=False)),
+                ('action', models.CharField(choices=[('C', 'Dibuat'), ('U', 'Diubah'), ('D', 'Dihapus')], max_length=1)),
+                ('trx_id', models.BigIntegerField()),
+                ('product_id', models.BigIntegerField()),
+                ('trx_type', models.CharField(choices=[('IN', 'Masuk'), ('OUT', 'Keluar')], max_length=3)),
+                ('quantity', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('trx_date', models.DateTimeField()),
+                ('note', models.CharField(blank=True, max_length=255)),
+                ('document_id', models.BigIntegerField(blank=True, null=True)),
+                ('changed_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'ordering': ['txid', 'id'],
+                'indexes': [models.Index(fields=['txid', 'id'], name='stockchange_txid_id_idx'), models.Index(fields=['changed_at'], name='stockchange_changed_at_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,65 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:57
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0011_stockchange'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StockShard',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('shard', models.PositiveSmallIntegerField()),
+                ('quantity', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('updated_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+        migrations.RemoveConstraint(
+            model_name='dailystock',
+            name='dailystock_product_day_type_uniq',
+        ),
+        migrations.AddField(
+            model_name='dailystock',
+            name='shard',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='shard_count',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.AlterField(
+            model_name='transaction',
+            name='balance_after',
+            field=models.DecimalField(decimal_places=2, default=0, editable=False, max_digits=14, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(condition=models.Q(('balance_after__isnull', True)), fields=['product', 'trx_date', 'id'], name='trx_pending_balance_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='dailystock',
+            constraint=models.UniqueConstraint(fields=('product', 'day', 'trx_type', 'shard'), name='dailystock_product_day_type_shard_uniq'),
+        ),
+        migrations.AddField(
+            model_name='stockshard',
+            name='product',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stock_shards', to='inventory.product'),
+        ),
+        migrations.AddConstraint(
+            model_name='stockshard',
+            constraint=models.UniqueConstraint(fields=('product', 'shard'), name='stockshard_product_shard_uniq'),
+        ),
+        # garis di-UPDATE terus-menerus: sisakan ruang per page supaya jadi HOT update (kolom yang berubah tidak ber-index)
+        migrations.RunSQL(
+            'ALTER TABLE inventory_stockshard SET (fillfactor = 50)',
+            'ALTER TABLE inventory_stockshard RESET (fillfactor)',
+        ),
+    ]
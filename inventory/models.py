@@ -1,6 +1,12 @@
-from django.db import models
+from django.conf import settings
+from django.db import IntegrityError, models
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.db.models.functions import Upper
+from django.db.transaction import atomic
 from django.core.exceptions import ValidationError
 from django.utils import timezone
+CLOSED_PERIOD_MSG='Periode transaksi ini sudah ditutup (diarsip).'
+INSUFFICIENT_STOCK_MSG='Stok tidak cukup untuk transaksi keluar.'
 class TimeStampedModel(models.Model):
     created_at=models.DateTimeField(auto_now_add=True)
     updated_at=models.DateTimeField(auto_now=True)
@@ -20,9 +26,35 @@ class Product(TimeStampedModel):
     min_stock=models.DecimalField(max_digits=12, decimal_places=2, default=0)
     is_active=models.BooleanField(default=True)
     qty_on_hand=models.DecimalField(max_digits=12, decimal_places=2, default=0)
-    class Meta: ordering=['name']
+    # sejak kapan qty_on_hand < min_stock (None = tidak low); dijaga di UPDATE stok yang sama (services.apply_deltas) & save()
+    low_since=models.DateTimeField(null=True, blank=True, editable=False)
+    # >0 = produk panas dengan counter stok bergaris: stok = qty_on_hand + SUM(StockShard) (inventory.shards)
+    shard_count=models.PositiveSmallIntegerField(default=0, editable=False)
+    class Meta:
+        ordering=['name']
+        indexes=[
+            # ProductList ?low=1 & KPI low stock: set kecil produk low (is_active sbg kolom agar KPI index-only)
+            models.Index(fields=['is_active','name','id'], condition=models.Q(low_since__isnull=False), name='product_low_stock_idx'),
+            # feed "baru saja low": urut low_since terbaru
+            models.Index(fields=['low_since'], condition=models.Q(low_since__isnull=False, is_active=True), name='product_low_since_idx'),
+            models.Index(fields=['category','name'], name='product_category_name_idx'),
+            # pg_trgm atas UPPER(col): cocok dengan SQL icontains Django (UPPER(col) LIKE UPPER('%q%')) & operator %
+            GinIndex(OpClass(Upper('sku'), name='gin_trgm_ops'), name='product_sku_trgm_idx'),
+            GinIndex(OpClass(Upper('name'), name='gin_trgm_ops'), name='product_name_trgm_idx'),
+        ]
+    def current_on_hand(self):
+        if not self.shard_count: return self.qty_on_hand
+        return self.qty_on_hand + (self.stock_shards.aggregate(s=models.Sum('quantity'))['s'] or 0)
+    def save(self, *args, **kwargs):
+        low=self.current_on_hand() < self.min_stock
+        self.low_since=(self.low_since or timezone.now()) if low else None
+        update_fields=kwargs.get('update_fields')
+        if update_fields is not None and {'qty_on_hand','min_stock'} & set(update_fields):
+            kwargs['update_fields']=[*update_fields,'low_since']
+        super().save(*args, **kwargs)
     def __str__(self): return f"{self.sku} - {self.name}"
 class Transaction(TimeStampedModel):
+    # tabel dipartisi per bulan trx_date tanpa partisi DEFAULT (migrasi 0009, inventory.partitions); PK DB = (id, trx_date)
     IN, OUT='IN','OUT'
     TYPE_CHOICES=[(IN,'Masuk'),(OUT,'Keluar')]
     product=models.ForeignKey(Product,on_delete=models.CASCADE,related_name='transactions')
@@ -30,20 +62,157 @@ class Transaction(TimeStampedModel):
     quantity=models.DecimalField(max_digits=12, decimal_places=2)
     note=models.CharField(max_length=255, blank=True)
     trx_date=models.DateTimeField(default=timezone.now)
-    class Meta: ordering=['-trx_date','-id']
+    # baris dokumen multi-baris (inventory.documents); None = transaksi satuan
+    document=models.ForeignKey('StockDocument', null=True, blank=True, on_delete=models.PROTECT, related_name='lines', editable=False, db_index=False)
+    # stok produk setelah baris ini (urut trx_date, id); dijaga inventory.ledger. NULL = belum dihitung (produk bergaris, ledger.defer)
+    balance_after=models.DecimalField(max_digits=14, decimal_places=2, default=0, null=True, editable=False)
+    class Meta:
+        ordering=['-trx_date','-id']
+        indexes=[
+            # laporan per produk/kategori dalam rentang tanggal + lookup saldo per tanggal (ledger)
+            models.Index(fields=['product','trx_date','id'], name='trx_product_date_id_idx'),
+            # rentang tanggal global + urutan default (-trx_date,-id) via backward scan
+            models.Index(fields=['trx_date','id'], name='trx_date_id_idx'),
+            # hanya baris dokumen; transaksi satuan (document NULL) tidak menambah beban index
+            models.Index(fields=['document'], condition=models.Q(document__isnull=False), name='trx_document_idx'),
+            # saldo tertunda produk bergaris: kosong untuk produk biasa
+            models.Index(fields=['product','trx_date','id'], condition=models.Q(balance_after__isnull=True), name='trx_pending_balance_idx'),
+        ]
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        inst=super().from_db(db, field_names, values)
+        # snapshot nilai saat dimuat: clean() tidak perlu query ulang baris lama
+        inst._loaded=dict(zip(field_names, values))
+        return inst
+    def save(self, *args, **kwargs):
+        # simpan + update stok (signal) dalam satu transaksi DB
+        try:
+            with atomic(): super().save(*args, **kwargs)
+        except IntegrityError as e:
+            diag=getattr(e.__cause__,'diag',None)
+            if 'no partition of relation' not in (getattr(diag,'message_primary',None) or ''): raise
+            # bulan trx_date belum punya partisi: buat lalu ulangi (bulan tertutup/arsip ditolak)
+            from .partitions import create_partition
+            try: create_partition(self.trx_date)
+            except ValueError as err: raise ValidationError(str(err))
+            with atomic(): super().save(*args, **kwargs)
+    def delete(self, *args, **kwargs):
+        with atomic(): return super().delete(*args, **kwargs)
     def clean(self):
         if self.quantity<=0: raise ValidationError('Quantity harus > 0')
-        current=self.product.qty_on_hand
-        if self.pk:
-            try:
-                old=Transaction.objects.get(pk=self.pk)
-                old_delta=old.quantity if old.trx_type==self.IN else -old.quantity
-                current=current - old_delta
-            except Transaction.DoesNotExist:
-                pass
+        # pre-check ramah-form; pengecekan final ada di UPDATE bersyarat (services.apply_deltas)
+        current=self.product.current_on_hand()
+        loaded=getattr(self,'_loaded',None)
+        if self.pk and loaded and loaded.get('product_id')==self.product_id:
+            old_qty=loaded['quantity']
+            current=current - (old_qty if loaded['trx_type']==self.IN else -old_qty)
         delta=self.quantity if self.trx_type==self.IN else -self.quantity
         if current + delta < 0:
-            raise ValidationError('Stok tidak cukup untuk transaksi keluar.')
+            raise ValidationError(INSUFFICIENT_STOCK_MSG)
     def __str__(self):
         sign='+' if self.trx_type==self.IN else '-'
         return f"{self.trx_date:%Y-%m-%d} {sign}{self.quantity} {self.product}"
+class DailyStock(models.Model):
+    """Rollup harian per produk & arah (IN/OUT), dijaga inkremental oleh inventory.rollup."""
+    product=models.ForeignKey(Product,on_delete=models.CASCADE,related_name='daily_stock')
+    day=models.DateField()
+    trx_type=models.CharField(max_length=3, choices=Transaction.TYPE_CHOICES)
+    # produk bergaris menulis ke baris per garis (hindari satu baris panas); query selalu SUM
+    shard=models.PositiveSmallIntegerField(default=0)
+    quantity=models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    class Meta:
+        constraints=[models.UniqueConstraint(fields=['product','day','trx_type','shard'], name='dailystock_product_day_type_shard_uniq')]
+        indexes=[models.Index(fields=['day'], name='dailystock_day_idx')]
+    def __str__(self): return f"{self.day:%Y-%m-%d} {self.trx_type} {self.quantity} #{self.product_id}"
+class ExportJob(TimeStampedModel):
+    """Export CSV besar yang dikerjakan worker lokal (command export_worker), hasil .csv.gz di EXPORT_ROOT."""
+    QUEUED, RUNNING, DONE, FAILED='queued','running','done','failed'
+    STATUS_CHOICES=[(QUEUED,'Antre'),(RUNNING,'Berjalan'),(DONE,'Selesai'),(FAILED,'Gagal')]
+    KIND_CHOICES=[('summary','Ringkasan per produk'),('detail','Detail transaksi')]
+    kind=models.CharField(max_length=10, choices=KIND_CHOICES)
+    filters=models.JSONField(default=dict)
+    # hash(kind, filters): job dgn filter sama + watermark ledger sama dipakai ulang
+    filter_key=models.CharField(max_length=64)
+    watermark=models.CharField(max_length=128, blank=True)
+    status=models.CharField(max_length=10, choices=STATUS_CHOICES, default=QUEUED)
+    rows_total=models.PositiveBigIntegerField(null=True, blank=True)
+    rows_written=models.PositiveBigIntegerField(default=0)
+    # naik tiap klaim worker; worker lama (job di-requeue) tidak boleh menulis/menyelesaikan lagi
+    attempt=models.PositiveIntegerField(default=0)
+    file_path=models.CharField(max_length=500, blank=True)
+    file_size=models.PositiveBigIntegerField(default=0)
+    error=models.TextField(blank=True)
+    requested_by=models.ForeignKey(settings.AUTH_USER_MODEL, null=True, blank=True, on_delete=models.SET_NULL, related_name='+')
+    started_at=models.DateTimeField(null=True, blank=True)
+    finished_at=models.DateTimeField(null=True, blank=True)
+    class Meta:
+        ordering=['-created_at']
+        indexes=[
+            models.Index(fields=['filter_key','status'], name='exportjob_key_status_idx'),
+            # antrean worker: job queued tertua
+            models.Index(fields=['created_at'], condition=models.Q(status='queued'), name='exportjob_queued_idx'),
+        ]
+    @property
+    def progress(self):
+        if self.status==self.DONE: return 100
+        if not self.rows_total: return 0
+        return min(99, int(self.rows_written*100/self.rows_total))
+    def __str__(self): return f"Export {self.kind} #{self.pk} ({self.status})"
+class StockDocument(TimeStampedModel):
+    """Dokumen penerimaan/pengeluaran barang; barisnya Transaction (document=self), diposting sekaligus oleh inventory.documents."""
+    number=models.CharField('Nomor', max_length=50, unique=True)
+    doc_type=models.CharField('Jenis', max_length=3, choices=Transaction.TYPE_CHOICES)
+    doc_date=models.DateTimeField('Tanggal', default=timezone.now)
+    note=models.CharField('Catatan', max_length=255, blank=True)
+    line_count=models.PositiveIntegerField(default=0)
+    posted_by=models.ForeignKey(settings.AUTH_USER_MODEL, null=True, blank=True, on_delete=models.SET_NULL, related_name='+')
+    class Meta:
+        ordering=['-doc_date','-id']
+        indexes=[models.Index(fields=['doc_date','id'], name='stockdoc_date_id_idx')]
+    def __str__(self): return self.number
+class OpeningBalance(models.Model):
+    """Saldo awal per produk dari periode yang sudah diarsip (command archive_transactions); ledger dihitung di atasnya."""
+    product=models.OneToOneField(Product,on_delete=models.CASCADE,related_name='opening_balance')
+    # transaksi dengan trx_date < as_of sudah dipindah ke arsip
+    as_of=models.DateTimeField()
+    quantity=models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    def __str__(self): return f"{self.product_id} {self.quantity} @ {self.as_of:%Y-%m-%d}"
+class CurrentTxid(models.Func):
+    """xid transaksi DB yang sedang berjalan (Postgres 13+) sebagai bigint."""
+    template='pg_current_xact_id()::text::bigint'
+    output_field=models.BigIntegerField()
+class StockChange(models.Model):
+    """
+    Outbox append-only perubahan Transaction (inventory.changefeed): ditulis di transaksi DB
+    yang sama dengan perubahannya, dibaca incremental lewat cursor (txid, id).
+    """
+    CREATED, UPDATED, DELETED='C','U','D'
+    ACTION_CHOICES=[(CREATED,'Dibuat'),(UPDATED,'Diubah'),(DELETED,'Dihapus')]
+    id=models.BigAutoField(primary_key=True)
+    txid=models.BigIntegerField(db_default=CurrentTxid(), editable=False)
+    action=models.CharField(max_length=1, choices=ACTION_CHOICES)
+    # tanpa FK: transaksi/produk boleh sudah dihapus atau diarsip; isi = keadaan baris sesudah perubahan (hapus: terakhir)
+    trx_id=models.BigIntegerField()
+    product_id=models.BigIntegerField()
+    trx_type=models.CharField(max_length=3, choices=Transaction.TYPE_CHOICES)
+    quantity=models.DecimalField(max_digits=12, decimal_places=2)
+    trx_date=models.DateTimeField()
+    note=models.CharField(max_length=255, blank=True)
+    document_id=models.BigIntegerField(null=True, blank=True)
+    changed_at=models.DateTimeField(default=timezone.now)
+    class Meta:
+        ordering=['txid','id']
+        indexes=[
+            models.Index(fields=['txid','id'], name='stockchange_txid_id_idx'),
+            models.Index(fields=['changed_at'], name='stockchange_changed_at_idx'),
+        ]
+    def __str__(self): return f"{self.get_action_display()} trx #{self.trx_id} ({self.txid}-{self.id})"
+class StockShard(models.Model):
+    """Satu garis counter stok produk panas (inventory.shards); writer berbeda meng-UPDATE garis berbeda."""
+    product=models.ForeignKey(Product,on_delete=models.CASCADE,related_name='stock_shards')
+    shard=models.PositiveSmallIntegerField()
+    quantity=models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    updated_at=models.DateTimeField(default=timezone.now)
+    class Meta:
+        constraints=[models.UniqueConstraint(fields=['product','shard'], name='stockshard_product_shard_uniq')]
+    def __str__(self): return f"#{self.product_id}/{self.shard}: {self.quantity}"
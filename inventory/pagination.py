@@ -0,0 +1,131 @@
+# inventory/pagination.py
+"""
+Keyset (cursor) pagination untuk ListView.
+
+Halaman berikut/sebelum diambil dengan ``WHERE (key, id) > cursor ORDER BY key, id
+LIMIT n+1`` — tidak ada OFFSET dan tidak ada COUNT(*), jadi latensi halaman
+ke-50.000 sama dengan halaman pertama (selama ada index di (key, id)).
+Total baris opsional diambil dari estimasi planner Postgres.
+``EstimatedCountPaginator`` = paginator admin yang memakai estimasi yang sama.
+"""
+import base64
+import json
+
+from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator
+from django.db import connection
+from django.db.models import Q
+from django.utils.functional import cached_property
+from django.utils.http import urlencode
+
+
+def estimate_count(qs):
+    """Perkiraan jumlah baris ``qs`` dari planner (Postgres); DB lain fallback ke COUNT."""
+    if connection.vendor != "postgresql":
+        return qs.count()
+    plan = json.loads(qs.order_by().explain(format="json"))
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator OFFSET (admin) untuk tabel besar: COUNT(*) persis hanya jika estimasi
+    planner di bawah ``exact_limit``; di atasnya jumlah halaman dari estimasi
+    (halaman terakhir bisa kosong / sedikit meleset, seperti total di list keyset).
+    """
+    exact_limit = 10_000
+
+    @cached_property
+    def count(self):
+        est = estimate_count(self.object_list)
+        return self.object_list.count() if est < self.exact_limit else est
+
+
+class KeysetPage:
+    def __init__(self, object_list, has_next, has_previous, next_cursor, prev_cursor, estimated_total=None):
+        self.object_list = object_list
+        self.has_next = has_next
+        self.has_previous = has_previous
+        self.next_cursor = next_cursor
+        self.prev_cursor = prev_cursor
+        self.estimated_total = estimated_total
+
+    def has_other_pages(self):
+        return self.has_next or self.has_previous
+
+
+class KeysetPaginationMixin:
+    """
+    Ganti OFFSET pagination bawaan ListView.
+
+    ``keyset_field`` = kolom urut utama; ``keyset_desc`` = arah urut. ``id`` selalu
+    jadi tie-breaker. Query string: ``?after=<cursor>`` / ``?before=<cursor>``,
+    filter lain tetap dibawa di URL next/prev.
+    """
+    keyset_field = None
+    keyset_desc = False
+    with_estimated_total = True
+
+    def _encode(self, obj):
+        raw = json.dumps([str(getattr(obj, self.keyset_field)), obj.pk])
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+    def _decode(self, cursor):
+        try:
+            raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+            value, pk = json.loads(raw)
+            field = self.model._meta.get_field(self.keyset_field)
+            return field.to_python(value), int(pk)
+        except (ValueError, TypeError, ValidationError):
+            return None
+
+    def _seek(self, qs, key, forward):
+        value, pk = key
+        f = self.keyset_field
+        # forward & urut naik: (f, id) > key. Kondisi f >= value dipisah agar jadi range scan index.
+        up = forward != self.keyset_desc
+        if up:
+            return qs.filter(**{f"{f}__gte": value}).filter(Q(**{f"{f}__gt": value}) | Q(pk__gt=pk))
+        return qs.filter(**{f"{f}__lte": value}).filter(Q(**{f"{f}__lt": value}) | Q(pk__lt=pk))
+
+    def _ordered(self, qs, forward):
+        up = forward != self.keyset_desc
+        prefix = "" if up else "-"
+        return qs.order_by(f"{prefix}{self.keyset_field}", f"{prefix}pk")
+
+    def paginate_queryset(self, queryset, page_size):
+        after = self.request.GET.get("after")
+        before = self.request.GET.get("before")
+        key = self._decode(after or before) if (after or before) else None
+        # cursor rusak/basi -> halaman pertama (bukan halaman terakhir lewat arah mundur)
+        forward = not (before and key)
+
+        qs = self._ordered(queryset, forward)
+        if key:
+            qs = self._seek(qs, key, forward)
+        rows = list(qs[: page_size + 1])
+        more = len(rows) > page_size
+        rows = rows[:page_size]
+        if not forward:
+            rows.reverse()
+
+        if forward:
+            has_next, has_prev = more, bool(key)
+        else:
+            has_next, has_prev = bool(key), more
+        page = KeysetPage(
+            rows, has_next, has_prev,
+            next_cursor=self._encode(rows[-1]) if rows and has_next else None,
+            prev_cursor=self._encode(rows[0]) if rows and has_prev else None,
+            estimated_total=estimate_count(queryset) if self.with_estimated_total else None,
+        )
+        return None, page, rows, page.has_other_pages()
+
+    def get_context_data(self, **kwargs):
+        ctx = super().get_context_data(**kwargs)
+        page = ctx.get("page_obj")
+        if isinstance(page, KeysetPage):
+            params = {k: v for k, v in self.request.GET.items() if k not in ("after", "before", "page")}
+            ctx["next_url"] = f"?{urlencode({**params, 'after': page.next_cursor})}" if page.next_cursor else None
+            ctx["prev_url"] = f"?{urlencode({**params, 'before': page.prev_cursor})}" if page.prev_cursor else None
+        return ctx
@@ -0,0 +1,168 @@
+# inventory/partitions.py
+"""
+Partisi range bulanan tabel Transaction per ``trx_date`` (Postgres, migrasi 0009).
+
+Batas partisi = awal bulan waktu lokal (TIME_ZONE), selaras dengan hari rollup.
+Query yang memfilter ``trx_date`` (laporan, export, ledger) hanya menyentuh
+partisi bulan yang relevan (partition pruning). Sengaja TANPA partisi DEFAULT:
+dengan DEFAULT, lookup "baris terakhir sebelum D" (stok per tanggal) jadi
+Merge Append ke semua partisi; tanpa DEFAULT Postgres memakai Append berurutan
+dan berhenti di partisi pertama yang punya baris.
+
+Konsekuensinya setiap bulan yang ditulis harus sudah punya partisi:
+``ensure()`` (command ``manage_partitions``, jalankan harian) menyiapkan bulan
+ke depan, jalur massal (import, dokumen) memanggil ``cover()`` dulu, dan
+``Transaction.save`` membuat partisi yang kurang lalu mengulang insert.
+
+Arsip: ``archive(before)`` menutup periode < ``before``. Saldo bersih per produk
+ditambahkan ke ``OpeningBalance`` (ledger, stok per tanggal & rekonsiliasi
+menghitung di atasnya) dan partisi lama di-DETACH jadi tabel arsip biasa (atau
+di-DROP). Bulan tertutup tidak dibuatkan partisi lagi, jadi posting ke sana
+ditolak. Rollup harian (DailyStock) periode tertutup tetap disimpan.
+"""
+import re
+from datetime import datetime
+
+from django.db import connection, transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from . import summary_cache
+from .models import CLOSED_PERIOD_MSG, OpeningBalance, Transaction
+
+PARENT = Transaction._meta.db_table
+_BOUND = re.compile(r"FROM \('([^']+)'\) TO \('([^']+)'\)")
+
+
+def qn(name):
+    return connection.ops.quote_name(name)
+
+
+def month_start(dt):
+    local = timezone.localtime(dt) if timezone.is_aware(dt) else dt
+    return timezone.make_aware(datetime(local.year, local.month, 1))
+
+
+def add_months(m, n):
+    y, mo = divmod(m.month - 1 + n, 12)
+    return timezone.make_aware(datetime(m.year + y, mo + 1, 1))
+
+
+def partition_name(month):
+    return f"{PARENT}_p{month:%Y%m}"
+
+
+def is_partitioned():
+    if connection.vendor != "postgresql":
+        return False
+    with connection.cursor() as cur:
+        cur.execute("SELECT relkind FROM pg_class WHERE oid = to_regclass(%s)", [PARENT])
+        row = cur.fetchone()
+    return bool(row) and row[0] == "p"
+
+
+def partitions():
+    """[(nama, dari, sampai)] urut tanggal (waktu lokal)."""
+    with connection.cursor() as cur:
+        cur.execute(
+            "SELECT c.relname, pg_get_expr(c.relpartbound, c.oid) FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid WHERE i.inhparent = %s::regclass", [PARENT])
+        rows = cur.fetchall()
+    out = []
+    for name, bound in rows:
+        m = _BOUND.search(bound)
+        if m:
+            lo, hi = (timezone.localtime(datetime.fromisoformat(v)) for v in m.groups())
+            out.append((name, lo, hi))
+    return sorted(out, key=lambda p: p[1])
+
+
+def closed_until():
+    """Batas periode tertutup (transaksi < nilai ini sudah diarsip) atau None."""
+    return OpeningBalance.objects.aggregate(m=Max("as_of"))["m"]
+
+
+def create_partition(month):
+    """Partisi untuk bulan ``month``. False jika sudah ada; ``ValueError`` untuk bulan tertutup."""
+    month = month_start(month)
+    closed = closed_until()
+    if closed and month < closed:
+        raise ValueError(CLOSED_PERIOD_MSG)
+    name = partition_name(month)
+    with transaction.atomic(), connection.cursor() as cur:
+        # lock parent dulu: dua proses yang membuat bulan yang sama saling menunggu, bukan bentrok
+        cur.execute(f"LOCK TABLE {qn(PARENT)} IN SHARE UPDATE EXCLUSIVE MODE")
+        cur.execute("SELECT to_regclass(%s)", [name])
+        if cur.fetchone()[0]:
+            return False
+        cur.execute(f"CREATE TABLE {qn(name)} PARTITION OF {qn(PARENT)} FOR VALUES "
+                    f"FROM ('{month.isoformat()}') TO ('{add_months(month, 1).isoformat()}')")
+    return True
+
+
+def cover(dates):
+    """Pastikan setiap bulan dari ``dates`` punya partisi (satu query jika semua sudah ada)."""
+    have = {p[0] for p in partitions()}
+    months = {month_start(d) for d in dates}
+    return [partition_name(m) for m in sorted(months)
+            if partition_name(m) not in have and create_partition(m)]
+
+
+def ensure(ahead=3, since=None):
+    """
+    Partisi bulanan tanpa lubang dari bulan tertua (partisi yang ada / ``since``,
+    tidak sebelum periode tertutup) sampai ``ahead`` bulan ke depan.
+    Return list nama partisi baru.
+    """
+    existing = partitions()
+    now = month_start(timezone.now())
+    starts = [now] + [p[1] for p in existing[:1]]
+    if since:
+        starts.append(month_start(since))
+    start = min(starts)
+    closed = closed_until()
+    if closed:
+        start = max(start, closed)
+    end = max([add_months(now, ahead)] + [p[1] for p in existing[-1:]])
+    have = {p[0] for p in existing}
+    created, m = [], start
+    while m <= end:
+        if partition_name(m) not in have and create_partition(m):
+            created.append(partition_name(m))
+        m = add_months(m, 1)
+    return created
+
+
+def archive(before, drop=False):
+    """
+    Tutup periode < awal bulan ``before``. Return dict ringkasan (cutoff, partitions,
+    products). Jalankan di luar jam sibuk: parent dikunci eksklusif selama arsip.
+    """
+    cutoff = month_start(before)
+    if cutoff > month_start(timezone.now()):
+        raise ValueError("Bulan berjalan / masa depan tidak bisa diarsip.")
+    old = [p[0] for p in partitions() if p[2] <= cutoff]
+    opening = qn(OpeningBalance._meta.db_table)
+    with transaction.atomic(), connection.cursor() as cur:
+        cur.execute(f"LOCK TABLE {qn(PARENT)} IN ACCESS EXCLUSIVE MODE")
+        # saldo bersih semua baris < cutoff -> ditambahkan ke saldo awal (arsip bertahap)
+        cur.execute(
+            f"INSERT INTO {opening} (product_id, as_of, quantity) "
+            f"SELECT product_id, %s, SUM(CASE WHEN trx_type = 'IN' THEN quantity ELSE -quantity END) "
+            f"FROM {qn(PARENT)} WHERE trx_date < %s GROUP BY product_id "
+            f"ON CONFLICT (product_id) DO UPDATE SET quantity = {opening}.quantity + EXCLUDED.quantity, "
+            f"as_of = EXCLUDED.as_of", [cutoff, cutoff])
+        products = cur.rowcount
+        cur.execute(f"UPDATE {opening} SET as_of = %s WHERE as_of < %s", [cutoff, cutoff])
+
+        for name in old:
+            cur.execute(f"ALTER TABLE {qn(PARENT)} DETACH PARTITION {qn(name)}")
+            if drop:
+                cur.execute(f"DROP TABLE {qn(name)}")
+                continue
+            # arsip berdiri sendiri: tanpa FK supaya hapus produk/dokumen tidak terhalang
+            cur.execute("SELECT conname FROM pg_constraint WHERE conrelid = %s::regclass AND contype = 'f'", [name])
+            for (con,) in cur.fetchall():
+                cur.execute(f"ALTER TABLE {qn(name)} DROP CONSTRAINT {qn(con)}")
+        summary_cache.bump()
+    return {"cutoff": cutoff, "partitions": old, "products": products}
@@ -0,0 +1,247 @@
+# inventory/rollup.py
+"""
+Rollup harian (``DailyStock``): satu baris per produk x hari (lokal) x arah.
+
+Dijaga inkremental dari ``services.post_changes`` (insert/edit/hapus/import)
+dengan upsert aditif, dan bisa dibangun ulang total lewat ``rebuild()``
+(command ``rebuild_rollup``). Produk bergaris (``inventory.shards``) menulis ke
+baris per garis (kolom ``shard``) yang digabung lagi saat fold; semua query
+rollup menjumlahkan, jadi jumlah baris per kunci tidak berpengaruh ke hasil.
+
+Query laporan memakai rollup untuk hari penuh dan tabel Transaction mentah
+hanya untuk potongan hari di tepi rentang (jika start/end bukan tengah malam),
+sehingga hasilnya identik dengan agregasi mentah.
+"""
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.db import connection, transaction
+from django.db.models import DateField, DecimalField, F, Max, Min, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce, TruncDate, TruncMonth, TruncWeek
+from django.utils import timezone
+
+from . import summary_cache
+from .models import DailyStock, Transaction
+
+DEC = DecimalField(max_digits=14, decimal_places=2)
+
+
+def _local_day(dt):
+    if timezone.is_naive(dt):
+        dt = timezone.make_aware(dt)
+    return timezone.localdate(dt)
+
+
+# ------------- maintenance -------------
+def record(changes, shards=None):
+    """
+    Tambahkan ``changes`` = iterable ``(product_id, trx_date, trx_type, qty)``
+    (qty negatif = baris ditarik) ke rollup. Satu upsert per (produk, hari, arah),
+    urut kunci supaya urutan lock konsisten. ``shards`` = ``{product_id: garis}``
+    produk bergaris: ditulis ke baris garis itu, bukan baris bersama (garis 0).
+    """
+    shards = shards or {}
+    acc = {}
+    for pid, trx_date, trx_type, qty in changes:
+        key = (pid, _local_day(trx_date), trx_type, shards.get(pid, 0))
+        acc[key] = acc.get(key, Decimal(0)) + qty
+    params = [(pid, day, t, sh, q) for (pid, day, t, sh), q in sorted(acc.items()) if q]
+    if not params:
+        return
+    qn = connection.ops.quote_name
+    table = qn(DailyStock._meta.db_table)
+    with connection.cursor() as cur:
+        cur.executemany(
+            f"INSERT INTO {table} (product_id, day, trx_type, shard, quantity) VALUES (%s, %s, %s, %s, %s) "
+            f"ON CONFLICT (product_id, day, trx_type, shard) DO UPDATE "
+            f"SET quantity = {table}.quantity + EXCLUDED.quantity",
+            params,
+        )
+
+
+def merge_shards(product_id):
+    """Gabungkan baris rollup per garis (shard > 0) produk ke garis 0; satu statement."""
+    table = connection.ops.quote_name(DailyStock._meta.db_table)
+    with connection.cursor() as cur:
+        cur.execute(
+            f"WITH moved AS (DELETE FROM {table} WHERE product_id = %s AND shard > 0 "
+            f"RETURNING day, trx_type, quantity) "
+            f"INSERT INTO {table} (product_id, day, trx_type, shard, quantity) "
+            f"SELECT %s, day, trx_type, 0, SUM(quantity) FROM moved GROUP BY day, trx_type "
+            f"ON CONFLICT (product_id, day, trx_type, shard) DO UPDATE "
+            f"SET quantity = {table}.quantity + EXCLUDED.quantity",
+            [product_id, product_id],
+        )
+
+
+def rebuild(batch_size=5000):
+    """
+    Bangun ulang rollup dari Transaction. Return jumlah baris rollup yang dibangun.
+    Hari di periode yang sudah diarsip (transaksinya tidak ada lagi) dibiarkan.
+    """
+    from .partitions import closed_until
+    with transaction.atomic():
+        if connection.vendor == "postgresql":
+            # tahan posting baru selama rebuild supaya tidak ada delta yang terlewat
+            with connection.cursor() as cur:
+                cur.execute(f"LOCK TABLE {connection.ops.quote_name(Transaction._meta.db_table)} IN SHARE MODE")
+        closed = closed_until()
+        stale, trx = DailyStock.objects.all(), Transaction.objects.order_by()
+        if closed:
+            stale = stale.filter(day__gte=_local_day(closed))
+            trx = trx.filter(trx_date__gte=closed)
+        stale.delete()
+        rows = (
+            trx
+            .annotate(day=TruncDate("trx_date"))
+            .values("product_id", "day", "trx_type")
+            .annotate(q=Sum("quantity"))
+            .values_list("product_id", "day", "trx_type", "q")
+        )
+        batch, n = [], 0
+        for pid, day, t, q in rows.iterator(chunk_size=batch_size):
+            batch.append(DailyStock(product_id=pid, day=day, trx_type=t, quantity=q))
+            if len(batch) >= batch_size:
+                DailyStock.objects.bulk_create(batch)
+                n += len(batch)
+                batch = []
+        DailyStock.objects.bulk_create(batch)
+        summary_cache.bump()
+        return n + len(batch)
+
+
+# ------------- queries -------------
+def split_range(start_dt, end_dt):
+    """
+    Pecah [start_dt, end_dt) jadi (day_from, day_to, edge_q):
+    hari penuh [day_from, day_to) dibaca dari rollup (None = tak terbatas),
+    ``edge_q`` = Q atas ``trx_date`` untuk potongan tepi yang dibaca mentah
+    (None jika tidak ada).
+    """
+    tz = timezone.get_current_timezone()
+
+    def aware(dt):
+        return timezone.make_aware(dt, tz) if timezone.is_naive(dt) else dt
+
+    def midnight(d):
+        return timezone.make_aware(datetime.combine(d, time.min), tz)
+
+    start_dt = aware(start_dt) if start_dt else None
+    end_dt = aware(end_dt) if end_dt else None
+    day_from = day_to = None
+    edges = []
+    if start_dt:
+        day_from = timezone.localdate(start_dt, tz)
+        if start_dt != midnight(day_from):
+            day_from += timedelta(days=1)
+            edges.append((start_dt, midnight(day_from)))
+    if end_dt:
+        day_to = timezone.localdate(end_dt, tz)
+        if end_dt != midnight(day_to):
+            edges.append((midnight(day_to), end_dt))
+    if day_from and day_to and day_from >= day_to:
+        # rentang di dalam satu hari / kosong: semuanya mentah
+        return day_from, day_from, Q(trx_date__gte=start_dt, trx_date__lt=end_dt)
+    edge_q = None
+    for lo, hi in edges:
+        q = Q(trx_date__gte=lo, trx_date__lt=hi)
+        edge_q = q if edge_q is None else edge_q | q
+    return day_from, day_to, edge_q
+
+
+def _rollup_qs(day_from, day_to, cat_id, prod_id):
+    qs = DailyStock.objects.all()
+    if day_from:
+        qs = qs.filter(day__gte=day_from)
+    if day_to:
+        qs = qs.filter(day__lt=day_to)
+    if day_from and day_to and day_from >= day_to:
+        qs = qs.none()
+    if cat_id:
+        qs = qs.filter(product__category_id=cat_id)
+    if prod_id:
+        qs = qs.filter(product_id=prod_id)
+    return qs
+
+
+def _edge_qs(edge_q, cat_id, prod_id):
+    if edge_q is None:
+        return None
+    qs = Transaction.objects.order_by().filter(edge_q)
+    if cat_id:
+        qs = qs.filter(product__category_id=cat_id)
+    if prod_id:
+        qs = qs.filter(product_id=prod_id)
+    return qs
+
+
+def totals(start_dt, end_dt, cat_id="", prod_id=""):
+    """(total_in, total_out) untuk filter laporan."""
+    day_from, day_to, edge_q = split_range(start_dt, end_dt)
+    agg = _rollup_qs(day_from, day_to, cat_id, prod_id).aggregate(
+        i=Sum("quantity", filter=Q(trx_type="IN")), o=Sum("quantity", filter=Q(trx_type="OUT")))
+    total_in, total_out = agg["i"] or 0, agg["o"] or 0
+    edge = _edge_qs(edge_q, cat_id, prod_id)
+    if edge is not None:
+        agg = edge.aggregate(i=Sum("quantity", filter=Q(trx_type="IN")), o=Sum("quantity", filter=Q(trx_type="OUT")))
+        total_in += agg["i"] or 0
+        total_out += agg["o"] or 0
+    return total_in, total_out
+
+
+def annotate_in_out(product_qs, start_dt, end_dt):
+    """Tambah anotasi ``in_qty``/``out_qty`` per produk (subquery rollup + tepi mentah)."""
+    day_from, day_to, edge_q = split_range(start_dt, end_dt)
+
+    def rollup_sum(trx_type):
+        sq = (_rollup_qs(day_from, day_to, "", "").filter(product=OuterRef("pk"), trx_type=trx_type)
+              .values("product").annotate(s=Sum("quantity")).values("s"))
+        return Coalesce(Subquery(sq, output_field=DEC), Value(0), output_field=DEC)
+
+    def edge_sum(trx_type):
+        sq = (_edge_qs(edge_q, "", "").filter(product=OuterRef("pk"), trx_type=trx_type)
+              .values("product").annotate(s=Sum("quantity")).values("s"))
+        return Coalesce(Subquery(sq, output_field=DEC), Value(0), output_field=DEC)
+
+    in_expr, out_expr = rollup_sum("IN"), rollup_sum("OUT")
+    if edge_q is not None:
+        in_expr, out_expr = in_expr + edge_sum("IN"), out_expr + edge_sum("OUT")
+    return product_qs.annotate(in_qty=in_expr, out_qty=out_expr)
+
+
+_TRUNC = {"week": TruncWeek, "month": TruncMonth}
+
+
+def per_bucket(start_dt, end_dt, cat_id="", prod_id="", bucket="day"):
+    """
+    List ``(awal_bucket, trx_type, qty)`` urut waktu; ``bucket`` = day/week/month
+    (minggu mulai Senin). Rollup dan tepi mentah sama-sama di-GROUP BY per bucket di DB.
+    """
+    day_from, day_to, edge_q = split_range(start_dt, end_dt)
+    if bucket in _TRUNC:
+        b_rollup = _TRUNC[bucket]("day")
+        b_edge = _TRUNC[bucket]("trx_date", output_field=DateField())
+    else:
+        b_rollup, b_edge = F("day"), TruncDate("trx_date")
+    acc = {}
+    rows = (_rollup_qs(day_from, day_to, cat_id, prod_id).order_by().annotate(b=b_rollup)
+            .values("b", "trx_type").annotate(q=Sum("quantity")).values_list("b", "trx_type", "q"))
+    for b, t, q in rows:
+        acc[(b, t)] = q
+    edge = _edge_qs(edge_q, cat_id, prod_id)
+    if edge is not None:
+        for b, t, q in (edge.annotate(b=b_edge).values("b", "trx_type")
+                        .annotate(q=Sum("quantity")).values_list("b", "trx_type", "q")):
+            acc[(b, t)] = acc.get((b, t), 0) + q
+    return [(b, t, q) for (b, t), q in sorted(acc.items()) if q]
+
+
+def per_day(start_dt, end_dt, cat_id="", prod_id=""):
+    """List ``(day, trx_type, qty)`` urut hari, setara TruncDate + GROUP BY di tabel mentah."""
+    return per_bucket(start_dt, end_dt, cat_id, prod_id, "day")
+
+
+def day_span(cat_id="", prod_id=""):
+    """(hari pertama, hari terakhir) yang punya data rollup untuk filter ini."""
+    agg = _rollup_qs(None, None, cat_id, prod_id).aggregate(lo=Min("day"), hi=Max("day"))
+    return agg["lo"], agg["hi"]
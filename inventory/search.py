@@ -0,0 +1,69 @@
+# inventory/search.py
+"""
+Pencarian produk berbasis pg_trgm.
+
+``icontains`` pada sku/name dilayani index GIN trigram atas ``UPPER(col)``
+(migrasi 0004), dan hasil autocomplete diurutkan: SKU persis > SKU berawalan q
+> similarity trigram tertinggi. Di DB non-Postgres jatuh ke icontains biasa.
+"""
+from django.db import connection
+from django.db.models import Case, IntegerField, Q, Value, When
+from django.db.models.functions import Greatest, Upper
+
+from .models import Product
+
+AUTOCOMPLETE_LIMIT = 10
+AUTOCOMPLETE_MAX_LIMIT = 50
+
+
+def _is_pg():
+    return connection.vendor == "postgresql"
+
+
+def filter_products(qs, q):
+    """Filter list produk (ProductList): substring sku/nama, tanpa mengubah urutan."""
+    return qs.filter(Q(name__icontains=q) | Q(sku__icontains=q))
+
+
+def search_products(q, qs=None, fuzzy=True):
+    """
+    Queryset produk cocok ``q``, terurut relevansi. ``fuzzy=True`` (Postgres)
+    ikut menyertakan nama yang mirip (salah ketik) lewat operator trigram ``%``.
+    """
+    qs = Product.objects.all() if qs is None else qs
+    match = Q(name__icontains=q) | Q(sku__icontains=q)
+    if fuzzy and _is_pg():
+        # ekspresi sama dengan index trigram (UPPER(name)) supaya operator % memakai index
+        qs = qs.alias(uname=Upper("name"))
+        match |= Q(uname__trigram_similar=q.upper())
+    qs = qs.filter(match).annotate(
+        exact=Case(
+            When(sku__iexact=q, then=Value(2)),
+            When(sku__istartswith=q, then=Value(1)),
+            default=Value(0), output_field=IntegerField(),
+        )
+    )
+    if _is_pg():
+        from django.contrib.postgres.search import TrigramSimilarity
+        qs = qs.annotate(rank=Greatest(TrigramSimilarity("sku", q), TrigramSimilarity("name", q)))
+        return qs.order_by("-exact", "-rank", "name", "id")
+    return qs.order_by("-exact", "name", "id")
+
+
+def autocomplete(q, limit=AUTOCOMPLETE_LIMIT, active_only=True, page=1):
+    """
+    Top-N ``(id, sku, name)`` untuk autocomplete/picker; tuple saja, tanpa instance model.
+    Return ``(rows, more)``. ``q`` kosong = telusur urut nama; 1 huruf = prefix.
+    """
+    q = (q or "").strip()
+    qs = Product.objects.filter(is_active=True) if active_only else Product.objects.all()
+    limit = max(1, min(int(limit), AUTOCOMPLETE_MAX_LIMIT))
+    offset = (max(1, int(page)) - 1) * limit
+    if not q:
+        qs = qs.order_by("name", "id")
+    elif len(q) == 1:
+        qs = qs.filter(Q(sku__istartswith=q) | Q(name__istartswith=q)).order_by("name", "id")
+    else:
+        qs = search_products(q, qs)
+    rows = list(qs.values_list("id", "sku", "name")[offset:offset + limit + 1])
+    return rows[:limit], len(rows) > limit
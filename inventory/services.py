@@ -0,0 +1,209 @@
+# inventory/services.py
+"""
+Layanan posting stok.
+
+Semua perubahan ``Product.qty_on_hand`` lewat sini: delta diterapkan dengan
+``UPDATE ... SET qty_on_hand = qty_on_hand + delta`` di sisi DB (row lock
+implisit dari UPDATE), dan cek stok negatif ikut di WHERE pada statement yang
+sama, jadi tidak ada read-modify-write di Python. Produk bergaris
+(``shard_count > 0``, produk panas) tidak kena UPDATE itu dan diteruskan ke
+``shards.apply``; saldo ledger-nya ditunda (``ledger.defer``) sampai fold.
+Wajib dipanggil di dalam ``transaction.atomic()``.
+"""
+from decimal import Decimal, InvalidOperation
+
+from django.db.models import Case, F, Q, Value, When
+from django.db.models.functions import Coalesce
+from django.db.models.lookups import GreaterThanOrEqual, LessThan
+from django.utils import timezone
+
+from . import ledger, rollup, shards, summary_cache
+from .models import Product, Transaction
+
+
+_QTY = Transaction._meta.get_field("quantity")
+QTY_CENT = Decimal(1).scaleb(-_QTY.decimal_places)
+QTY_MAX_INT_DIGITS = _QTY.max_digits - _QTY.decimal_places
+
+
+def parse_quantity(raw):
+    """
+    Input quantity (teks/angka) -> Decimal yang sudah dibulatkan ke presisi kolom
+    ``Transaction.quantity``. ``ValueError`` jika bukan angka, <= 0 sesudah dibulatkan,
+    atau digit bulatnya melebihi kolom (jadi ditolak per baris, bukan DataError saat insert).
+    """
+    try:
+        qty = Decimal(str(raw).strip()).quantize(QTY_CENT)
+    except (InvalidOperation, TypeError):
+        raise ValueError(f"quantity tidak valid: {raw!r}")
+    if not qty.is_finite():
+        raise ValueError(f"quantity tidak valid: {raw!r}")
+    if qty <= 0:
+        raise ValueError("Quantity harus > 0")
+    if qty.adjusted() >= QTY_MAX_INT_DIGITS:
+        raise ValueError(f"Quantity maksimal {QTY_MAX_INT_DIGITS} digit sebelum koma")
+    return qty
+
+
+def stock_delta(trx_type, quantity):
+    """Delta stok bertanda untuk satu baris transaksi (IN +, OUT -)."""
+    return quantity if trx_type == Transaction.IN else -quantity
+
+
+def lock_old_row(trx: Transaction):
+    """
+    Satu-satunya read baris lama saat edit: ambil (product_id, trx_type, quantity, trx_date)
+    dengan SELECT ... FOR UPDATE supaya edit paralel atas transaksi yang sama
+    tidak menghitung delta dari snapshot basi.
+    """
+    if not trx.pk:
+        return None
+    return (
+        Transaction.objects.select_for_update()
+        .filter(pk=trx.pk)
+        .values_list("product_id", "trx_type", "quantity", "trx_date")
+        .first()
+    )
+
+
+def ledger_changes(old, trx: Transaction):
+    """
+    Perubahan ledger untuk insert/edit sebagai list ``(product_id, trx_date, trx_type, qty)``.
+    ``old`` = hasil ``lock_old_row`` (None untuk insert); baris lama masuk dengan
+    qty negatif, jadi ganti produk/tanggal/tipe otomatis ter-reverse.
+    """
+    changes = [(trx.product_id, trx.trx_date, trx.trx_type, trx.quantity)]
+    if old is not None:
+        old_pid, old_type, old_qty, old_date = old
+        changes.append((old_pid, old_date, old_type, -old_qty))
+    return changes
+
+
+def post_changes(changes, check=True):
+    """
+    Satu pintu untuk semua perubahan ledger (signal, import massal): terapkan
+    delta stok teragregasi per produk lalu perbarui rollup harian.
+    Return ``{product_id: garis}`` untuk produk bergaris (saldo ledger-nya sudah
+    ditandai tertunda; pemanggil tidak perlu ``ledger.place``/``shift``).
+    """
+    deltas = {}
+    for pid, _, trx_type, qty in changes:
+        deltas[pid] = deltas.get(pid, Decimal(0)) + stock_delta(trx_type, qty)
+    striped = apply_deltas(deltas, check=check)
+    rollup.record(changes, striped)
+    if striped:
+        since = {}
+        for pid, trx_date, _, _ in changes:
+            if pid in striped:
+                since[pid] = min(since.get(pid, trx_date), trx_date)
+        ledger.defer(since)
+    summary_cache.bump()
+    return striped
+
+
+def post_trx_saved(old, trx: Transaction):
+    """Setelah insert/edit satu transaksi: stok + rollup, lalu saldo berjalan ledger."""
+    striped = post_changes(ledger_changes(old, trx))
+    if old is not None and old[0] not in striped:
+        old_pid, old_type, old_qty, old_date = old
+        ledger.shift(old_pid, old_date, trx.pk, -stock_delta(old_type, old_qty))
+    if trx.product_id not in striped:
+        ledger.place(trx, stock_delta(trx.trx_type, trx.quantity))
+
+
+def post_trx_deleted(trx: Transaction):
+    striped = post_changes([(trx.product_id, trx.trx_date, trx.trx_type, -trx.quantity)], check=False)
+    if trx.product_id not in striped:
+        ledger.shift(trx.product_id, trx.trx_date, trx.pk, -stock_delta(trx.trx_type, trx.quantity))
+
+
+def apply_deltas(deltas, check=True):
+    """
+    Terapkan ``{product_id: delta}`` secara atomik.
+
+    Produk diproses urut id supaya urutan lock konsisten (hindari deadlock antar
+    writer yang menyentuh beberapa produk). Dengan ``check=True`` delta negatif
+    hanya lolos kalau ``qty_on_hand >= -delta`` pada saat UPDATE; UPDATE yang
+    tidak kena diteruskan ke ``shards.apply``, yang melempar ``ValidationError``
+    bila stok (termasuk garis) memang tidak cukup, dan transaksi DB pemanggil
+    ikut di-rollback.
+    ``check=False`` dipakai saat hapus transaksi (perilaku lama: boleh minus).
+    Status low stock (``low_since``) ikut diperbarui di UPDATE yang sama.
+
+    Return ``{product_id: garis}`` untuk produk bergaris (termasuk yang deltanya
+    nol: advisory lock shared tetap diambil supaya fold menunggu baris ini).
+    """
+    now = timezone.now()
+    striped, zero = {}, []
+    for pid in sorted(deltas):
+        delta = deltas[pid]
+        if not delta:
+            zero.append(pid)
+            continue
+        qs = Product.objects.filter(pk=pid, shard_count=0)
+        if check and delta < 0:
+            qs = qs.filter(qty_on_hand__gte=-delta)
+        if qs.update(qty_on_hand=F("qty_on_hand") + delta, updated_at=now,
+                     low_since=_low_since_after(delta, now)):
+            continue
+        # tidak kena: produk bergaris, stok tidak cukup, atau produk tidak ada
+        shard = shards.apply(pid, delta, check)
+        if shard is not None:
+            striped[pid] = shard
+    if zero:
+        striped.update(dict.fromkeys(shards.lock_shared(zero), 0))
+    return striped
+
+
+def _low_since_after(delta, now):
+    # sisi kanan SET membaca nilai lama: stok baru < min  <=>  qty_on_hand < min_stock - delta
+    return Case(When(qty_on_hand__lt=F("min_stock") - delta, then=Coalesce(F("low_since"), Value(now))),
+                default=None)
+
+
+def sync_low_stock(qs=None):
+    """
+    Selaraskan ``low_since`` untuk jalur yang menulis qty_on_hand/min_stock massal
+    (bulk_update, SQL mentah, migrasi) dan fold produk bergaris. Hanya baris yang
+    statusnya berubah di-UPDATE; stok dibandingkan dalam bentuk tepat (+ garis).
+    """
+    qs = Product.objects.all() if qs is None else qs
+    on_hand = shards.on_hand_expr()
+    n = qs.filter(
+        Q(LessThan(on_hand, F("min_stock")), low_since__isnull=True)
+        | Q(GreaterThanOrEqual(on_hand, F("min_stock")), low_since__isnull=False)
+    ).update(low_since=Case(When(LessThan(on_hand, F("min_stock")), then=Value(timezone.now())), default=None))
+    if n:
+        summary_cache.bump()
+    return n
+
+
+PRODUCT_MASTER_FIELDS = ("sku", "name", "category", "uom", "min_stock", "is_active")
+
+
+def save_product(product, changed=PRODUCT_MASTER_FIELDS):
+    """
+    Simpan edit master produk (form/admin): hanya field master di ``changed`` yang
+    ditulis, jadi qty_on_hand/garis/low_since yang terbaca saat form dibuka tidak
+    menimpa delta ``apply_deltas`` yang masuk sementara itu. min_stock berubah ->
+    ``low_since`` dihitung di UPDATE yang sama dari stok saat itu. Produk baru
+    disimpan biasa.
+    """
+    if product._state.adding:
+        product.save()
+        return product
+    now = timezone.now()
+    values = {}
+    for name in PRODUCT_MASTER_FIELDS:
+        if name in changed:
+            attname = Product._meta.get_field(name).attname
+            values[attname] = getattr(product, attname)
+    if "min_stock" in changed:
+        # sisi kanan SET membaca nilai lama -> bandingkan dengan min_stock baru sebagai literal
+        values["low_since"] = Case(
+            When(LessThan(shards.on_hand_expr(), Value(product.min_stock)), then=Coalesce(F("low_since"), Value(now))),
+            default=None)
+    Product.objects.filter(pk=product.pk).update(updated_at=now, **values)
+    product.updated_at = now
+    summary_cache.bump()
+    return product
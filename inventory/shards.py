@@ -0,0 +1,201 @@
+# inventory/shards.py
+"""
+Counter stok bergaris (striped) untuk produk panas.
+
+Produk biasa: setiap posting meng-UPDATE baris Product yang sama dan row lock-nya
+ditahan sampai commit, jadi writer paralel ke satu SKU laris antre satu per
+satu (plus dead tuple karena ``updated_at`` ikut berubah). Produk dengan
+``shard_count = N`` menyimpan stoknya di ``qty_on_hand`` + N baris ``StockShard``;
+stok tepat = jumlah keduanya, dibaca lewat ``on_hand_expr()``.
+
+Tulis (``apply``, dari ``services.apply_deltas`` saat UPDATE produk biasa tidak kena):
+- jalur cepat: satu UPDATE ke garis ``pg_backend_pid() % N`` (tetap per koneksi);
+  delta negatif bersyarat ``quantity >= -delta``. Garis tidak pernah negatif dan
+  ``qty_on_hand`` hanya dikurangi di bawah lock produk dengan cek total, jadi
+  cek stok tetap tepat tanpa mengunci baris produk.
+- jalur lambat (garis sendiri kurang, atau hapus transaksi): lock produk, kuras
+  semua garis ke ``qty_on_hand``, terapkan delta dengan cek total, bagi rata lagi.
+
+Turunan yang biasanya ikut terserialisasi oleh lock produk juga dipisah: rollup
+harian ditulis per garis (``DailyStock.shard``) dan saldo berjalan ledger
+ditunda (``ledger.defer``). Writer memegang advisory lock SHARED per produk,
+``fold()`` memegang EXCLUSIVE: fold (command ``stock_shards --fold``, jalankan
+berkala) menghitung saldo tertunda, menggabung rollup per garis, membagi ulang
+stok ke garis dan menyegarkan ``low_since`` (yang di jalur cepat tidak disentuh).
+Urutan lock selalu advisory -> baris produk (FOR NO KEY UPDATE, tidak menunggu
+insert transaksi yang memegang KEY SHARE lewat FK) -> garis.
+"""
+from decimal import ROUND_DOWN, Decimal
+
+from django.core.exceptions import ValidationError
+from django.db import connection, transaction
+from django.db.models import Case, DecimalField, F, OuterRef, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from . import ledger, rollup, summary_cache
+from .models import INSUFFICIENT_STOCK_MSG, Product, StockShard
+
+DEC = DecimalField(max_digits=14, decimal_places=2)
+LOCK_SPACE = 7301  # kunci advisory (LOCK_SPACE, product_id)
+MAX_SHARDS = 64
+CENT = Decimal("0.01")
+
+
+def qn(name):
+    return connection.ops.quote_name(name)
+
+
+# ------------- baca -------------
+def on_hand_expr():
+    """Ekspresi stok tepat per produk; subquery garis hanya dievaluasi untuk produk bergaris."""
+    shard_sum = (StockShard.objects.filter(product=OuterRef("pk")).order_by()
+                 .values("product").annotate(s=Sum("quantity")).values("s"))
+    return Case(
+        When(shard_count=0, then=F("qty_on_hand")),
+        default=F("qty_on_hand") + Coalesce(Subquery(shard_sum, output_field=DEC), Value(0), output_field=DEC),
+        output_field=DEC,
+    )
+
+
+def annotate_on_hand(product_qs, name="on_hand"):
+    return product_qs.annotate(**{name: on_hand_expr()})
+
+
+# ------------- lock -------------
+def lock_shared(product_ids):
+    """
+    Advisory lock SHARED untuk produk bergaris di ``product_ids`` (satu query; produk
+    biasa dilewati). Return list id produk bergaris yang dikunci.
+    """
+    with connection.cursor() as cur:
+        cur.execute(
+            f"SELECT id, pg_advisory_xact_lock_shared(%s, (id %% 2147483647)::int) FROM {qn(Product._meta.db_table)} "
+            f"WHERE id = ANY(%s) AND shard_count > 0 ORDER BY id", [LOCK_SPACE, list(product_ids)])
+        return [pid for pid, _ in cur.fetchall()]
+
+
+def _lock(product_id, mode=""):
+    with connection.cursor() as cur:
+        cur.execute(f"SELECT pg_advisory_xact_lock{mode}(%s, %s)", [LOCK_SPACE, product_id % 2147483647])
+
+
+# ------------- tulis -------------
+def apply(product_id, delta, check=True):
+    """
+    Terapkan ``delta`` ke produk yang tidak kena UPDATE biasa. Return nomor garis
+    yang dipakai (produk bergaris) atau None (ternyata produk biasa; sudah diterapkan).
+    ``ValidationError`` jika stok tidak cukup.
+    """
+    _lock(product_id, "_shared")
+    if delta > 0 or check:
+        # UPDATE yang menunggu writer lain mengunci versi terbaru baris SEBELUM cek ulang WHERE,
+        # jadi delta negatif yang gagal tetap memegang garisnya -> savepoint supaya lock itu
+        # lepas sebelum jalur lambat menunggu lock produk (yang pemegangnya menguras semua garis)
+        sid = transaction.savepoint() if delta < 0 else None
+        with connection.cursor() as cur:
+            cur.execute(
+                f"UPDATE {qn(StockShard._meta.db_table)} s SET quantity = s.quantity + %s, updated_at = %s "
+                f"FROM {qn(Product._meta.db_table)} p WHERE p.id = %s AND p.shard_count > 0 "
+                f"AND s.product_id = p.id AND s.shard = pg_backend_pid() %% p.shard_count AND s.quantity + %s >= 0 "
+                f"RETURNING s.shard", [delta, timezone.now(), product_id, delta])
+            row = cur.fetchone()
+        if sid:
+            (transaction.savepoint_commit if row else transaction.savepoint_rollback)(sid)
+        if row:
+            return row[0]
+    return _apply_locked(product_id, delta, check)
+
+
+def _apply_locked(product_id, delta, check):
+    row = (Product.objects.select_for_update(no_key=True).filter(pk=product_id)
+           .values_list("shard_count", "qty_on_hand", "min_stock", "low_since").first())
+    if row is None or not row[0]:
+        # bukan (lagi) produk bergaris: UPDATE biasa di bawah lock
+        from .services import _low_since_after
+        now = timezone.now()
+        qs = Product.objects.filter(pk=product_id)
+        if check and delta < 0:
+            qs = qs.filter(qty_on_hand__gte=-delta)
+        if not qs.update(qty_on_hand=F("qty_on_hand") + delta, updated_at=now,
+                         low_since=_low_since_after(delta, now)) and check:
+            raise ValidationError(INSUFFICIENT_STOCK_MSG)
+        return None
+    n, base, min_stock, low_since = row
+    total = base + _drain(product_id)
+    if check and delta < 0 and total < -delta:
+        raise ValidationError(INSUFFICIENT_STOCK_MSG)
+    _spread(product_id, n, total + delta, min_stock, low_since)
+    return 0
+
+
+def _drain(product_id):
+    """Kosongkan semua garis produk (row lock ikut diambil); return jumlah isinya."""
+    table = qn(StockShard._meta.db_table)
+    with connection.cursor() as cur:
+        # RETURNING memberi nilai SESUDAH update; isi lama diambil dari CTE yang mengunci barisnya
+        cur.execute(f"WITH old AS (SELECT id, quantity FROM {table} WHERE product_id = %s FOR UPDATE) "
+                    f"UPDATE {table} s SET quantity = 0, updated_at = %s FROM old WHERE s.id = old.id "
+                    f"RETURNING old.quantity", [product_id, timezone.now()])
+        return sum((q for (q,) in cur.fetchall()), Decimal(0))
+
+
+def _spread(product_id, n, total, min_stock, low_since):
+    """Bagi ``total`` rata ke ``n`` garis (sisa pembulatan di qty_on_hand). True jika status low berubah."""
+    now = timezone.now()
+    per = (total / n).quantize(CENT, ROUND_DOWN) if n and total > 0 else Decimal(0)
+    if per:
+        StockShard.objects.filter(product_id=product_id).update(quantity=per, updated_at=now)
+    low = total < min_stock
+    Product.objects.filter(pk=product_id).update(
+        qty_on_hand=total - per * n, updated_at=now, low_since=(low_since or now) if low else None)
+    return low != (low_since is not None)
+
+
+def _reset(product_id, shard_count=None):
+    """
+    Fold satu produk di bawah lock EXCLUSIVE: stok dikumpulkan lalu dibagi ulang
+    ke ``shard_count`` garis (None = jumlah sekarang, 0 = matikan), rollup per garis
+    digabung, saldo ledger tertunda dihitung. Return False jika produk tidak ada.
+    """
+    with transaction.atomic():
+        _lock(product_id)
+        row = (Product.objects.select_for_update(no_key=True).filter(pk=product_id)
+               .values_list("shard_count", "qty_on_hand", "min_stock", "low_since").first())
+        if row is None:
+            return False
+        current, base, min_stock, low_since = row
+        n = current if shard_count is None else shard_count
+        total = base + _drain(product_id)
+        if n != current:
+            StockShard.objects.filter(product_id=product_id).delete()
+            StockShard.objects.bulk_create([StockShard(product_id=product_id, shard=i) for i in range(n)])
+            Product.objects.filter(pk=product_id).update(shard_count=n)
+        changed = _spread(product_id, n, total, min_stock, low_since)
+        rollup.merge_shards(product_id)
+        ledger.fold_pending(product_id)
+        if changed or n != current:
+            summary_cache.bump()
+    return True
+
+
+def enable(product_id, shard_count):
+    if not 1 <= shard_count <= MAX_SHARDS:
+        raise ValueError(f"Jumlah garis harus 1..{MAX_SHARDS}.")
+    return _reset(product_id, shard_count)
+
+
+def disable(product_id):
+    return _reset(product_id, 0)
+
+
+def fold(product_id):
+    return _reset(product_id)
+
+
+def fold_all():
+    """Fold semua produk bergaris, satu transaksi per produk. Return jumlah produk."""
+    pids = list(Product.objects.filter(shard_count__gt=0).order_by("pk").values_list("pk", flat=True))
+    for pid in pids:
+        _reset(pid)
+    return len(pids)
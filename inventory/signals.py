@@ -1,29 +1,29 @@
-from django.db.models.signals import post_save, post_delete, pre_save
+from django.db.models.signals import post_save, post_delete, pre_delete, pre_save
 from django.dispatch import receiver
-from .models import Transaction, Product
+from django.db.models import QuerySet
+from .models import Category, StockChange, Transaction, Product, UoM
+from . import changefeed, services, summary_cache
 @receiver(pre_save, sender=Transaction)
 def remember_old(sender, instance: Transaction, **kwargs):
-    if instance.pk:
-        try:
-            old=sender.objects.get(pk=instance.pk)
-            instance._old_qty=old.quantity
-            instance._old_type=old.trx_type
-        except sender.DoesNotExist:
-            instance._old_qty=None; instance._old_type=None
-    else:
-        instance._old_qty=None; instance._old_type=None
-def _apply_delta(product: Product, delta):
-    product.qty_on_hand=(product.qty_on_hand or 0)+delta
-    product.save(update_fields=['qty_on_hand','updated_at'])
+    # satu read (FOR UPDATE) baris lama per edit; None untuk insert
+    instance._old_row=services.lock_old_row(instance)
 @receiver(post_save, sender=Transaction)
 def on_trx_saved(sender, instance: Transaction, created, **kwargs):
-    new_delta=instance.quantity if instance.trx_type==Transaction.IN else -instance.quantity
-    old_delta=0
-    if getattr(instance,'_old_qty',None) is not None and getattr(instance,'_old_type',None) is not None:
-        old_delta=instance._old_qty if instance._old_type==Transaction.IN else -instance._old_qty
-    delta=new_delta - old_delta
-    if delta: _apply_delta(instance.product, delta)
+    services.post_trx_saved(getattr(instance,'_old_row',None), instance)
+    changefeed.record(StockChange.CREATED if created else StockChange.UPDATED, [instance])
 @receiver(post_delete, sender=Transaction)
-def on_trx_deleted(sender, instance: Transaction, **kwargs):
-    delta=-(instance.quantity) if instance.trx_type==Transaction.IN else instance.quantity
-    _apply_delta(instance.product, delta)
+def on_trx_deleted(sender, instance: Transaction, origin=None, **kwargs):
+    # cascade dari hapus produk: produk & rollup-nya ikut hilang, tidak ada yang perlu disesuaikan;
+    # change feed-nya sudah dicatat sekaligus di on_product_deleting
+    if isinstance(origin, Product) or (isinstance(origin, QuerySet) and origin.model is Product): return
+    services.post_trx_deleted(instance)
+    changefeed.record(StockChange.DELETED, [instance])
+@receiver(pre_delete, sender=Product)
+def on_product_deleting(sender, instance: Product, **kwargs):
+    changefeed.record_product_deleted(instance.pk)
+@receiver([post_save, post_delete], sender=Product)
+@receiver([post_save, post_delete], sender=Category)
+@receiver([post_save, post_delete], sender=UoM)
+def on_master_changed(sender, **kwargs):
+    # nama/kategori/satuan ikut tampil di ringkasan -> entri cache lama tidak berlaku
+    summary_cache.bump()
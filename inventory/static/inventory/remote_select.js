@@ -0,0 +1,37 @@
+// Tom Select untuk <select data-remote-url>: opsi diambil dari endpoint JSON per halaman.
+document.addEventListener("DOMContentLoaded", function () {
+  document.querySelectorAll("select[data-remote-url]").forEach(function (el) {
+    const url = el.dataset.remoteUrl;
+    new TomSelect(el, {
+      valueField: "id",
+      labelField: "label",
+      searchField: [],
+      maxOptions: null,
+      preload: "focus",
+      plugins: ["virtual_scroll"],
+      firstUrl: function (query) {
+        return url + "?" + new URLSearchParams({ q: query, page: 1 });
+      },
+      load: function (query, callback) {
+        const self = this;
+        const pageUrl = this.getUrl(query);
+        fetch(pageUrl, { headers: { "X-Requested-With": "XMLHttpRequest" } })
+          .then((r) => r.json())
+          .then((data) => {
+            if (data.more) {
+              const u = new URL(pageUrl, window.location.origin);
+              u.searchParams.set("page", parseInt(u.searchParams.get("page") || "1", 10) + 1);
+              self.setNextUrl(query, u.pathname + u.search);
+            }
+            callback(data.results);
+          })
+          .catch(() => callback());
+      },
+      render: {
+        no_results: function () {
+          return '<div class="no-results">Tidak ditemukan</div>';
+        },
+      },
+    });
+  });
+});
@@ -0,0 +1,127 @@
+# inventory/summary_cache.py
+"""
+Cache hasil ringkasan stok (``views_report.summary_parts``) per filter.
+
+Kunci = filter ternormalisasi (start/end sesudah di-parse, cat, prod) + versi
+ledger. Versi = sequence Postgres ``inventory_ledger_version``: dibaca dengan
+satu SELECT murah (sama untuk semua proses/worker), dinaikkan ``bump()`` setiap
+Transaction/Product/master berubah. Kenaikan dijalankan SESUDAH commit — kalau
+sebelum commit, pembaca bisa menyimpan data lama di bawah versi baru.
+Entri versi lama tidak dihapus, cukup tidak dibaca lagi dan kedaluwarsa sendiri.
+
+Respons ringkasan membawa ETag (versi + filter + user) dan Last-Modified (kapan
+versi itu pertama terlihat), jadi browser/proxy yang revalidasi mendapat 304
+tanpa query agregat. Hit/miss dihitung di cache (``stats()``); dengan backend
+cache bersama (Redis/Memcached) angkanya global, dengan LocMem per proses.
+
+Versi selalu dibaca dari primary; hasil yang dihitung di replica (bisa tertinggal
+dari versi itu) disimpan terpisah dengan umur = toleransi lag dan dikirim tanpa
+ETag/Last-Modified, jadi tidak pernah dianggap hasil final versi tersebut.
+"""
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+
+SEQUENCE = "inventory_ledger_version"
+PREFIX = "inventory:summary"
+
+
+def timeout():
+    return getattr(settings, "SUMMARY_CACHE_TIMEOUT", 600)
+
+
+# ------------- versi ledger -------------
+def version():
+    with connection.cursor() as cur:
+        cur.execute(f"SELECT last_value FROM {SEQUENCE}")
+        return cur.fetchone()[0]
+
+
+def _next_version():
+    with connection.cursor() as cur:
+        cur.execute(f"SELECT nextval('{SEQUENCE}')")
+
+
+def bump():
+    """Naikkan versi setelah transaksi DB berjalan commit (langsung jika autocommit); sekali per transaksi."""
+    if any(func is _next_version for _, func, _ in connection.run_on_commit):
+        return
+    transaction.on_commit(_next_version)
+
+
+def last_changed(v):
+    """Waktu versi ``v`` pertama terlihat (pendekatan Last-Modified, presisi detik)."""
+    return cache.get_or_set(f"{PREFIX}:changed:{v}", lambda: int(timezone.now().timestamp()), timeout() * 6)
+
+
+# ------------- hasil -------------
+def summary_key(start_dt, end_dt, cat_id="", prod_id="", with_choices=True):
+    raw = json.dumps([start_dt.isoformat() if start_dt else "", end_dt.isoformat() if end_dt else "",
+                      str(cat_id or ""), str(prod_id or ""), bool(with_choices)])
+    return hashlib.sha256(raw.encode()).hexdigest()[:32]
+
+
+def _count(name):
+    key = f"{PREFIX}:{name}"
+    if not cache.add(key, 1, None):
+        try:
+            cache.incr(key)
+        except ValueError:  # hilang di antara add & incr (eviction)
+            cache.add(key, 1, None)
+
+
+def lookup(v, key):
+    """Hasil tersimpan untuk versi ``v`` & filter ``key`` atau None; hit/miss ikut dihitung."""
+    res = cache.get(f"{PREFIX}:{v}:{key}")
+    _count("miss" if res is None else "hit")
+    return res
+
+
+def store(v, key, res, ttl=None):
+    cache.set(f"{PREFIX}:{v}:{key}", res, timeout() if ttl is None else ttl)
+
+
+def get_or_compute(v, key, compute, ttl=None):
+    """-> (hasil, hit)."""
+    res = lookup(v, key)
+    if res is not None:
+        return res, True
+    res = compute()
+    store(v, key, res, ttl)
+    return res, False
+
+
+def stats():
+    hits = cache.get(f"{PREFIX}:hit", 0)
+    misses = cache.get(f"{PREFIX}:miss", 0)
+    total = hits + misses
+    return {"hits": hits, "misses": misses, "hit_ratio": round(hits / total, 4) if total else None,
+            "version": version(), "backend": settings.CACHES["default"]["BACKEND"].rsplit(".", 1)[-1]}
+
+
+# ------------- conditional GET -------------
+def validators(request, v, key, user_id):
+    """(etag, last_modified) respons ringkasan; path ikut supaya HTML/JSON tidak tertukar."""
+    raw = f"{v}:{key}:{user_id}:{request.path}"
+    return quote_etag(hashlib.sha256(raw.encode()).hexdigest()[:32]), last_changed(v)
+
+
+def not_modified(request, etag, last_modified):
+    """Respons 304 jika validator klien masih cocok, selain itu None."""
+    return get_conditional_response(request, etag=etag, last_modified=last_modified)
+
+
+def set_validators(response, etag, last_modified, hit=None):
+    response.headers["ETag"] = etag
+    response.headers["Last-Modified"] = http_date(last_modified)
+    # data per user & bisa berubah kapan saja: boleh disimpan, wajib revalidasi
+    patch_cache_control(response, private=True, no_cache=True)
+    if hit is not None:
+        response.headers["X-Summary-Cache"] = "hit" if hit else "miss"
+    return response
@@ -3,6 +3,7 @@ from django import forms
 from crispy_forms.helper import FormHelper
 from crispy_forms.layout import Layout, Row, Column, Field, HTML, Div
 from .models import Product, Category, UoM, Transaction
+from .widgets import RemoteSelect
 
 class BaseCrispyModelForm(forms.ModelForm):
     """Form dasar agar semua punya helper crispy secara konsisten."""
@@ -18,6 +19,10 @@ class ProductForm(BaseCrispyModelForm):
     class Meta:
         model = Product
         fields = ["sku", "name", "category", "uom", "min_stock", "is_active"]
+        widgets = {
+            "category": RemoteSelect("inventory:category-lookup"),
+            "uom": RemoteSelect("inventory:uom-lookup"),
+        }
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -76,6 +81,8 @@ class TransactionForm(BaseCrispyModelForm):
         model = Transaction
         fields = ["product", "trx_type", "quantity", "note", "trx_date"]
         widgets = {
+            # picker remote: tidak merender seluruh katalog sebagai <option>
+            "product": RemoteSelect("inventory:product-autocomplete"),
             # gunakan input datetime-local agar enak dipakai
             "trx_date": forms.DateTimeInput(attrs={"type": "datetime-local"}),
             "note": forms.TextInput(attrs={"placeholder": "Catatan opsional"}),
@@ -0,0 +1,66 @@
+from datetime import datetime, timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.utils import timezone
+
+from inventory.models import Category, OpeningBalance, Product, StockDocument, Transaction, UoM
+
+
+class StockApiTests(TestCase):
+    def setUp(self):
+        self.client.force_login(get_user_model().objects.create_user("api", password="x"))
+        self.p = Product.objects.create(sku="A", name="A", category=Category.objects.create(name="Umum"),
+                                        uom=UoM.objects.create(name="PCS"), qty_on_hand=12)
+        self.cutoff = timezone.make_aware(datetime(2026, 1, 1))
+        OpeningBalance.objects.create(product=self.p, as_of=self.cutoff, quantity=12)
+        with self.captureOnCommitCallbacks(execute=True):  # balance_after diisi on_commit
+            Transaction.objects.create(product=self.p, trx_type=Transaction.OUT, quantity=2,
+                                       trx_date=self.cutoff + timedelta(days=3))
+
+    def as_of(self, at):
+        return self.client.get("/inventory/stock/as-of/", {"product": self.p.pk, "at": at})
+
+    def test_impossible_dates_are_400(self):
+        for at in ("2026-02-30T10:00", "2026-02-30", "2026-13-01"):
+            with self.subTest(at=at):
+                response = self.as_of(at)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn("error", response.json())
+        response = self.client.get("/inventory/stock/low/", {"before": "2026-02-30T10:00:00+07:00~1"})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {"error": "Parameter 'before' tidak valid."})
+
+    def test_as_of_before_archive_cutoff_is_400(self):
+        response = self.as_of("2025-12-31T23:59")
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("batas arsip", response.json()["error"])
+
+    def test_as_of_serves_opening_balance_from_cutoff(self):
+        self.assertEqual(self.as_of(self.cutoff.isoformat()).json()["qty"], "12.00")
+        self.assertEqual(self.as_of("2026-01-02").json()["qty"], "12.00")
+        self.assertEqual(self.as_of("2026-01-03").json()["qty"], "12.00")
+        self.assertEqual(self.as_of("2026-01-04").json()["qty"], "10.00")  # tanggal saja = akhir hari
+
+
+class StockDocumentApiTests(TestCase):
+    def setUp(self):
+        self.client.force_login(get_user_model().objects.create_user("api", password="x"))
+        Product.objects.create(sku="A", name="A", category=Category.objects.create(name="Umum"),
+                               uom=UoM.objects.create(name="PCS"))
+
+    def post(self, **data):
+        return self.client.post("/inventory/documents/api/", {"doc_type": "IN", "lines": [{"sku": "A", "quantity": 1}],
+                                                               **data}, content_type="application/json")
+
+    def test_number_too_long_is_400(self):
+        response = self.post(number="N" * 51)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {"errors": ["Nomor dokumen maksimal 50 karakter."]})
+        self.assertFalse(StockDocument.objects.exists())
+        self.assertEqual(self.post(number="N" * 50).status_code, 201)
+
+    def test_impossible_doc_date_is_400(self):
+        response = self.post(doc_date="2026-02-30T10:00")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {"errors": ["doc_date tidak valid: '2026-02-30T10:00'"]})
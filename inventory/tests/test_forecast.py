@@ -0,0 +1,49 @@
+import csv
+import io
+import os
+import tempfile
+
+import numpy as np
+from django.core.management import call_command
+from django.test import TestCase
+
+from inventory import forecast
+from inventory.models import Category, Product, UoM
+
+
+class ForecastExportTests(TestCase):
+    def setUp(self):
+        uom = UoM.objects.create(name="PCS")
+        self.cats = [Category.objects.create(name="Satu"), Category.objects.create(name="Dua")]
+        for i in range(7):
+            Product.objects.create(sku=f"SKU-{i}", name=f"Barang {i}", category=self.cats[i % 2], uom=uom,
+                                   min_stock=i)
+
+    def expected(self, fc):
+        return [forecast.export_row(r) for r in forecast.rows(fc, np.arange(len(fc["ids"])))]
+
+    def test_chunks_match_all_rows(self):
+        fc = forecast.forecast()
+        for chunk in (1, 2, 3, 7, 100):
+            with self.subTest(chunk=chunk):
+                with self.assertNumQueries(7 // chunk + 1):
+                    got = list(forecast.export_rows(fc, chunk=chunk))
+                self.assertEqual(got, self.expected(fc))
+
+    def test_filtered_queryset_and_new_products(self):
+        qs = Product.objects.filter(category=self.cats[1])
+        fc = forecast.forecast(qs)
+        Product.objects.create(sku="SKU-NEW", name="Baru", category=self.cats[1], uom=UoM.objects.get())
+        got = list(forecast.export_rows(fc, qs, chunk=2))
+        self.assertEqual(got, self.expected(fc))
+        self.assertEqual([r[0] for r in got], ["SKU-1", "SKU-3", "SKU-5"])
+
+    def test_command_writes_every_product(self):
+        fd, path = tempfile.mkstemp(suffix=".csv")
+        os.close(fd)
+        self.addCleanup(os.remove, path)
+        call_command("forecast_stock", csv=path, stdout=io.StringIO())
+        with open(path, encoding="utf-8") as f:
+            lines = list(csv.reader(f))
+        self.assertEqual(lines[0], forecast.EXPORT_HEADER)
+        self.assertEqual([r[0] for r in lines[1:]], [f"SKU-{i}" for i in range(7)])
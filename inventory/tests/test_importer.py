@@ -0,0 +1,60 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.test import TestCase
+from django.utils import timezone
+
+from inventory import ledger
+from inventory.importer import import_rows
+from inventory.models import INSUFFICIENT_STOCK_MSG, Category, Product, Transaction, UoM
+
+
+class ImportTests(TestCase):
+    def setUp(self):
+        cat, uom = Category.objects.create(name="Umum"), UoM.objects.create(name="PCS")
+        self.a = Product.objects.create(sku="A", name="A", category=cat, uom=uom)
+        self.b = Product.objects.create(sku="B", name="B", category=cat, uom=uom)
+        self.now = timezone.now().replace(microsecond=0)
+        for days, product, trx_type, qty in ((20, self.a, "IN", 50), (15, self.a, "OUT", 10), (10, self.a, "IN", 5),
+                                             (5, self.a, "OUT", 7), (12, self.b, "IN", 8), (2, self.b, "OUT", 3)):
+            Transaction.objects.create(product=product, trx_type=trx_type, quantity=qty,
+                                       trx_date=self.now - timedelta(days=days))
+
+    def row(self, sku, trx_type, qty, days_ago):
+        return {"sku": sku, "trx_type": trx_type, "quantity": str(qty),
+                "trx_date": (self.now - timedelta(days=days_ago)).isoformat()}
+
+    def balances(self):
+        return list(Transaction.objects.order_by("product_id", "trx_date", "id")
+                    .values_list("id", "balance_after"))
+
+    def test_balances_match_full_recompute(self):
+        created, errors = import_rows([
+            self.row("A", "IN", 4, 12),    # back-dated di tengah riwayat
+            self.row("A", "OUT", 2, 1),
+            self.row("B", "IN", "1.5", 30),  # sebelum baris pertama produk
+            self.row("B", "OUT", 1, 0),
+        ])
+        self.assertEqual((created, errors), (4, []))
+        imported = self.balances()
+        ledger.recompute()
+        self.assertEqual(imported, self.balances())
+        self.assertEqual(Product.objects.get(pk=self.a.pk).qty_on_hand, Decimal(40))
+        self.assertEqual(Product.objects.get(pk=self.b.pk).qty_on_hand, Decimal("5.5"))
+
+    def test_row_going_negative_is_reported_and_rest_kept(self):
+        created, errors = import_rows([
+            self.row("B", "OUT", 2, 1),
+            self.row("B", "OUT", 4, 1),    # sisa 3 -> ditolak
+            self.row("A", "OUT", 30, 1),
+            self.row("X", "IN", 1, 1),
+            self.row("B", "OUT", 3, 0),
+        ])
+        self.assertEqual(created, 3)
+        self.assertEqual(errors, [(2, INSUFFICIENT_STOCK_MSG), (4, "SKU tidak ditemukan: 'X'")])
+        self.assertEqual(Product.objects.get(pk=self.b.pk).qty_on_hand, Decimal(0))
+        self.assertEqual(Product.objects.get(pk=self.a.pk).qty_on_hand, Decimal(8))
+        self.assertFalse(Transaction.objects.filter(product=self.b, quantity=4).exists())
+        imported = self.balances()
+        ledger.recompute()
+        self.assertEqual(imported, self.balances())
@@ -0,0 +1,113 @@
+import re
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.test import TestCase
+
+from inventory import services
+from inventory.forms import ProductForm
+from inventory.models import Category, Product, Transaction, UoM
+
+
+def make_product(sku="P-1", **kwargs):
+    cat, _ = Category.objects.get_or_create(name="Umum")
+    uom, _ = UoM.objects.get_or_create(name="PCS")
+    return Product.objects.create(sku=sku, name=kwargs.pop("name", sku), category=cat, uom=uom, **kwargs)
+
+
+def stock(product):
+    return Product.objects.get(pk=product.pk).qty_on_hand
+
+
+class ProductEditTests(TestCase):
+    def setUp(self):
+        self.product = make_product(min_stock=5)
+        Transaction.objects.create(product=self.product, trx_type=Transaction.IN, quantity=10)
+
+    def form_data(self, **changes):
+        p = self.product
+        return {"sku": p.sku, "name": p.name, "category": p.category_id, "uom": p.uom_id,
+                "min_stock": p.min_stock, "is_active": "on", **changes}
+
+    def test_edit_keeps_delta_posted_while_form_open(self):
+        loaded = Product.objects.get(pk=self.product.pk)
+        form = ProductForm(self.form_data(name="Baru"), instance=loaded)
+        self.assertTrue(form.is_valid(), form.errors)
+        # delta masuk di antara form dibuka dan disimpan
+        services.apply_deltas({self.product.pk: Decimal(7)})
+        form.save()
+        p = Product.objects.get(pk=self.product.pk)
+        self.assertEqual(p.name, "Baru")
+        self.assertEqual(p.qty_on_hand, Decimal(17))
+
+    def test_min_stock_change_uses_current_stock_for_low_since(self):
+        loaded = Product.objects.get(pk=self.product.pk)
+        form = ProductForm(self.form_data(min_stock="15"), instance=loaded)
+        self.assertTrue(form.is_valid(), form.errors)
+        services.apply_deltas({self.product.pk: Decimal(10)})  # 20 >= 15: tidak low
+        form.save()
+        self.assertIsNone(Product.objects.get(pk=self.product.pk).low_since)
+        form = ProductForm(self.form_data(min_stock="25"), instance=Product.objects.get(pk=self.product.pk))
+        self.assertTrue(form.is_valid(), form.errors)
+        form.save()
+        self.assertIsNotNone(Product.objects.get(pk=self.product.pk).low_since)
+
+    def test_admin_cannot_write_stock(self):
+        admin = get_user_model().objects.create_superuser("admin", "a@example.com", "x")
+        self.client.force_login(admin)
+        url = f"/admin/inventory/product/{self.product.pk}/change/"
+        response = self.client.post(url, {**self.form_data(name="Admin"), "qty_on_hand": "999"})
+        self.assertEqual(response.status_code, 302)
+        p = Product.objects.get(pk=self.product.pk)
+        self.assertEqual((p.name, p.qty_on_hand), ("Admin", Decimal(10)))
+
+
+class PostingTests(TestCase):
+    def setUp(self):
+        self.a = make_product("A")
+        self.b = make_product("B")
+        self.trx = Transaction.objects.create(product=self.a, trx_type=Transaction.IN, quantity=10)
+
+    def test_out_above_stock_is_rejected_and_rolled_back(self):
+        with self.assertRaises(ValidationError):
+            Transaction.objects.create(product=self.a, trx_type=Transaction.OUT, quantity=11)
+        self.assertEqual(stock(self.a), Decimal(10))
+        self.assertEqual(Transaction.objects.filter(product=self.a).count(), 1)
+        with self.assertRaises(ValidationError), transaction.atomic():
+            services.apply_deltas({self.b.pk: Decimal(3), self.a.pk: Decimal(-11)})
+        self.assertEqual((stock(self.a), stock(self.b)), (Decimal(10), Decimal(0)))
+
+    def test_edit_moves_delta_to_new_product(self):
+        self.trx.product = self.b
+        self.trx.quantity = 4
+        self.trx.save()
+        self.assertEqual((stock(self.a), stock(self.b)), (Decimal(0), Decimal(4)))
+
+    def test_edit_type_reverses_old_delta(self):
+        Transaction.objects.create(product=self.a, trx_type=Transaction.IN, quantity=20)
+        self.trx.trx_type = Transaction.OUT
+        self.trx.save()
+        self.assertEqual(stock(self.a), Decimal(10))
+        self.assertEqual(Product.objects.get(pk=self.a.pk).transactions.order_by("id").last().balance_after,
+                         Decimal(10))
+
+    def test_delete_reverses_delta(self):
+        out = Transaction.objects.create(product=self.a, trx_type=Transaction.OUT, quantity=4)
+        out.delete()
+        self.assertEqual(stock(self.a), Decimal(10))
+        self.trx.delete()
+        self.assertEqual(stock(self.a), Decimal(0))
+
+    def test_edit_reads_old_row_once(self):
+        trx = Transaction.objects.get(pk=self.trx.pk)
+        trx.quantity = 12
+        # savepoint (2), baris lama, UPDATE baris, stok, rollup, geser saldo lama, saldo baru (3), change feed
+        with self.assertNumQueries(11) as ctx:
+            trx.save()
+        # SELECT tingkat atas dari tabel transaksi (subquery saldo ledger.place tidak dihitung)
+        reads = [q["sql"] for q in ctx.captured_queries if re.match(r'SELECT [^()]* FROM "inventory_transaction"', q["sql"])]
+        self.assertEqual(len(reads), 1, reads)
+        self.assertIn("FOR UPDATE", reads[0])
+        self.assertEqual(stock(self.a), Decimal(12))
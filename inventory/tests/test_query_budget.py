@@ -0,0 +1,158 @@
+import gzip
+import json
+import re
+import tempfile
+from datetime import timedelta
+from decimal import Decimal
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from inventory import documents
+from inventory.models import Category, ExportJob, Product, StockDocument, Transaction, UoM
+from warehouse.middleware import QueryBudgetExceeded
+
+N = 3
+
+
+# TransactionTestCase: on_commit (versi ledger) jalan seperti di produksi, jadi hitungan = hitungan nyata.
+# Replica dimatikan: budget menghitung query view, pemilihan replica di luar hitungan.
+@override_settings(QUERY_BUDGET_STRICT=True, READ_REPLICA=None)
+class QueryBudgetTests(TransactionTestCase):
+    """Setiap view di bawah budget-nya dan jumlah query-nya tidak tumbuh dengan jumlah baris (N vs 10N)."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_superuser("budget", "b@example.com", "x")
+        self.client.force_login(self.user)
+        self.uom = UoM.objects.create(name="PCS")
+        self.export_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.export_dir.cleanup)
+        self.seeded = 0
+
+    def seed(self, n):
+        now = timezone.now()
+        products = []
+        for i in range(self.seeded, self.seeded + n):
+            cat = Category.objects.create(name=f"Kategori {i:03}")
+            p = Product.objects.create(sku=f"SKU-{i:03}", name=f"Barang {i:03}", category=cat, uom=self.uom,
+                                       min_stock=Decimal(10 if i % 2 else 0))
+            Transaction.objects.create(product=p, trx_type=Transaction.IN, quantity=10,
+                                       trx_date=now - timedelta(days=2), note="awal")
+            Transaction.objects.create(product=p, trx_type=Transaction.OUT, quantity=3,
+                                       trx_date=now - timedelta(days=1))
+            products.append(p)
+        self.seeded += n
+        self.document = documents.post_document(
+            Transaction.IN, [{"product_id": p.pk, "quantity": "1"} for p in products])
+        path = Path(self.export_dir.name) / f"summary-{self.seeded}.csv.gz"
+        with gzip.open(path, "wt") as f:
+            f.write("SKU\n")
+        self.job = ExportJob.objects.create(kind="summary", filter_key="x" * 64, status=ExportJob.DONE,
+                                            file_path=str(path))
+
+    def urls(self):
+        p = Product.objects.order_by("pk").first()
+        t = Transaction.objects.filter(product=p).order_by("pk").first()
+        cat, uom, job = p.category_id, self.uom.pk, self.job.pk
+        today = timezone.localdate()
+        return [
+            "/",
+            "/inventory/products/", "/inventory/products/?q=barang&low=1", f"/inventory/products/?cat={cat}&active=1",
+            "/inventory/products/autocomplete/?q=S", "/inventory/products/new/",
+            f"/inventory/products/{p.pk}/edit/", f"/inventory/products/{p.pk}/delete/",
+            "/inventory/categories/", "/inventory/categories/lookup/?q=Kat", "/inventory/categories/new/",
+            f"/inventory/categories/{cat}/edit/", f"/inventory/categories/{cat}/delete/",
+            "/inventory/uoms/", "/inventory/uoms/lookup/", "/inventory/uoms/new/",
+            f"/inventory/uoms/{uom}/edit/", f"/inventory/uoms/{uom}/delete/",
+            "/inventory/transactions/", "/inventory/transactions/import/", "/inventory/transactions/new/",
+            f"/inventory/transactions/{t.pk}/edit/", f"/inventory/transactions/{t.pk}/delete/",
+            "/inventory/documents/", "/inventory/documents/new/", f"/inventory/documents/{self.document.pk}/",
+            f"/inventory/stock/as-of/?product={p.pk}&at={today}", f"/inventory/stock/as-of/?sku={p.sku}&at={today}T12:00",
+            f"/inventory/stock/series/?prod={p.pk}", "/inventory/stock/series/",
+            "/inventory/stock/low/", "/inventory/stock/changes/",
+            "/inventory/summary/", f"/inventory/summary/?cat={cat}&start={today - timedelta(days=7)}",
+            "/inventory/summary/?export=csv", "/inventory/summary/?export=csv&kind=detail",
+            "/inventory/summary/async/", "/inventory/summary/api/", "/inventory/summary/cache-stats/",
+            "/inventory/forecast/", "/inventory/forecast/?export=csv",
+            "/inventory/exports/", f"/inventory/exports/{job}/", f"/inventory/exports/{job}/?format=json",
+            f"/inventory/exports/{job}/download/",
+            "/admin/inventory/product/", "/admin/inventory/transaction/", "/admin/inventory/category/",
+            "/admin/inventory/uom/", f"/admin/inventory/product/{p.pk}/change/",
+            f"/admin/inventory/transaction/{t.pk}/change/",
+        ]
+
+    def counts(self):
+        result = {}
+        for url in self.urls():
+            cache.clear()  # selalu jalur miss cache ringkasan
+            with CaptureQueriesContext(connection) as ctx, self.assertNoLogs("warehouse.sql.budget", "WARNING"):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, 200, url)
+                if response.streaming:
+                    b"".join(response.streaming_content)
+                else:
+                    response.content
+                response.close()
+            result[re.sub(r"/\d+/", "/<pk>/", url)] = len(ctx)
+        return result
+
+    def test_query_count_does_not_grow_with_rows(self):
+        self.maxDiff = None
+        self.seed(N)
+        self.counts()  # pemanasan: cache ContentType/permission admin, dsb.
+        small = self.counts()
+        self.seed(9 * N)
+        large = self.counts()
+        self.assertEqual(Transaction.objects.count(), 30 * N)
+        self.assertEqual(small, large)
+
+    def test_write_views_within_budget(self):
+        self.seed(N)
+        p = Product.objects.order_by("pk").first()
+        form = {"sku": "SKU-NEW", "name": "Baru", "category": p.category_id, "uom": self.uom.pk,
+                "min_stock": "1", "is_active": "on"}
+        trx = {"product": p.pk, "trx_type": Transaction.IN, "quantity": "2", "note": "",
+               "trx_date": timezone.localtime().strftime("%Y-%m-%d %H:%M")}
+        with self.assertNoLogs("warehouse.sql.budget", "WARNING"):
+            self.assertEqual(self.client.post("/inventory/products/new/", form).status_code, 302)
+            new = Product.objects.get(sku="SKU-NEW")
+            self.assertEqual(self.client.post(f"/inventory/products/{new.pk}/edit/",
+                                              {**form, "min_stock": "5"}).status_code, 302)
+            self.assertEqual(self.client.post("/inventory/categories/new/", {"name": "Baru", "is_active": "on"})
+                             .status_code, 302)
+            cat = Category.objects.get(name="Baru")
+            self.assertEqual(self.client.post(f"/inventory/categories/{cat.pk}/edit/",
+                                              {"name": "Baru 2", "is_active": "on"}).status_code, 302)
+            self.assertEqual(self.client.post("/inventory/uoms/new/", {"name": "BOX"}).status_code, 302)
+            box = UoM.objects.get(name="BOX")
+            self.assertEqual(self.client.post(f"/inventory/uoms/{box.pk}/edit/", {"name": "DUS"}).status_code, 302)
+            self.assertEqual(self.client.post("/inventory/transactions/new/", {**trx, "product": new.pk})
+                             .status_code, 302)
+            t = Transaction.objects.filter(product=new).get()
+            self.assertEqual(self.client.post(f"/inventory/transactions/{t.pk}/edit/",
+                                              {**trx, "product": new.pk, "quantity": "3"}).status_code, 302)
+            self.assertEqual(self.client.post(f"/inventory/transactions/{t.pk}/delete/").status_code, 302)
+            self.assertEqual(self.client.post("/inventory/exports/new/", {"kind": "summary"}).status_code, 302)
+            self.assertEqual(self.client.post(f"/inventory/products/{p.pk}/delete/").status_code, 302)
+            self.assertEqual(self.client.post(f"/inventory/uoms/{box.pk}/delete/").status_code, 302)
+            self.assertEqual(self.client.post(f"/inventory/categories/{cat.pk}/delete/").status_code, 302)
+        self.assertFalse(Product.objects.filter(pk=p.pk).exists())
+        self.assertEqual(StockDocument.objects.count(), 1)
+
+    def test_async_summary_counts_part_threads(self):
+        self.seed(N)
+        cache.clear()
+        with CaptureQueriesContext(connection) as ctx, self.assertLogs("warehouse.sql", "INFO") as logs:
+            self.assertEqual(self.client.get("/inventory/summary/api/").status_code, 200)
+        logged = json.loads(logs.records[-1].getMessage())["queries"]
+        # bagian ringkasan jalan di thread lain dengan koneksi sendiri: tidak terlihat di koneksi ini
+        self.assertGreater(logged, len(ctx))
+        with override_settings(QUERY_BUDGETS={"inventory:summary-api": len(ctx)}):
+            cache.clear()
+            with self.assertRaises(QueryBudgetExceeded):
+                self.client.get("/inventory/summary/api/")
@@ -0,0 +1,125 @@
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.db.models import DateField, Q, Sum
+from django.db.models.functions import TruncDate, TruncMonth, TruncWeek
+from django.test import TestCase
+from django.utils import timezone
+
+from inventory import rollup, timeseries
+from inventory.models import Category, Product, Transaction, UoM
+from inventory.views_report import export_rows, filtered_trx_qs, per_product_qs
+
+RAW_TRUNC = {"day": TruncDate("trx_date"), "week": TruncWeek("trx_date", output_field=DateField()),
+             "month": TruncMonth("trx_date", output_field=DateField())}
+
+
+class RollupMatchesRawTests(TestCase):
+    """Laporan dari rollup harian + tepi mentah harus sama persis dengan agregasi langsung atas Transaction."""
+
+    def setUp(self):
+        uom = UoM.objects.create(name="PCS")
+        self.cat1 = Category.objects.create(name="Satu")
+        self.cat2 = Category.objects.create(name="Dua")
+        self.a = Product.objects.create(sku="A", name="A", category=self.cat1, uom=uom)
+        self.b = Product.objects.create(sku="B", name="B", category=self.cat1, uom=uom)
+        self.c = Product.objects.create(sku="C", name="C", category=self.cat2, uom=uom)
+        # 8 hari lokal; jam 00:xx & 23:xx = beda hari UTC vs Asia/Jakarta (batas TruncDate/rollup)
+        self.day0 = timezone.localdate() - timedelta(days=12)
+        self.trxs = []
+        for d in range(8):
+            for product, hour, qty in ((self.a, 0, 5), (self.a, 23, 7), (self.b, 12, 3), (self.c, 9, 11)):
+                self.post(product, Transaction.IN, qty * 3, self.at(d, hour, 10))
+                self.trxs.append(self.post(product, Transaction.OUT, qty, self.at(d, hour, 40)))
+
+    def at(self, day, hour, minute=0):
+        return timezone.make_aware(datetime.combine(self.day0 + timedelta(days=day), time(hour, minute)))
+
+    def post(self, product, trx_type, qty, trx_date):
+        return Transaction.objects.create(product=product, trx_type=trx_type, quantity=qty, trx_date=trx_date)
+
+    def ranges(self):
+        return [
+            (None, None),
+            (self.at(1, 0), self.at(5, 0)),        # hari penuh
+            (self.at(1, 13), self.at(6, 9, 30)),   # tepi parsial di kedua sisi
+            (self.at(3, 8), self.at(3, 23, 30)),   # di dalam satu hari
+            (self.at(2, 23, 20), None),            # start parsial, end terbuka
+            (None, self.at(4, 0, 20)),             # end parsial, start terbuka
+        ]
+
+    def filters(self):
+        return [("", ""), (str(self.cat1.pk), ""), ("", str(self.a.pk)), (str(self.cat2.pk), str(self.a.pk))]
+
+    def raw(self, start, end, cat, prod):
+        params = {"start": start.isoformat() if start else "", "end": end.isoformat() if end else "",
+                  "cat": cat, "prod": prod}
+        return filtered_trx_qs(params)[0].select_related(None).order_by(), params
+
+    def products(self, cat, prod):
+        qs = Product.objects.order_by("name")
+        if cat:
+            qs = qs.filter(category_id=cat)
+        if prod:
+            qs = qs.filter(pk=prod)
+        return qs
+
+    def assertMatchesRaw(self):
+        sums = {"i": Sum("quantity", filter=Q(trx_type="IN")), "o": Sum("quantity", filter=Q(trx_type="OUT"))}
+        for start, end in self.ranges():
+            for cat, prod in self.filters():
+                with self.subTest(start=start, end=end, cat=cat, prod=prod):
+                    raw, params = self.raw(start, end, cat, prod)
+                    agg = raw.aggregate(**sums)
+                    self.assertEqual(rollup.totals(start, end, cat, prod), (agg["i"] or 0, agg["o"] or 0))
+
+                    expected = {}
+                    for p in self.products(cat, prod):
+                        agg = raw.filter(product=p).aggregate(**sums)
+                        i, o = agg["i"] or Decimal(0), agg["o"] or Decimal(0)
+                        expected[p.sku] = (i, o, i - o)
+                    got = {p.sku: (p.in_qty, p.out_qty, p.net) for p in per_product_qs(start, end, cat, prod)}
+                    self.assertEqual(got, expected)
+                    _, rows = export_rows("summary", params)
+                    self.assertEqual({r[0]: (r[4], r[5], r[6]) for r in rows}, expected)
+
+                    for bucket, trunc in RAW_TRUNC.items():
+                        raw_rows = [(b, t, q) for b, t, q in raw.annotate(b=trunc).values("b", "trx_type")
+                                    .annotate(q=Sum("quantity")).order_by("b", "trx_type")
+                                    .values_list("b", "trx_type", "q") if q]
+                        self.assertEqual(rollup.per_bucket(start, end, cat, prod, bucket), raw_rows, bucket)
+
+                    series = timeseries.series(start, end, cat, prod, bucket="day")
+                    chart = {(b, "IN"): q for b, q in zip(series["labels"], series["in"]) if q}
+                    chart.update({(b, "OUT"): q for b, q in zip(series["labels"], series["out"]) if q})
+                    days = (raw.annotate(b=TruncDate("trx_date")).values("b", "trx_type").annotate(q=Sum("quantity"))
+                            .exclude(q=0).values_list("b", "trx_type", "q"))
+                    self.assertEqual(chart, {(b, t): q for b, t, q in days})
+
+    def test_matches_raw(self):
+        self.assertMatchesRaw()
+
+    def test_matches_raw_after_backdated_edit(self):
+        trx = self.trxs[20]
+        trx.trx_date = self.at(0, 23, 50)
+        trx.quantity = 2
+        trx.save()
+        self.assertMatchesRaw()
+
+    def test_matches_raw_after_product_and_type_change(self):
+        trx = self.trxs[9]
+        trx.product = self.c
+        trx.trx_type = Transaction.IN
+        trx.save()
+        self.assertMatchesRaw()
+
+    def test_matches_raw_after_delete(self):
+        self.trxs[5].delete()
+        self.trxs[30].delete()
+        self.assertMatchesRaw()
+
+    def test_matches_raw_after_rebuild(self):
+        self.trxs[14].delete()
+        rollup.rebuild()
+        self.assertMatchesRaw()
+
@@ -0,0 +1,111 @@
+# inventory/timeseries.py
+"""
+Seri waktu masuk/keluar per bucket (hari/minggu/bulan) untuk chart & API.
+
+Agregasi per bucket dilakukan di DB (``rollup.per_bucket``); di sini hanya
+pemilihan bucket, zero-fill satu lintasan linear, dan downsampling agar jumlah
+titik tidak melewati ``max_points`` (bucket berurutan digabung, nilainya dijumlah
+— aman karena masuk/keluar adalah arus, bukan saldo).
+"""
+import math
+from datetime import date, timedelta
+
+from django.utils import timezone
+
+from . import rollup
+
+BUCKETS = ("day", "week", "month")
+BUCKET_LABELS = {"day": "Harian", "week": "Mingguan", "month": "Bulanan"}
+DEFAULT_MAX_POINTS = 120
+MAX_POINTS_LIMIT = 1000
+
+
+def bucket_start(d, bucket):
+    """Awal bucket yang memuat tanggal ``d`` (minggu = Senin, seperti date_trunc Postgres)."""
+    if bucket == "week":
+        return d - timedelta(days=d.weekday())
+    if bucket == "month":
+        return d.replace(day=1)
+    return d
+
+
+def next_bucket(d, bucket):
+    if bucket == "week":
+        return d + timedelta(days=7)
+    if bucket == "month":
+        return date(d.year + d.month // 12, d.month % 12 + 1, 1)
+    return d + timedelta(days=1)
+
+
+def choose_bucket(first, last, max_points):
+    """Bucket terkecil yang jumlah titiknya muat di ``max_points``."""
+    days = (last - first).days + 1
+    if days <= max_points:
+        return "day"
+    if math.ceil(days / 7) <= max_points:
+        return "week"
+    return "month"
+
+
+def _local_day(dt):
+    if timezone.is_naive(dt):
+        dt = timezone.make_aware(dt)
+    return timezone.localdate(dt)
+
+
+def day_bounds(start_dt, end_dt, cat_id="", prod_id=""):
+    """(hari pertama, hari terakhir) inklusif; sisi terbuka diisi dari data (None jika kosong)."""
+    first = _local_day(start_dt) if start_dt else None
+    # end eksklusif: tepat tengah malam berarti hari sebelumnya yang terakhir
+    last = _local_day(end_dt - timedelta(microseconds=1)) if end_dt else None
+    if first is None or last is None:
+        lo, hi = rollup.day_span(cat_id, prod_id)
+        first = first or lo
+        last = last or hi or timezone.localdate()
+    if first is None or last < first:
+        return None, None
+    return first, last
+
+
+def zero_fill(rows, first, last, bucket):
+    """
+    ``rows`` = (bucket_start, trx_type, qty) dari DB -> (labels, ins, outs) untuk
+    semua bucket first..last, bucket kosong = 0. Satu lintasan, O(bucket + rows).
+    """
+    ins, outs = {}, {}
+    for b, t, q in rows:
+        (ins if t == "IN" else outs)[b] = q
+    labels, in_vals, out_vals = [], [], []
+    b, end = bucket_start(first, bucket), bucket_start(last, bucket)
+    while b <= end:
+        labels.append(b)
+        in_vals.append(ins.get(b, 0))
+        out_vals.append(outs.get(b, 0))
+        b = next_bucket(b, bucket)
+    return labels, in_vals, out_vals
+
+
+def downsample(labels, ins, outs, max_points):
+    """Gabung tiap ``k`` bucket berurutan sampai jumlah titik <= ``max_points``."""
+    if len(labels) <= max_points:
+        return labels, ins, outs
+    k = math.ceil(len(labels) / max_points)
+    return (labels[::k],
+            [sum(ins[i:i + k]) for i in range(0, len(ins), k)],
+            [sum(outs[i:i + k]) for i in range(0, len(outs), k)])
+
+
+def series(start_dt, end_dt, cat_id="", prod_id="", bucket="auto", max_points=DEFAULT_MAX_POINTS):
+    """
+    -> dict(bucket, labels [date], in [Decimal], out [Decimal]). ``bucket="auto"``
+    memilih hari/minggu/bulan dari panjang rentang; hasil selalu <= ``max_points``.
+    """
+    max_points = max(1, min(max_points, MAX_POINTS_LIMIT))
+    first, last = day_bounds(start_dt, end_dt, cat_id, prod_id)
+    if first is None:
+        return {"bucket": bucket if bucket in BUCKETS else "day", "labels": [], "in": [], "out": []}
+    if bucket not in BUCKETS:
+        bucket = choose_bucket(first, last, max_points)
+    rows = rollup.per_bucket(start_dt, end_dt, cat_id, prod_id, bucket)
+    labels, ins, outs = downsample(*zero_fill(rows, first, last, bucket), max_points)
+    return {"bucket": bucket, "labels": labels, "in": ins, "out": outs}
@@ -1,23 +1,47 @@
 from django.urls import path
 from . import views_master as v
-from .views_report import InventorySummaryView
+from .views_report import ForecastView, InventorySummaryView, SummaryCacheStats
+from .views_async import InventorySummaryAsyncView, InventorySummaryAPI
+from .views_document import StockDocumentAPI, StockDocumentCreate, StockDocumentDetail, StockDocumentList
+from .views_export import ExportJobCreate, ExportJobDetail, ExportJobDownload, ExportJobList
+from .views_api import ProductAutocomplete, CategoryLookup, UoMLookup, StockAsOf, StockSeries, LowStockFeed, StockChangeFeed
 app_name='inventory'
 urlpatterns=[
  path('products/', v.ProductList.as_view(), name='product-list'),
+ path('products/autocomplete/', ProductAutocomplete.as_view(), name='product-autocomplete'),
  path('products/new/', v.ProductCreate.as_view(), name='product-create'),
  path('products/<int:pk>/edit/', v.ProductUpdate.as_view(), name='product-update'),
  path('products/<int:pk>/delete/', v.ProductDelete.as_view(), name='product-delete'),
  path('categories/', v.CategoryList.as_view(), name='category-list'),
+ path('categories/lookup/', CategoryLookup.as_view(), name='category-lookup'),
  path('categories/new/', v.CategoryCreate.as_view(), name='category-create'),
  path('categories/<int:pk>/edit/', v.CategoryUpdate.as_view(), name='category-update'),
  path('categories/<int:pk>/delete/', v.CategoryDelete.as_view(), name='category-delete'),
  path('uoms/', v.UoMList.as_view(), name='uom-list'),
+ path('uoms/lookup/', UoMLookup.as_view(), name='uom-lookup'),
  path('uoms/new/', v.UoMCreate.as_view(), name='uom-create'),
  path('uoms/<int:pk>/edit/', v.UoMUpdate.as_view(), name='uom-update'),
  path('uoms/<int:pk>/delete/', v.UoMDelete.as_view(), name='uom-delete'),
  path('transactions/', v.TransactionList.as_view(), name='transaction-list'),
+ path('transactions/import/', v.TransactionImport.as_view(), name='transaction-import'),
  path('transactions/new/', v.TransactionCreate.as_view(), name='transaction-create'),
  path('transactions/<int:pk>/edit/', v.TransactionUpdate.as_view(), name='transaction-update'),
  path('transactions/<int:pk>/delete/', v.TransactionDelete.as_view(), name='transaction-delete'),
+ path('documents/', StockDocumentList.as_view(), name='document-list'),
+ path('documents/new/', StockDocumentCreate.as_view(), name='document-create'),
+ path('documents/api/', StockDocumentAPI.as_view(), name='document-api'),
+ path('documents/<int:pk>/', StockDocumentDetail.as_view(), name='document-detail'),
+ path('stock/as-of/', StockAsOf.as_view(), name='stock-as-of'),
+ path('stock/series/', StockSeries.as_view(), name='stock-series'),
+ path('stock/low/', LowStockFeed.as_view(), name='low-stock-feed'),
+ path('stock/changes/', StockChangeFeed.as_view(), name='stock-changes'),
  path("summary/", InventorySummaryView.as_view(), name="summary"),
+ path("summary/async/", InventorySummaryAsyncView.as_view(), name="summary-async"),
+ path("summary/api/", InventorySummaryAPI.as_view(), name="summary-api"),
+ path("summary/cache-stats/", SummaryCacheStats.as_view(), name="summary-cache-stats"),
+ path("forecast/", ForecastView.as_view(), name="forecast"),
+ path("exports/", ExportJobList.as_view(), name="export-list"),
+ path("exports/new/", ExportJobCreate.as_view(), name="export-create"),
+ path("exports/<int:pk>/", ExportJobDetail.as_view(), name="export-detail"),
+ path("exports/<int:pk>/download/", ExportJobDownload.as_view(), name="export-download"),
 ]
@@ -1,9 +1,15 @@
 from django.contrib.auth.views import LoginView as BaseLoginView, LogoutView as BaseLogoutView
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.views.generic import TemplateView
+from .views_api import recent_low_stock
 class LoginView(BaseLoginView):
     template_name='registration/login.html'
 class LogoutView(BaseLogoutView):
     pass
 class DashboardView(LoginRequiredMixin, TemplateView):
     template_name='inventory/dashboard.html'
+    query_budget=4
+    def get_context_data(self, **kwargs):
+        ctx=super().get_context_data(**kwargs)
+        ctx['low_recent']=recent_low_stock(8)
+        return ctx
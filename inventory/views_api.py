@@ -0,0 +1,203 @@
+# inventory/views_api.py
+from datetime import datetime, timedelta
+
+from django.contrib.auth.mixins import LoginRequiredMixin
+from django.db.models import Q
+from django.http import JsonResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from django.views import View
+
+from . import changefeed, ledger, partitions, shards, timeseries
+from .models import Category, Product, UoM
+from .search import AUTOCOMPLETE_LIMIT, AUTOCOMPLETE_MAX_LIMIT, autocomplete
+from .views_report import SummaryFilterMixin
+
+
+def _int_param(request, name, default):
+    try:
+        return max(1, int(request.GET.get(name) or default))
+    except ValueError:
+        return default
+
+
+class ProductAutocomplete(LoginRequiredMixin, View):
+    """GET ?q=<teks>&limit=<n>&page=<p> -> {"results": [{id, sku, name, label}], "more": bool}"""
+    query_budget = 3
+
+    def get(self, request, *args, **kwargs):
+        rows, more = autocomplete(
+            request.GET.get("q"),
+            limit=_int_param(request, "limit", AUTOCOMPLETE_LIMIT),
+            active_only=request.GET.get("all") != "1",
+            page=_int_param(request, "page", 1),
+        )
+        return JsonResponse({
+            "results": [{"id": pk, "sku": sku, "name": name, "label": f"{sku} - {name}"} for pk, sku, name in rows],
+            "more": more,
+        })
+
+
+class NameLookup(LoginRequiredMixin, View):
+    """Lookup berhalaman untuk master kecil (Category/UoM): ?q=&page= -> {"results": [{id, label}], "more"}"""
+    model = None
+    query_budget = 3
+
+    def get(self, request, *args, **kwargs):
+        q = (request.GET.get("q") or "").strip()
+        limit = min(_int_param(request, "limit", 20), AUTOCOMPLETE_MAX_LIMIT)
+        offset = (_int_param(request, "page", 1) - 1) * limit
+        qs = self.model.objects.order_by("name", "id")
+        if q:
+            qs = qs.filter(name__icontains=q)
+        rows = list(qs.values_list("id", "name")[offset:offset + limit + 1])
+        return JsonResponse({
+            "results": [{"id": pk, "label": name} for pk, name in rows[:limit]],
+            "more": len(rows) > limit,
+        })
+
+
+class CategoryLookup(NameLookup):
+    model = Category
+
+
+class UoMLookup(NameLookup):
+    model = UoM
+
+
+class StockAsOf(LoginRequiredMixin, View):
+    """
+    GET ?sku=<sku>|product=<id>&at=<YYYY-MM-DD | ISO datetime>
+    -> {"product", "sku", "at", "qty"}. Tanggal tanpa jam = posisi akhir hari itu.
+    ``at`` sebelum batas arsip (``partitions.closed_until``) -> 400: transaksinya sudah
+    dipindah ke arsip, yang tersisa hanya saldo awal pada batas itu.
+    """
+    query_budget = 5
+
+    def get(self, request, *args, **kwargs):
+        at_raw = request.GET.get("at") or ""
+        try:
+            # tanggal dulu: parse_datetime (fromisoformat) juga menerima "YYYY-MM-DD" sebagai tengah malam
+            d = parse_date(at_raw)
+            at = datetime.combine(d + timedelta(days=1), datetime.min.time()) if d else parse_datetime(at_raw)
+        except ValueError:  # format benar, tanggal mustahil (2026-02-30)
+            at = None
+        if at is None:
+            return JsonResponse({"error": "Parameter 'at' wajib (YYYY-MM-DD atau ISO datetime)."}, status=400)
+        if timezone.is_naive(at):
+            at = timezone.make_aware(at)
+        closed = partitions.closed_until()
+        if closed and at < closed:
+            return JsonResponse({"error": f"Parameter 'at' sebelum batas arsip {closed.isoformat()}."}, status=400)
+
+        qs = Product.objects.values_list("id", "sku")
+        if request.GET.get("sku"):
+            row = qs.filter(sku=request.GET["sku"]).first()
+        elif (request.GET.get("product") or "").isdigit():
+            row = qs.filter(pk=request.GET["product"]).first()
+        else:
+            row = None
+        if row is None:
+            return JsonResponse({"error": "Produk tidak ditemukan."}, status=404)
+        return JsonResponse({"product": row[0], "sku": row[1], "at": at.isoformat(),
+                             "qty": str(ledger.stock_as_of(row[0], at))})
+
+
+class StockSeries(LoginRequiredMixin, SummaryFilterMixin, View):
+    """
+    GET ?start=&end=&cat=&prod=&bucket=auto|day|week|month&max_points=<n>
+    -> {"bucket", "labels": [YYYY-MM-DD], "in": [qty], "out": [qty]}. Bucket kosong = 0,
+    jumlah titik <= max_points (default 120, maks 1000).
+    """
+    query_budget = 5
+
+    def get(self, request, *args, **kwargs):
+        bucket = request.GET.get("bucket") or "auto"
+        if bucket != "auto" and bucket not in timeseries.BUCKETS:
+            return JsonResponse({"error": "Parameter 'bucket' harus auto, day, week atau month."}, status=400)
+        _, _, _, start_dt, end_dt, cat_id, prod_id = self._filtered_trx_qs()
+        s = timeseries.series(start_dt, end_dt, cat_id, prod_id, bucket,
+                              _int_param(request, "max_points", timeseries.DEFAULT_MAX_POINTS))
+        return JsonResponse({
+            "bucket": s["bucket"],
+            "labels": [d.isoformat() for d in s["labels"]],
+            "in": [str(q) for q in s["in"]],
+            "out": [str(q) for q in s["out"]],
+        })
+
+
+def recent_low_stock(limit, before=None):
+    """
+    Produk aktif yang baru saja turun di bawah min_stock, terbaru dulu (index
+    product_low_since_idx). ``before`` = (low_since, id) baris terakhir halaman sebelumnya.
+    """
+    qs = Product.objects.filter(low_since__isnull=False, is_active=True)
+    if before:
+        qs = qs.filter(low_since__lte=before[0]).filter(Q(low_since__lt=before[0]) | Q(id__lt=before[1]))
+    rows = list(shards.annotate_on_hand(qs).order_by("-low_since", "-id")
+                .values("id", "sku", "name", "on_hand", "min_stock", "low_since")[:limit])
+    for r in rows:
+        r["qty_on_hand"] = r.pop("on_hand")  # stok tepat, nama kunci lama (dashboard & API)
+    return rows
+
+
+class LowStockFeed(LoginRequiredMixin, View):
+    """
+    GET ?limit=<n>&before=<cursor> -> {"count", "results": [{id, sku, name, qty_on_hand,
+    min_stock, low_since}], "next_before"}. ``before`` = ``next_before`` halaman sebelumnya.
+    """
+    query_budget = 4
+
+    def get(self, request, *args, **kwargs):
+        before = None
+        if request.GET.get("before"):
+            # cursor "<low_since ISO>~<id>": banyak produk bisa punya low_since sama
+            at, _, pk = request.GET["before"].rpartition("~")
+            try:
+                before = (parse_datetime(at), pk)
+            except ValueError:
+                before = (None, pk)
+            if before[0] is None or not pk.isdigit():
+                return JsonResponse({"error": "Parameter 'before' tidak valid."}, status=400)
+        limit = min(_int_param(request, "limit", 20), AUTOCOMPLETE_MAX_LIMIT)
+        rows = recent_low_stock(limit + 1, before)
+        more, rows = len(rows) > limit, rows[:limit]
+        return JsonResponse({
+            "count": Product.objects.filter(low_since__isnull=False, is_active=True).count(),
+            "results": [
+                {**r, "qty_on_hand": str(r["qty_on_hand"]), "min_stock": str(r["min_stock"]),
+                 "low_since": r["low_since"].isoformat()}
+                for r in rows
+            ],
+            "next_before": f"{rows[-1]['low_since'].isoformat()}~{rows[-1]['id']}" if more else None,
+        })
+
+
+class StockChangeFeed(LoginRequiredMixin, View):
+    """
+    GET ?after=<cursor>&limit=<n> (default 1000, maks 10000) -> {"results": [{id, action,
+    trx_id, product_id, trx_type, quantity, trx_date, note, document_id, changed_at}],
+    "next_after", "more"}. Simpan ``next_after`` dan kirim lagi sebagai ``after``;
+    ``more`` = masih ada halaman berikutnya. Lihat ``inventory.changefeed``.
+    """
+    query_budget = 3
+
+    def get(self, request, *args, **kwargs):
+        after = None
+        if request.GET.get("after"):
+            try:
+                after = changefeed.parse_cursor(request.GET["after"])
+            except ValueError:
+                return JsonResponse({"error": "Parameter 'after' tidak valid."}, status=400)
+        limit = min(_int_param(request, "limit", changefeed.DEFAULT_LIMIT), changefeed.MAX_LIMIT)
+        rows, next_after, more = changefeed.changes(after, limit)
+        return JsonResponse({
+            "results": [
+                {"id": r["id"], "action": r["action"], "trx_id": r["trx_id"], "product_id": r["product_id"],
+                 "trx_type": r["trx_type"], "quantity": str(r["quantity"]), "trx_date": r["trx_date"].isoformat(),
+                 "note": r["note"], "document_id": r["document_id"], "changed_at": r["changed_at"].isoformat()}
+                for r in rows
+            ],
+            "next_after": next_after,
+            "more": more,
+        })
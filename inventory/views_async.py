@@ -0,0 +1,116 @@
+# inventory/views_async.py
+"""
+Ringkasan stok versi async (ASGI): query ``summary_parts`` yang saling independen
+dijalankan bersamaan, jadi latensi ~ query terlambat, bukan jumlah semuanya.
+
+ORM async Django (``aget``/``acount``) tetap serial di satu thread, jadi tiap
+bagian dijalankan ``sync_to_async(thread_sensitive=False)`` di thread pool dengan
+koneksi DB sendiri; setelah selesai koneksi dirapikan dengan
+``close_old_connections`` (mengikuti CONN_MAX_AGE, sama seperti akhir request —
+CONN_MAX_AGE > 0 agar thread pool memakai ulang koneksinya, bukan connect per bagian).
+Query di thread bagian dihitung ke request lewat ``warehouse.middleware.recorded``,
+jadi log, Server-Timing dan ``QUERY_BUDGETS`` tetap mencakup semuanya.
+Hasil & validator (ETag/304) lewat ``summary_cache``, sama dengan view sync.
+"""
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.views import redirect_to_login
+from django.db import close_old_connections
+from django.http import JsonResponse
+from django.shortcuts import render
+from django.urls import reverse
+from django.views import View
+
+from warehouse.middleware import recorded
+
+from . import summary_cache
+from .views_report import SummaryFilterMixin, summary_context, summary_parts
+
+
+def _own_connection(fn):
+    def run():
+        try:
+            return fn()
+        finally:
+            close_old_connections()
+    return run
+
+
+async def run_concurrently(parts, request=None):
+    """
+    {nama: callable} -> {nama: hasil}; semua callable jalan paralel di thread pool.
+    ``request`` = query tiap thread ikut terhitung di middleware SQL request itu.
+    """
+    names = list(parts)
+    results = await asyncio.gather(
+        *(sync_to_async(_own_connection(recorded(request, parts[n])), thread_sensitive=False)() for n in names)
+    )
+    return dict(zip(names, results))
+
+
+class AsyncSummaryBase(SummaryFilterMixin, View):
+    with_choices = True
+
+    async def dispatch(self, request, *args, **kwargs):
+        # LoginRequiredMixin mengakses request.user secara sync -> cek manual via auser()
+        user = await request.auser()
+        if not user.is_authenticated:
+            return redirect_to_login(request.get_full_path())
+        _, _, _, start_dt, end_dt, cat_id, prod_id = self._filtered_trx_qs()
+        self.version = await sync_to_async(summary_cache.version)()
+        self.cache_key = summary_cache.summary_key(start_dt, end_dt, cat_id, prod_id, self.with_choices)
+        etag, last_modified = await sync_to_async(summary_cache.validators)(
+            request, self.version, self.cache_key, user.pk)
+        response = summary_cache.not_modified(request, etag, last_modified)
+        if response is None:
+            response = await super().dispatch(request, *args, **kwargs)
+        return summary_cache.set_validators(response, etag, last_modified, getattr(self, "cache_hit", None))
+
+    async def summary(self):
+        _, start_raw, end_raw, start_dt, end_dt, cat_id, prod_id = self._filtered_trx_qs()
+        res = await sync_to_async(summary_cache.lookup)(self.version, self.cache_key)
+        self.cache_hit = res is not None
+        if res is None:
+            res = await run_concurrently(summary_parts(start_dt, end_dt, cat_id, prod_id, self.with_choices),
+                                         self.request)
+            await sync_to_async(summary_cache.store)(self.version, self.cache_key, res)
+        return res, (start_raw, end_raw, cat_id, prod_id)
+
+
+class InventorySummaryAsyncView(AsyncSummaryBase):
+    """HTML sama dengan ``InventorySummaryView``; export CSV tetap lewat view sync."""
+
+    async def get(self, request, *args, **kwargs):
+        res, flt = await self.summary()
+        ctx = summary_context(res, *flt, base_url=reverse("inventory:summary"))
+        # render sync: context processor (user, messages/session) butuh DB
+        return await sync_to_async(render)(request, "inventory/summary.html", ctx)
+
+
+class InventorySummaryAPI(AsyncSummaryBase):
+    """GET ?start=&end=&cat=&prod= -> KPI, rekap per produk, dan seri waktu (JSON)."""
+    with_choices = False
+
+    async def get(self, request, *args, **kwargs):
+        res, (start_raw, end_raw, cat_id, prod_id) = await self.summary()
+        total_in, total_out = res["totals"]
+        labels, chart_in, chart_out, bucket = res["chart"]
+        with_stock = bool(end_raw)
+        return JsonResponse({
+            "filters": {"start": start_raw, "end": end_raw, "cat": cat_id, "prod": prod_id},
+            "total_in": str(total_in or 0),
+            "total_out": str(total_out or 0),
+            "count_low_stock": res["count_low_stock"],
+            "per_product": [
+                {
+                    "id": p.pk, "sku": p.sku, "name": p.name,
+                    "category": p.category.name, "uom": p.uom.name,
+                    "in_qty": str(p.in_qty), "out_qty": str(p.out_qty), "net": str(p.net),
+                    "qty_on_hand": str(p.on_hand), "min_stock": str(p.min_stock),
+                    **({"stock_on_date": str(p.stock_on_date)} if with_stock else {}),
+                }
+                for p in res["per_product"]
+            ],
+            "chart": {"bucket": bucket, "labels": labels, "in": chart_in, "out": chart_out},
+        })
@@ -0,0 +1,87 @@
+# inventory/views_document.py
+import json
+
+from django.contrib.auth.mixins import LoginRequiredMixin
+from django.core.exceptions import ValidationError
+from django.http import JsonResponse
+from django.shortcuts import redirect
+from django.utils.dateparse import parse_datetime
+from django.views import View
+from django.views.generic import DetailView, FormView, ListView
+
+from .documents import parse_lines_text, post_document
+from .forms import StockDocumentForm
+from .models import StockDocument
+from .pagination import KeysetPaginationMixin
+
+
+class StockDocumentList(LoginRequiredMixin, KeysetPaginationMixin, ListView):
+    model = StockDocument
+    paginate_by = 50
+    keyset_field, keyset_desc = "doc_date", True
+    query_budget = 4
+    read_replica = True
+
+    def get_queryset(self):
+        return super().get_queryset().select_related("posted_by")
+
+
+class StockDocumentCreate(LoginRequiredMixin, FormView):
+    # tanpa query_budget: UPDATE stok = satu per produk berbeda di dokumen
+    form_class = StockDocumentForm
+    template_name = "inventory/stockdocument_form.html"
+
+    def form_valid(self, form):
+        d = form.cleaned_data
+        try:
+            doc = post_document(d["doc_type"], parse_lines_text(d["lines"]), number=d["number"],
+                                doc_date=d["doc_date"], note=d["note"], user=self.request.user)
+        except ValidationError as e:
+            form.add_error(None, e)
+            return self.form_invalid(form)
+        return redirect("inventory:document-detail", pk=doc.pk)
+
+
+class StockDocumentDetail(LoginRequiredMixin, DetailView):
+    model = StockDocument
+    query_budget = 4
+
+    def get_queryset(self):
+        return super().get_queryset().select_related("posted_by")
+
+    def get_context_data(self, **kwargs):
+        ctx = super().get_context_data(**kwargs)
+        ctx["lines"] = self.object.lines.select_related("product", "product__uom").order_by("id")
+        return ctx
+
+
+class StockDocumentAPI(LoginRequiredMixin, View):
+    """
+    POST JSON ``{doc_type, number?, doc_date?, note?, lines: [{sku | product_id, quantity, note?}]}``
+    -> 201 ``{id, number, line_count}``; 400 ``{errors: [...]}`` (tidak ada yang tersimpan).
+    """
+
+    def post(self, request, *args, **kwargs):
+        try:
+            data = json.loads(request.body)
+        except (ValueError, UnicodeDecodeError):
+            return JsonResponse({"errors": ["Body harus JSON."]}, status=400)
+        if not isinstance(data, dict) or not isinstance(data.get("lines"), list):
+            return JsonResponse({"errors": ["Field lines (list) wajib ada."]}, status=400)
+        doc_date = None
+        if data.get("doc_date"):
+            try:
+                doc_date = parse_datetime(str(data["doc_date"]))
+            except ValueError:  # format benar, tanggal mustahil (2026-02-30)
+                doc_date = None
+            if doc_date is None:
+                return JsonResponse({"errors": [f"doc_date tidak valid: {data['doc_date']!r}"]}, status=400)
+        try:
+            doc = post_document(
+                str(data.get("doc_type") or "").upper(), [r if isinstance(r, dict) else {} for r in data["lines"]],
+                number=str(data.get("number") or ""), doc_date=doc_date, note=str(data.get("note") or ""),
+                user=request.user,
+            )
+        except ValidationError as e:
+            return JsonResponse({"errors": e.messages}, status=400)
+        return JsonResponse({"id": doc.pk, "number": doc.number, "line_count": doc.line_count}, status=201)
@@ -0,0 +1,72 @@
+# inventory/views_export.py
+from django.contrib.auth.mixins import LoginRequiredMixin
+from django.http import FileResponse, Http404, HttpResponseBadRequest, JsonResponse
+from django.shortcuts import get_object_or_404, redirect
+from django.urls import reverse
+from django.views import View
+from django.views.generic import DetailView, ListView
+
+from .exports import enqueue
+from .models import ExportJob
+from .views_report import EXPORT_FILENAMES
+
+
+def job_json(job):
+    return {
+        "id": job.pk, "kind": job.kind, "filters": job.filters, "status": job.status,
+        "progress": job.progress, "rows_written": job.rows_written, "rows_total": job.rows_total,
+        "file_size": job.file_size, "error": job.error,
+        "created_at": job.created_at.isoformat(),
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+    }
+
+
+class ExportJobCreate(LoginRequiredMixin, View):
+    """POST kind + start/end/cat/prod -> job baru (atau job lama yang masih berlaku)."""
+    query_budget = 6  # session, user, watermark, cari job done/pending, insert
+
+    def post(self, request, *args, **kwargs):
+        kind = request.POST.get("kind")
+        if kind not in EXPORT_FILENAMES:
+            return HttpResponseBadRequest("kind harus summary atau detail")
+        job, reused = enqueue(kind, request.POST, request.user)
+        url = reverse("inventory:export-detail", args=[job.pk])
+        return redirect(f"{url}?reused=1" if reused else url)
+
+
+class ExportJobList(LoginRequiredMixin, ListView):
+    model = ExportJob
+    template_name = "inventory/exportjob_list.html"
+    paginate_by = 20
+    query_budget = 4  # session, user, count, halaman
+
+    def get_queryset(self):
+        return super().get_queryset().select_related("requested_by")
+
+
+class ExportJobDetail(LoginRequiredMixin, DetailView):
+    """HTML (auto-refresh selama belum selesai) atau ``?format=json`` untuk polling."""
+    model = ExportJob
+    template_name = "inventory/exportjob_detail.html"
+    query_budget = 4
+
+    def get(self, request, *args, **kwargs):
+        if request.GET.get("format") == "json":
+            return JsonResponse(job_json(self.get_object()))
+        return super().get(request, *args, **kwargs)
+
+    def get_queryset(self):
+        return super().get_queryset().select_related("requested_by")
+
+
+class ExportJobDownload(LoginRequiredMixin, View):
+    query_budget = 3
+
+    def get(self, request, pk, *args, **kwargs):
+        job = get_object_or_404(ExportJob, pk=pk, status=ExportJob.DONE)
+        try:
+            f = open(job.file_path, "rb")
+        except OSError:
+            raise Http404("File export sudah tidak ada, buat ulang export.")
+        return FileResponse(f, as_attachment=True, filename=EXPORT_FILENAMES[job.kind] + ".gz",
+                            content_type="application/gzip")
@@ -1,29 +1,44 @@
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.core.exceptions import ValidationError
 from django.urls import reverse_lazy
-from django.views.generic import ListView, CreateView, UpdateView, DeleteView
+from django.views.generic import ListView, CreateView, UpdateView, DeleteView, FormView
 from .models import Product, Category, UoM, Transaction
-from .forms import ProductForm, CategoryForm, UoMForm, TransactionForm
-from django.db.models import Q, F
-class ProductList(LoginRequiredMixin, ListView):
+from .forms import ProductForm, CategoryForm, UoMForm, TransactionForm, TransactionImportForm
+from .importer import import_rows, read_rows
+from .pagination import KeysetPaginationMixin
+from .shards import annotate_on_hand
+from .search import filter_products
+
+# budget view tulis = biaya bersama + query milik view itu; query baru di jalur bersama
+# (services.post_changes, signal) cukup ditambahkan di sini, bukan di tiap view
+WRITE_BASE = 3  # session, user, nextval versi ledger (summary_cache.bump)
+POSTING = 3     # satu transaksi: UPDATE stok, rollup harian, change feed
+
+
+class ProductList(LoginRequiredMixin, KeysetPaginationMixin, ListView):
     model = Product
     template_name = "inventory/product_list.html"
     paginate_by = 20
+    keyset_field = "name"
+    query_budget = 5  # session, user, halaman, estimasi total, kategori
+    read_replica = True
 
     def get_queryset(self):
-        qs = super().get_queryset().select_related("category", "uom")
+        # stok tepat (qty_on_hand + garis untuk produk bergaris), dihitung di query halaman yang sama
+        qs = annotate_on_hand(super().get_queryset().select_related("category", "uom"))
         q = (self.request.GET.get("q") or "").strip()
         cat = self.request.GET.get("cat") or ""
         active = self.request.GET.get("active") or ""
         low = self.request.GET.get("low") or ""  # "1" artinya hanya low stock
 
         if q:
-            qs = qs.filter(Q(name__icontains=q) | Q(sku__icontains=q))
+            qs = filter_products(qs, q)  # ILIKE dilayani index trigram
         if cat:
             qs = qs.filter(category_id=cat)
         if active in ("1", "0"):
             qs = qs.filter(is_active=(active == "1"))
         if low == "1":
-            qs = qs.filter(qty_on_hand__lt=F("min_stock"))
+            qs = qs.filter(low_since__isnull=False)  # dijaga inkremental, lihat services.apply_deltas
         return qs
 
     def get_context_data(self, **kwargs):
@@ -37,20 +52,29 @@ class ProductList(LoginRequiredMixin, ListView):
         return ctx
 class ProductCreate(LoginRequiredMixin, CreateView):
     model, form_class, success_url = Product, ProductForm, reverse_lazy('inventory:product-list')
+    query_budget = WRITE_BASE + 6  # pilihan kategori/uom, validasi FK x2, cek sku, insert
 class ProductUpdate(LoginRequiredMixin, UpdateView):
     model, form_class, success_url = Product, ProductForm, reverse_lazy('inventory:product-list')
+    query_budget = WRITE_BASE + 7  # + objek
 class ProductDelete(LoginRequiredMixin, DeleteView):
     model, success_url = Product, reverse_lazy('inventory:product-list')
-class CategoryList(LoginRequiredMixin, ListView): model=Category
+    query_budget = WRITE_BASE + 8  # objek, collector, change feed, cascade transaksi/rollup/saldo awal/garis, delete
+class CategoryList(LoginRequiredMixin, ListView):
+    model, query_budget, read_replica = Category, 3, True
 class CategoryCreate(LoginRequiredMixin, CreateView):
     model, form_class, success_url = Category, CategoryForm, reverse_lazy('inventory:category-list')
+    query_budget = WRITE_BASE + 2  # cek nama unik, insert
 class CategoryUpdate(LoginRequiredMixin, UpdateView):
     model, form_class, success_url = Category, CategoryForm, reverse_lazy('inventory:category-list')
+    query_budget = WRITE_BASE + 3  # objek, cek nama unik, update
 class CategoryDelete(LoginRequiredMixin, DeleteView):
     model, success_url = Category, reverse_lazy('inventory:category-list')
-class UoMList(LoginRequiredMixin, ListView): model=UoM
+    query_budget = WRITE_BASE + 3  # objek, collector produk, delete
+class UoMList(LoginRequiredMixin, ListView):
+    model, query_budget, read_replica = UoM, 3, True
 class UoMCreate(LoginRequiredMixin, CreateView):
     model = UoM
+    query_budget = WRITE_BASE + 2
     form_class = UoMForm
     template_name = "inventory/uom/uom_form.html"   # taruh nanti di templates/inventory/uom/uom_form.html
     success_url = reverse_lazy("inventory:uom-list")
@@ -58,6 +82,7 @@ class UoMCreate(LoginRequiredMixin, CreateView):
 
 class UoMUpdate(LoginRequiredMixin, UpdateView):
     model = UoM
+    query_budget = WRITE_BASE + 3
     form_class = UoMForm
     template_name = "inventory/uom/uom_form.html"
     success_url = reverse_lazy("inventory:uom-list")
@@ -65,13 +90,53 @@ class UoMUpdate(LoginRequiredMixin, UpdateView):
 
 class UoMDelete(LoginRequiredMixin, DeleteView):
     model = UoM
+    query_budget = WRITE_BASE + 3
     template_name = "inventory/uom/uom_confirm_delete.html"  # taruh di templates/inventory/uom/uom_confirm_delete.html
     success_url = reverse_lazy("inventory:uom-list")
     
-class TransactionList(LoginRequiredMixin, ListView): model=Transaction
-class TransactionCreate(LoginRequiredMixin, CreateView):
+class TransactionList(LoginRequiredMixin, KeysetPaginationMixin, ListView):
+    model = Transaction
+    paginate_by = 50
+    keyset_field, keyset_desc = "trx_date", True
+    query_budget = 4
+    read_replica = True
+
+    def get_queryset(self):
+        return super().get_queryset().select_related("product")
+class StockPostingMixin:
+    """Stok tidak cukup saat UPDATE final (race dgn writer lain) -> tampil sbg error form, bukan 500."""
+    def form_valid(self, form):
+        try:
+            return super().form_valid(form)
+        except ValidationError as e:
+            form.add_error(None, e)
+            return self.form_invalid(form)
+class TransactionCreate(LoginRequiredMixin, StockPostingMixin, CreateView):
     model, form_class, success_url = Transaction, TransactionForm, reverse_lazy('inventory:transaction-list')
-class TransactionUpdate(LoginRequiredMixin, UpdateView):
+    query_budget = WRITE_BASE + POSTING + 6  # pilihan produk, validasi FK, insert, saldo berjalan (3)
+class TransactionUpdate(LoginRequiredMixin, StockPostingMixin, UpdateView):
     model, form_class, success_url = Transaction, TransactionForm, reverse_lazy('inventory:transaction-list')
+    query_budget = WRITE_BASE + POSTING + 9  # + objek, nilai lama, geser saldo lama
+    def get_queryset(self): return super().get_queryset().select_related("product")
 class TransactionDelete(LoginRequiredMixin, DeleteView):
     model, success_url = Transaction, reverse_lazy('inventory:transaction-list')
+    query_budget = WRITE_BASE + POSTING + 3  # objek, delete, geser saldo
+    # halaman konfirmasi menampilkan str(obj) -> butuh product
+    def get_queryset(self): return super().get_queryset().select_related("product")
+class TransactionImport(LoginRequiredMixin, FormView):
+    form_class = TransactionImportForm
+    template_name = "inventory/transaction_import.html"
+
+    def form_valid(self, form):
+        f = form.cleaned_data["file"]
+        fmt = "json" if f.name.lower().endswith(".json") else "csv"
+        try:
+            rows = read_rows(f, fmt)
+        except (ValueError, UnicodeDecodeError) as e:
+            form.add_error("file", f"File tidak bisa dibaca: {e}")
+            return self.form_invalid(form)
+        created, errors = import_rows(rows, dry_run=form.cleaned_data["dry_run"])
+        return self.render_to_response(self.get_context_data(
+            form=form, result={"total": len(rows), "created": created, "errors": errors,
+                               "dry_run": form.cleaned_data["dry_run"]},
+        ))
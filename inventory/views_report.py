@@ -1,228 +1,357 @@
 # inventory/views_report.py
 from datetime import datetime, timedelta
 import csv
-from io import StringIO
+import zlib
 
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.db.models import Q, F, Sum, Value, DecimalField, Count
-from django.db.models.functions import Coalesce, TruncDate
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, router
+from django.db.models import F
 from django.utils.dateparse import parse_date, parse_datetime
+from django.views import View
 from django.views.generic import TemplateView
-from django.http import HttpResponse
+from django.http import JsonResponse, StreamingHttpResponse
+from django.utils.cache import patch_cache_control
 from django.utils.http import urlencode
 
-from .models import Transaction, Product, Category
-
-
-class InventorySummaryView(LoginRequiredMixin, TemplateView):
-    template_name = "inventory/summary.html"
-
-    # ------------- helpers -------------
-    def _parse_any_datetime(self, s: str | None):
-        if not s:
-            return None
-        return parse_datetime(s) or (
-            parse_date(s) and datetime.combine(parse_date(s), datetime.min.time())
-        )
+from . import forecast, ledger, rollup, shards, summary_cache, timeseries
+from .models import DailyStock, Transaction, Product, Category
+
+EXPORT_CHUNK_SIZE = 2000
+
+
+class _Echo:
+    """Pseudo-buffer untuk csv.writer: writerow() langsung mengembalikan baris (pola streaming Django)."""
+    def write(self, value):
+        return value
+
+
+def stream_csv(header, rows, filename, gz=False):
+    """
+    StreamingHttpResponse dari iterator ``rows`` (tuple). Memori konstan:
+    baris ditulis satu-satu, tidak pernah ditampung utuh. ``gz=True`` kirim .csv.gz.
+    """
+    w = csv.writer(_Echo())
+
+    def lines():
+        yield w.writerow(header)
+        for r in rows:
+            yield w.writerow(r)
+
+    def encoded():
+        for line in lines():
+            yield line.encode("utf-8")
+
+    def gzipped():
+        z = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits 31 = format gzip
+        buf, size = [], 0
+        for line in lines():
+            buf.append(line)
+            size += len(line)
+            if size >= 64 * 1024:
+                out = z.compress("".join(buf).encode("utf-8"))
+                buf, size = [], 0
+                if out:
+                    yield out
+        yield z.compress("".join(buf).encode("utf-8")) + z.flush()
+
+    if gz:
+        resp = StreamingHttpResponse(gzipped(), content_type="application/gzip")
+        filename += ".gz"
+    else:
+        resp = StreamingHttpResponse(encoded(), content_type="text/csv; charset=utf-8")
+    resp["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return resp
+
+
+def per_product_qs(start_dt, end_dt, cat_id="", prod_id=""):
+    """Rekap per produk (filter cat/prod) + in/out/net dalam rentang, + stok per akhir rentang."""
+    qs = Product.objects.all()
+    if cat_id:
+        qs = qs.filter(category_id=cat_id)
+    if prod_id:
+        qs = qs.filter(id=prod_id)
+    qs = (
+        rollup.annotate_in_out(shards.annotate_on_hand(qs.select_related("category", "uom")), start_dt, end_dt)
+        .annotate(net=F("in_qty") - F("out_qty"))
+        .order_by("name")
+    )
+    if end_dt:
+        # stok per akhir rentang dari saldo berjalan ledger (index seek per produk)
+        qs = ledger.annotate_stock_as_of(qs, end_dt)
+    return qs
+
+
+def chart_series(series):
+    """(labels, in, out, bucket) untuk Chart.js dari ``timeseries.series`` (angka -> float agar valid JS)."""
+    return ([d.strftime("%Y-%m-%d") for d in series["labels"]],
+            [float(q) for q in series["in"]],
+            [float(q) for q in series["out"]],
+            series["bucket"])
+
+
+def summary_parts(start_dt, end_dt, cat_id="", prod_id="", with_choices=True):
+    """
+    Query ringkasan yang saling independen: {nama: callable() -> hasil yang sudah
+    dievaluasi}. View sync memanggilnya berurutan; ``views_async`` menjalankannya
+    bersamaan, masing-masing di koneksi DB sendiri.
+    """
+    parts = {
+        # KPI total (dari rollup harian)
+        "totals": lambda: rollup.totals(start_dt, end_dt, cat_id, prod_id),
+        # Low stock (global, tidak ikut filter tanggal—sesuai makna "low stock" saat ini)
+        "count_low_stock": lambda: Product.objects.filter(low_since__isnull=False, is_active=True).count(),
+        "per_product": lambda: list(per_product_qs(start_dt, end_dt, cat_id, prod_id)),
+        # timeseries untuk chart: bucket otomatis & jumlah titik dibatasi (filter sama dengan trx_qs)
+        "chart": lambda: chart_series(timeseries.series(start_dt, end_dt, cat_id, prod_id)),
+    }
+    if with_choices:
+        # pilihan dropdown
+        parts["categories"] = lambda: list(Category.objects.order_by("name").only("id", "name"))
+        parts["products"] = lambda: list(Product.objects.order_by("name").only("id", "name"))
+    return parts
+
+
+def summary_context(res, start_raw, end_raw, cat_id, prod_id, base_url=""):
+    """Context template ``summary.html`` dari hasil ``summary_parts``."""
+    # urls export (bawa filter)
+    query_base = {}
+    if start_raw:
+        query_base["start"] = start_raw
+    if end_raw:
+        query_base["end"] = end_raw
+    if cat_id:
+        query_base["cat"] = cat_id
+    if prod_id:
+        query_base["prod"] = prod_id
+
+    summary_url = f"{base_url}?{urlencode({**query_base, 'export':'csv', 'kind':'summary'})}"
+    detail_url = f"{base_url}?{urlencode({**query_base, 'export':'csv', 'kind':'detail'})}"
+    total_in, total_out = res["totals"]
+    chart_labels, chart_in, chart_out, chart_bucket = res["chart"]
+
+    return {
+        "filter_start": start_raw,
+        "filter_end": end_raw,
+        "filter_cat": cat_id,
+        "filter_prod": prod_id,
+
+        "total_in": total_in,
+        "total_out": total_out,
+        "count_low_stock": res["count_low_stock"],
+
+        "per_product": res["per_product"],
+
+        "chart_labels": chart_labels,
+        "chart_in": chart_in,
+        "chart_out": chart_out,
+        "chart_bucket": timeseries.BUCKET_LABELS[chart_bucket],
+
+        "categories": res.get("categories", []),
+        "products": res.get("products", []),
+
+        "export_csv_url": summary_url,
+        "export_csv_detail_url": detail_url,
+    }
+
+
+def parse_any_datetime(s: str | None):
+    if not s:
+        return None
+    return parse_datetime(s) or (
+        parse_date(s) and datetime.combine(parse_date(s), datetime.min.time())
+    )
+
+
+def filtered_trx_qs(params):
+    """
+    ``params`` = dict-like (request.GET / filter job export).
+    Return: (qs, start_raw, end_raw, start_dt, end_dt, cat_id, prod_id)
+    Filter by date + (optional) category id (cat) & product id (prod).
+    """
+    start_raw = params.get("start") or ""
+    end_raw = params.get("end") or ""
+    cat_id = params.get("cat") or ""
+    prod_id = params.get("prod") or ""
+
+    start_dt = parse_any_datetime(start_raw) if start_raw else None
+    end_dt = parse_any_datetime(end_raw) if end_raw else None
+    if end_dt and ("T" not in end_raw):
+        end_dt = end_dt + timedelta(days=1)
+
+    qs = Transaction.objects.select_related("product", "product__category", "product__uom")
+    if start_dt:
+        qs = qs.filter(trx_date__gte=start_dt)
+    if end_dt:
+        qs = qs.filter(trx_date__lt=end_dt)
+    if cat_id:
+        qs = qs.filter(product__category_id=cat_id)
+    if prod_id:
+        qs = qs.filter(product_id=prod_id)
+
+    return qs, start_raw, end_raw, start_dt, end_dt, cat_id, prod_id
+
+
+class SummaryFilterMixin:
+    """Parsing filter laporan dari query string (start, end, cat, prod)."""
 
     def _filtered_trx_qs(self):
-        """
-        Return: (qs, start_raw, end_raw, start_dt, end_dt, cat_id, prod_id)
-        Filter by date + (optional) category id (cat) & product id (prod).
-        """
-        request = self.request
-        start_raw = request.GET.get("start") or ""
-        end_raw = request.GET.get("end") or ""
-        cat_id = request.GET.get("cat") or ""
-        prod_id = request.GET.get("prod") or ""
-
-        start_dt = self._parse_any_datetime(start_raw) if start_raw else None
-        end_dt = self._parse_any_datetime(end_raw) if end_raw else None
-        if end_dt and ("T" not in end_raw):
-            end_dt = end_dt + timedelta(days=1)
-
-        qs = Transaction.objects.select_related("product", "product__category", "product__uom")
-        if start_dt:
-            qs = qs.filter(trx_date__gte=start_dt)
-        if end_dt:
-            qs = qs.filter(trx_date__lt=end_dt)
-        if cat_id:
-            qs = qs.filter(product__category_id=cat_id)
-        if prod_id:
-            qs = qs.filter(product_id=prod_id)
-
-        return qs, start_raw, end_raw, start_dt, end_dt, cat_id, prod_id
+        """``filtered_trx_qs(request.GET)``, di-cache per request: get() dan get_context_data() memakai hasil yang sama."""
+        if getattr(self, "_filtered", None) is None:
+            self._filtered = filtered_trx_qs(self.request.GET)
+        return self._filtered
+
+
+# ------------- CSV exports (dipakai view streaming & job export) -------------
+SUMMARY_EXPORT_HEADER = ["SKU", "Nama", "Kategori", "Satuan", "Masuk", "Keluar", "Net", "On Hand", "Min"]
+DETAIL_EXPORT_HEADER = ["Tanggal", "SKU", "Produk", "Kategori", "Satuan", "Tipe", "Qty", "Catatan"]
+EXPORT_FILENAMES = {"summary": "ringkasan_stok_per_produk.csv", "detail": "detail_transaksi_stok.csv"}
+
+
+def summary_export_qs(start_dt, end_dt, cat_id="", prod_id=""):
+    product_base = Product.objects.all()
+    if cat_id:
+        product_base = product_base.filter(category_id=cat_id)
+    if prod_id:
+        product_base = product_base.filter(id=prod_id)
+
+    return (
+        rollup.annotate_in_out(shards.annotate_on_hand(product_base), start_dt, end_dt)
+        .annotate(net=F("in_qty") - F("out_qty"))
+        .order_by("name")
+        # tuple saja (tanpa instance model), dibaca per chunk lewat server-side cursor
+        .values_list("sku", "name", "category__name", "uom__name",
+                     "in_qty", "out_qty", "net", "on_hand", "min_stock")
+    )
+
+
+def detail_export_qs(trx_qs):
+    # detail semua baris transaksi sesuai filter aktif
+    return (
+        trx_qs.select_related(None)
+        .order_by("trx_date", "id")
+        .values_list("trx_date", "product__sku", "product__name", "product__category__name",
+                     "product__uom__name", "trx_type", "quantity", "note")
+    )
+
+
+def export_rows(kind, params):
+    """(header, iterator baris) export ``kind`` ("summary" | "detail") untuk filter ``params``."""
+    trx_qs, _, _, start_dt, end_dt, cat_id, prod_id = filtered_trx_qs(params)
+    if kind == "detail":
+        rows = detail_export_qs(trx_qs).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+
+        def fmt():
+            for d, sku, name, cat, uom, t, qty, note in rows:
+                yield (d.strftime("%Y-%m-%d %H:%M:%S"), sku, name, cat, uom, t, qty, note or "")
+        return DETAIL_EXPORT_HEADER, fmt()
+    return SUMMARY_EXPORT_HEADER, summary_export_qs(start_dt, end_dt, cat_id, prod_id).iterator(
+        chunk_size=EXPORT_CHUNK_SIZE)
+
+
+class InventorySummaryView(LoginRequiredMixin, SummaryFilterMixin, TemplateView):
+    template_name = "inventory/summary.html"
+    query_budget = 10  # HTML (miss: +1 versi ledger; hit/304: 3); export CSV cukup 3
+    read_replica = True
 
     # ------------- GET (export handling) -------------
     def get(self, request, *args, **kwargs):
         export = request.GET.get("export")
         kind = request.GET.get("kind", "summary")  # "summary" | "detail"
-        trx_qs, start_raw, end_raw, start_dt, end_dt, cat_id, prod_id = self._filtered_trx_qs()
 
         if export == "csv":
-            if kind == "detail":
-                return self._export_csv_detail(trx_qs)
-            return self._export_csv_summary(trx_qs, start_dt, end_dt, cat_id, prod_id)
-
-        return super().get(request, *args, **kwargs)
+            kind = "detail" if kind == "detail" else "summary"
+            header, rows = export_rows(kind, request.GET)
+            return stream_csv(header, rows, EXPORT_FILENAMES[kind], gz=request.GET.get("gzip") == "1")
+
+        # versi ledger + filter: 304 kalau klien sudah punya, hit cache kalau proses lain sudah menghitung
+        _, _, _, start_dt, end_dt, cat_id, prod_id = self._filtered_trx_qs()
+        self.version = summary_cache.version()
+        self.cache_key = summary_cache.summary_key(start_dt, end_dt, cat_id, prod_id)
+        etag, last_modified = summary_cache.validators(request, self.version, self.cache_key, request.user.pk)
+        response = summary_cache.not_modified(request, etag, last_modified)
+        if response is not None:
+            return summary_cache.set_validators(response, etag, last_modified)
+        # replica (warehouse/replica.py) bisa tertinggal dari versi primary: hasilnya bukan milik versi ini
+        self.read_db = router.db_for_read(DailyStock)
+        response = super().get(request, *args, **kwargs)
+        if self.read_db != DEFAULT_DB_ALIAS:
+            patch_cache_control(response, private=True, no_cache=True)
+            response.headers["X-Summary-Cache"] = "hit" if self.cache_hit else "miss"
+            return response
+        return summary_cache.set_validators(response, etag, last_modified, self.cache_hit)
 
     # ------------- context -------------
     def get_context_data(self, **kwargs):
         ctx = super().get_context_data(**kwargs)
+        _, start_raw, end_raw, start_dt, end_dt, cat_id, prod_id = self._filtered_trx_qs()
+        parts = summary_parts(start_dt, end_dt, cat_id, prod_id)
+        key, ttl = self.cache_key, None
+        if self.read_db != DEFAULT_DB_ALIAS:
+            key, ttl = f"{key}:{self.read_db}", getattr(settings, "REPLICA_LAG_TOLERANCE", 5)
+        res, self.cache_hit = summary_cache.get_or_compute(
+            self.version, key, lambda: {name: run() for name, run in parts.items()}, ttl)
+        ctx.update(summary_context(res, start_raw, end_raw, cat_id, prod_id))
+        return ctx
 
-        trx_qs, start_raw, end_raw, start_dt, end_dt, cat_id, prod_id = self._filtered_trx_qs()
-
-        # KPI total
-        total_in = trx_qs.aggregate(s=Sum("quantity", filter=Q(trx_type="IN")))["s"] or 0
-        total_out = trx_qs.aggregate(s=Sum("quantity", filter=Q(trx_type="OUT")))["s"] or 0
 
-        # Produk dasar untuk rekap per-produk (terapkan filter cat/prod di sini)
-        product_base = Product.objects.all()
-        if cat_id:
-            product_base = product_base.filter(category_id=cat_id)
-        if prod_id:
-            product_base = product_base.filter(id=prod_id)
+class SummaryCacheStats(LoginRequiredMixin, View):
+    """GET -> {"hits", "misses", "hit_ratio", "version", "backend"} cache ringkasan."""
+    query_budget = 3
 
-        # Low stock (global, tidak ikut filter tanggal—sesuai makna "low stock" saat ini)
-        count_low_stock = Product.objects.filter(qty_on_hand__lt=F("min_stock"), is_active=True).count()
-
-        # filter tanggal untuk annotate transaksi
-        date_filter = Q()
-        if start_dt:
-            date_filter &= Q(transactions__trx_date__gte=start_dt)
-        if end_dt:
-            date_filter &= Q(transactions__trx_date__lt=end_dt)
-
-        per_product = (
-            product_base
-            .annotate(
-                in_qty=Coalesce(
-                    Sum("transactions__quantity",
-                        filter=Q(transactions__trx_type="IN") & date_filter),
-                    Value(0), output_field=DecimalField(max_digits=12, decimal_places=2)
-                ),
-                out_qty=Coalesce(
-                    Sum("transactions__quantity",
-                        filter=Q(transactions__trx_type="OUT") & date_filter),
-                    Value(0), output_field=DecimalField(max_digits=12, decimal_places=2)
-                ),
-            )
-            .annotate(net=F("in_qty") - F("out_qty"))
-            .order_by("name")
-        )
-
-        # timeseries untuk chart (pakai trx_qs yang sudah semua filter)
-        per_day = (
-            trx_qs
-            .annotate(d=TruncDate("trx_date"))
-            .values("d", "trx_type")
-            .annotate(q=Sum("quantity"))
-            .order_by("d")
-        )
-        labels, in_map, out_map = [], {}, {}
-        for row in per_day:
-            d = row["d"]
-            if d not in labels:
-                labels.append(d)
-            if row["trx_type"] == "IN":
-                in_map[d] = row["q"] or 0
-            else:
-                out_map[d] = row["q"] or 0
-        chart_labels = [d.strftime("%Y-%m-%d") for d in labels]
-        chart_in = [in_map.get(d, 0) for d in labels]
-        chart_out = [out_map.get(d, 0) for d in labels]
+    def get(self, request, *args, **kwargs):
+        return JsonResponse(summary_cache.stats())
+
+
+class ForecastView(LoginRequiredMixin, TemplateView):
+    """Produk yang perlu dipesan ulang (``inventory.forecast``), urut cover tersingkat; ``?export=csv`` semua produk."""
+    template_name = "inventory/forecast.html"
+    query_budget = 8
+    read_replica = True
+    LIMIT = 200
+
+    def _params(self):
+        g = self.request.GET
+
+        def num(name, cast, default):
+            try:
+                return cast(g.get(name) or default)
+            except ValueError:
+                return default
+        return {"days": num("days", int, forecast.DEFAULT_DAYS), "lead_time": num("lead", int, forecast.DEFAULT_LEAD_TIME),
+                "review": num("review", int, forecast.DEFAULT_REVIEW),
+                "service_level": num("service", float, forecast.DEFAULT_SERVICE_LEVEL)}
+
+    def _forecast(self):
+        self.qs = Product.objects.all()
+        self.cat_id = self.request.GET.get("cat") or ""
+        if self.cat_id:
+            self.qs = self.qs.filter(category_id=self.cat_id)
+        try:
+            return forecast.forecast(self.qs, **self._params()), ""
+        except ValueError as e:
+            return forecast.forecast(self.qs), str(e)
 
-        # pilihan dropdown
-        categories = Category.objects.order_by("name")
-        products = Product.objects.order_by("name")
-        # urls export (bawa filter)
-        query_base = {}
-        if start_raw:
-            query_base["start"] = start_raw
-        if end_raw:
-            query_base["end"] = end_raw
-        if cat_id:
-            query_base["cat"] = cat_id
-        if prod_id:
-            query_base["prod"] = prod_id
-
-        summary_url = f"?{urlencode({**query_base, 'export':'csv', 'kind':'summary'})}" if query_base else "?export=csv&kind=summary"
-        detail_url = f"?{urlencode({**query_base, 'export':'csv', 'kind':'detail'})}" if query_base else "?export=csv&kind=detail"
+    def get(self, request, *args, **kwargs):
+        if request.GET.get("export") == "csv":
+            fc, _ = self._forecast()
+            return stream_csv(forecast.EXPORT_HEADER, forecast.export_rows(fc, self.qs), "proyeksi_stok.csv")
+        return super().get(request, *args, **kwargs)
 
+    def get_context_data(self, **kwargs):
+        ctx = super().get_context_data(**kwargs)
+        fc, error = self._forecast()
+        idx = forecast.urgent(fc)
         ctx.update({
-            "filter_start": start_raw,
-            "filter_end": end_raw,
-            "filter_cat": cat_id,
-            "filter_prod": prod_id,
-
-            "total_in": total_in,
-            "total_out": total_out,
-            "count_low_stock": count_low_stock,
-
-            "per_product": per_product,
-
-            "chart_labels": chart_labels,
-            "chart_in": chart_in,
-            "chart_out": chart_out,
-
-            "categories": categories,
-            "products": products,
-
-            "export_csv_url": summary_url,
-            "export_csv_detail_url": detail_url,
+            "params": self._params(),
+            "filter_cat": self.cat_id,
+            "error": error,
+            "rows": forecast.rows(fc, idx[:self.LIMIT]),
+            "count_products": len(fc["ids"]),
+            "count_used": int((fc["avg"] > 0).sum()),
+            "count_urgent": len(idx),
+            "limit": self.LIMIT,
+            "categories": list(Category.objects.order_by("name").only("id", "name")),
+            "export_csv_url": f"?{urlencode({**self.request.GET.dict(), 'export': 'csv'})}",
         })
         return ctx
-
-    # ------------- CSV exports -------------
-    def _export_csv_summary(self, trx_qs, start_dt, end_dt, cat_id, prod_id):
-        product_base = Product.objects.all()
-        if cat_id:
-            product_base = product_base.filter(category_id=cat_id)
-        if prod_id:
-            product_base = product_base.filter(id=prod_id)
-
-        date_filter = Q()
-        if start_dt:
-            date_filter &= Q(transactions__trx_date__gte=start_dt)
-        if end_dt:
-            date_filter &= Q(transactions__trx_date__lt=end_dt)
-
-        per_product = (
-            product_base
-            .annotate(
-                in_qty=Coalesce(Sum("transactions__quantity",
-                                    filter=Q(transactions__trx_type="IN") & date_filter),
-                                Value(0), output_field=DecimalField(max_digits=12, decimal_places=2)),
-                out_qty=Coalesce(Sum("transactions__quantity",
-                                     filter=Q(transactions__trx_type="OUT") & date_filter),
-                                 Value(0), output_field=DecimalField(max_digits=12, decimal_places=2)),
-            )
-            .annotate(net=F("in_qty") - F("out_qty"))
-            .order_by("name")
-        )
-
-        buf = StringIO()
-        w = csv.writer(buf)
-        w.writerow(["SKU", "Nama", "Kategori", "Satuan", "Masuk", "Keluar", "Net", "On Hand", "Min"])
-        for p in per_product:
-            w.writerow([p.sku, p.name, str(p.category), str(p.uom), p.in_qty, p.out_qty, p.net, p.qty_on_hand, p.min_stock])
-
-        resp = HttpResponse(buf.getvalue(), content_type="text/csv; charset=utf-8")
-        resp["Content-Disposition"] = 'attachment; filename="ringkasan_stok_per_produk.csv"'
-        return resp
-
-    def _export_csv_detail(self, trx_qs):
-        # detail semua baris transaksi sesuai filter aktif
-        buf = StringIO()
-        w = csv.writer(buf)
-        w.writerow(["Tanggal", "SKU", "Produk", "Kategori", "Satuan", "Tipe", "Qty", "Catatan"])
-        for t in trx_qs.order_by("trx_date", "id"):
-            p = t.product
-            w.writerow([
-                t.trx_date.strftime("%Y-%m-%d %H:%M:%S"),
-                p.sku, p.name, str(p.category), str(p.uom),
-                t.trx_type, t.quantity, t.note or ""
-            ])
-        resp = HttpResponse(buf.getvalue(), content_type="text/csv; charset=utf-8")
-        resp["Content-Disposition"] = 'attachment; filename="detail_transaksi_stok.csv"'
-        return resp
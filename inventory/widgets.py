@@ -0,0 +1,41 @@
+# inventory/widgets.py
+from django import forms
+from django.urls import reverse
+
+
+class RemoteSelect(forms.Select):
+    """
+    Select untuk ModelChoiceField besar: hanya opsi terpilih yang dirender
+    (satu query by pk), sisanya dicari lewat endpoint JSON ``url_name``
+    (format ``{"results": [{id, label}], "more": bool}``) oleh Tom Select.
+    Waktu render konstan berapa pun ukuran katalog.
+    """
+
+    class Media:
+        css = {"all": ["https://cdn.jsdelivr.net/npm/tom-select@2.3.1/dist/css/tom-select.bootstrap5.min.css"]}
+        js = [
+            "https://cdn.jsdelivr.net/npm/tom-select@2.3.1/dist/js/tom-select.complete.min.js",
+            "inventory/remote_select.js",
+        ]
+
+    def __init__(self, url_name, attrs=None):
+        super().__init__(attrs)
+        self.url_name = url_name
+
+    def get_context(self, name, value, attrs):
+        ctx = super().get_context(name, value, attrs)
+        ctx["widget"]["attrs"]["data-remote-url"] = reverse(self.url_name)
+        return ctx
+
+    def optgroups(self, name, value, attrs=None):
+        field = self.choices.field
+        options = []
+        if field.empty_label is not None:
+            options.append(self.create_option(name, "", field.empty_label, not any(value), 0))
+        selected = [v for v in value if v not in ("", None)]
+        if selected:
+            key = field.to_field_name or "pk"
+            for obj in field.queryset.filter(**{f"{key}__in": selected}):
+                options.append(self.create_option(
+                    name, field.prepare_value(obj), field.label_from_instance(obj), True, len(options)))
+        return [(None, options, 0)]
@@ -0,0 +1,200 @@
+"""
+Instrumentasi SQL per request.
+
+Setiap query di semua koneksi DB dibungkus ``execute_wrapper`` (tidak butuh
+DEBUG=True): dihitung jumlah, total waktu DB, waktu render template dan N
+statement terlambat. Hasilnya dikirim sebagai header ``Server-Timing`` (terbaca
+di tab Network browser) dan satu baris log JSON di logger ``warehouse.sql``.
+Request yang melewati ``SQL_SLOW_REQUEST_MS`` di-sampling (``SQL_SLOW_SAMPLE_RATE``)
+ke logger ``warehouse.sql.slow`` lengkap dengan seluruh SQL-nya.
+
+Overhead per query hanya dua ``perf_counter`` dan satu append; teks SQL disimpan
+sebagai referensi (tanpa format/copy) dan dibuang jika request tidak di-log.
+Catatan: query response streaming (export CSV) terjadi setelah header terkirim,
+jadi tidak ikut terhitung.
+
+Budget query per view: atribut ``query_budget`` pada class-based view (atau
+fungsi view), atau ``QUERY_BUDGETS = {"<view_name>": n}`` di settings untuk view
+yang tidak bisa diberi atribut (admin). Dihitung sejak ``process_view`` sampai
+render template selesai (termasuk query lazy session/user). Jika lewat budget:
+``QueryBudgetExceeded`` dilempar saat ``QUERY_BUDGET_STRICT`` (default = DEBUG,
+nyalakan juga di test), selain itu cukup di-log ke ``warehouse.sql.budget``
+beserta statement yang berulang (indikasi N+1). Request tulis (selain GET/HEAD/
+OPTIONS) selalu hanya di-log: budget dicek sesudah view, perubahannya sudah
+commit, jadi 500 di titik itu cuma memancing user mengulang (posting dobel).
+
+Koneksi DB Django per thread: query yang dijalankan view di thread lain (bagian
+paralel ``inventory.views_async``) hanya terhitung jika fungsinya dibungkus
+``recorded(request, fn)``; ``db_ms`` lalu = jumlah waktu DB semua thread.
+"""
+import heapq
+import json
+import logging
+import random
+import threading
+import time
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger("warehouse.sql")
+slow_logger = logging.getLogger("warehouse.sql.slow")
+budget_logger = logging.getLogger("warehouse.sql.budget")
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+def _view_budget(match):
+    if match is None:
+        return None
+    budgets = getattr(settings, "QUERY_BUDGETS", {})
+    if match.view_name in budgets:
+        return budgets[match.view_name]
+    func = match.func
+    return getattr(getattr(func, "view_class", func), "query_budget", None)
+
+
+class _Recorder:
+    __slots__ = ("count", "db_time", "statements", "max_statements", "lock")
+
+    def __init__(self, max_statements):
+        self.count = 0
+        self.db_time = 0.0
+        self.statements = []  # (detik, alias, sql, params)
+        self.max_statements = max_statements
+        self.lock = threading.Lock()
+
+    @contextmanager
+    def recording(self):
+        """Catat query semua koneksi DB thread pemanggil."""
+        with ExitStack() as stack:
+            for conn in connections.all():
+                stack.enter_context(conn.execute_wrapper(self.wrapper(conn.alias)))
+            yield self
+
+    def merge(self, other):
+        with self.lock:  # beberapa thread bisa selesai bersamaan
+            self.count += other.count
+            self.db_time += other.db_time
+            self.statements.extend(other.statements[:max(0, self.max_statements - len(self.statements))])
+
+    def wrapper(self, alias):
+        def wrap(execute, sql, params, many, context):
+            t0 = time.perf_counter()
+            try:
+                return execute(sql, params, many, context)
+            finally:
+                dur = time.perf_counter() - t0
+                self.count += 1
+                self.db_time += dur
+                if len(self.statements) < self.max_statements:
+                    self.statements.append((dur, alias, sql, params))
+        return wrap
+
+
+def recorded(request, fn):
+    """
+    Bungkus ``fn`` yang akan jalan di thread lain agar query-nya ikut terhitung
+    (log, Server-Timing, budget) di ``request``; tanpa middleware = ``fn`` apa adanya.
+    """
+    parent = getattr(request, "_sql_rec", None)
+    if parent is None:
+        return fn
+
+    def run():
+        rec = _Recorder(parent.max_statements)
+        try:
+            with rec.recording():
+                return fn()
+        finally:
+            parent.merge(rec)
+    return run
+
+
+class SQLInstrumentationMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.enabled = getattr(settings, "SQL_INSTRUMENTATION", True)
+        self.slow_ms = getattr(settings, "SQL_SLOW_REQUEST_MS", 500)
+        self.sample_rate = getattr(settings, "SQL_SLOW_SAMPLE_RATE", 0.1)
+        self.top_n = getattr(settings, "SQL_TOP_STATEMENTS", 3)
+        self.max_statements = getattr(settings, "SQL_MAX_RECORDED_STATEMENTS", 1000)
+        self.strict = getattr(settings, "QUERY_BUDGET_STRICT", settings.DEBUG)
+
+    def __call__(self, request):
+        if not self.enabled:
+            return self.get_response(request)
+        rec = _Recorder(self.max_statements)
+        request._sql_rec = rec
+        request._sql_view_start = None
+        request._sql_render = [None, 0.0]
+        t0 = time.perf_counter()
+        with rec.recording():
+            response = self.get_response(request)
+        total = time.perf_counter() - t0
+        self._report(request, response, rec, total)
+        self._check_budget(request, rec)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        rec = getattr(request, "_sql_rec", None)
+        if rec is not None:
+            request._sql_view_start = rec.count
+
+    def process_template_response(self, request, response):
+        # dipanggil tepat sebelum render(); callback post-render menutup pengukuran
+        marker = getattr(request, "_sql_render", None)
+        if marker is not None:
+            marker[0] = time.perf_counter()
+
+            def done(resp):
+                marker[1] += time.perf_counter() - marker[0]
+            response.add_post_render_callback(done)
+        return response
+
+    def _report(self, request, response, rec, total):
+        render = request._sql_render[1]
+        top = heapq.nlargest(self.top_n, rec.statements, key=lambda s: s[0])
+        response["Server-Timing"] = ", ".join([
+            f'db;dur={rec.db_time * 1000:.1f};desc="{rec.count} queries"',
+            f"tpl;dur={render * 1000:.1f}",
+            f"total;dur={total * 1000:.1f}",
+        ])
+        match = getattr(request, "resolver_match", None)
+        record = {
+            "method": request.method,
+            "path": request.path,
+            "view": match.view_name if match else None,
+            "status": response.status_code,
+            "total_ms": round(total * 1000, 1),
+            "db_ms": round(rec.db_time * 1000, 1),
+            "template_ms": round(render * 1000, 1),
+            "queries": rec.count,
+            "slowest": [{"ms": round(d * 1000, 1), "db": a, "sql": sql[:300]} for d, a, sql, _ in top],
+        }
+        logger.info(json.dumps(record))
+        if total * 1000 >= self.slow_ms and random.random() < self.sample_rate:
+            record["statements"] = [
+                {"ms": round(d * 1000, 2), "db": a, "sql": sql, "params": repr(params)}
+                for d, a, sql, params in rec.statements
+            ]
+            slow_logger.warning(json.dumps(record))
+
+    def _check_budget(self, request, rec):
+        start = request._sql_view_start
+        budget = _view_budget(getattr(request, "resolver_match", None))
+        if budget is None or start is None:
+            return
+        used = rec.count - start
+        if used <= budget:
+            return
+        repeated = [(n, sql) for sql, n in Counter(s[2] for s in rec.statements).most_common(3) if n > 1]
+        msg = (f"{request.resolver_match.view_name}: {used} query melebihi budget {budget}"
+               + "".join(f"\n  {n}x {sql[:200]}" for n, sql in repeated))
+        if self.strict and request.method in ("GET", "HEAD", "OPTIONS"):
+            raise QueryBudgetExceeded(msg)
+        budget_logger.warning(msg)
@@ -0,0 +1,172 @@
+"""
+Baca dari replica untuk laporan, export dan halaman daftar.
+
+``ReplicaRouter`` mengarahkan query baca model app di ``REPLICA_APPS`` ke alias
+yang sedang aktif (``READ_REPLICA``), selain itu ke primary; tulis selalu ke
+primary (juga untuk instance yang dibaca dari replica). Auth/session tidak pernah
+ke replica: sesi yang baru login belum tentu sudah tereplikasi.
+
+Aktif hanya per request lewat opt-in view: atribut ``read_replica = True`` pada
+class-based view (seperti ``query_budget``) + method GET/HEAD. ``ReplicaMiddleware``
+memilih alias sebelum view jalan dan mempertahankannya selama response streaming
+(export CSV) dikonsumsi. Replica dipakai jika:
+
+- alias ``READ_REPLICA`` ada di ``DATABASES``;
+- lag replica <= ``REPLICA_LAG_TOLERANCE`` detik (dicek paling sering sekali per
+  ``REPLICA_LAG_CHECK_INTERVAL`` per proses; replica tidak terjangkau = primary);
+- browser ini tidak menulis dalam ``REPLICA_LAG_TOLERANCE`` detik terakhir:
+  setiap request non-GET memasang cookie ``REPLICA_PIN_COOKIE`` sehingga baca
+  sesudah tulis milik sendiri tetap di primary sampai replica pasti menyusul.
+
+Uji lokal: alias kedua ke database yang sama (``DB_REPLICA_HOST``/``DB_REPLICA_NAME``
+= nilai primary), query-nya terlihat dengan ``"db": "replica"`` di log ``warehouse.sql``.
+Raw SQL lewat ``django.db.connection`` tetap ke primary; kode baca yang memakai
+raw SQL mengambil koneksi dari ``router.db_for_read(Model)``.
+"""
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+from django.urls import Resolver404, resolve
+
+_active = ContextVar("read_replica", default=None)
+SAFE_METHODS = ("GET", "HEAD")
+UNREACHABLE = -1.0
+
+
+def replica_alias():
+    alias = getattr(settings, "READ_REPLICA", "replica")
+    return alias if alias in connections.databases else None
+
+
+def lag_tolerance():
+    return float(getattr(settings, "REPLICA_LAG_TOLERANCE", 5))
+
+
+def pin_cookie():
+    return getattr(settings, "REPLICA_PIN_COOKIE", "primary_pin")
+
+
+# ------------- kesehatan -------------
+def measure_lag(alias):
+    """Lag replay ``alias`` dalam detik (0 jika bukan standby / sudah menyusul); ``UNREACHABLE`` jika gagal."""
+    try:
+        with connections[alias].cursor() as cur:
+            # receive == replay: semua WAL yang diterima sudah diterapkan -> jangan pakai umur transaksi
+            # terakhir (primary yang sepi membuat replay_timestamp tua padahal tidak tertinggal)
+            cur.execute(
+                "SELECT CASE WHEN NOT pg_is_in_recovery() THEN 0 "
+                "WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+                "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END::float8")
+            return cur.fetchone()[0]
+    except DatabaseError:
+        return UNREACHABLE
+
+
+def replica_lag(alias):
+    """``measure_lag`` yang di-cache ``REPLICA_LAG_CHECK_INTERVAL`` detik."""
+    key = f"warehouse:replica_lag:{alias}"
+    lag = cache.get(key)
+    if lag is None:
+        lag = measure_lag(alias)
+        cache.set(key, lag, getattr(settings, "REPLICA_LAG_CHECK_INTERVAL", 5))
+    return lag
+
+
+def choose(last_write=None):
+    """Alias replica untuk dibaca sekarang, atau None (pakai primary)."""
+    alias = replica_alias()
+    if alias is None:
+        return None
+    tolerance = lag_tolerance()
+    if last_write is not None and time.time() - last_write < tolerance:
+        return None
+    lag = replica_lag(alias)
+    return alias if 0 <= lag <= tolerance else None
+
+
+# ------------- aktivasi -------------
+@contextmanager
+def reading(alias):
+    """Baca model ``REPLICA_APPS`` dari ``alias`` di dalam blok ini (None = primary)."""
+    token = _active.set(alias)
+    try:
+        yield alias
+    finally:
+        _active.reset(token)
+
+
+def streaming(content, alias):
+    """Bungkus ``streaming_content``: query yang jalan saat chunk dibuat tetap ke ``alias``."""
+    it = iter(content)
+    while True:
+        with reading(alias):
+            try:
+                chunk = next(it)
+            except StopIteration:
+                return
+        yield chunk
+
+
+class ReplicaRouter:
+    def _apps(self):
+        return getattr(settings, "REPLICA_APPS", ("inventory",))
+
+    def db_for_read(self, model, **hints):
+        alias = _active.get()
+        if alias and model._meta.app_label in self._apps():
+            return alias
+        return None
+
+    def db_for_write(self, model, **hints):
+        # eksplisit: tanpa ini Django menulis ke alias asal instance (replica)
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        dbs = {DEFAULT_DB_ALIAS, replica_alias()}
+        return obj1._state.db in dbs and obj2._state.db in dbs or None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return False if db == replica_alias() else None
+
+
+# ------------- middleware -------------
+def _last_write(request):
+    try:
+        return float(request.COOKIES.get(pin_cookie(), ""))
+    except ValueError:
+        return None
+
+
+class ReplicaMiddleware:
+    """Opt-in view -> baca dari replica selama request (dan streaming response-nya); tulis -> pin ke primary."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        # dipilih sebelum view (di luar hitungan query_budget): cek lag & koneksi baru ke replica
+        # adalah biaya infrastruktur, bukan query view
+        request._replica = alias = self._choose(request)
+        with reading(alias):
+            response = self.get_response(request)
+        if alias and response.streaming:
+            response.streaming_content = streaming(response.streaming_content, alias)
+        if request.method not in SAFE_METHODS and replica_alias():
+            response.set_cookie(pin_cookie(), f"{time.time():.3f}", max_age=int(lag_tolerance()) + 1,
+                                httponly=True, samesite="Lax")
+        return response
+
+    def _choose(self, request):
+        if request.method not in SAFE_METHODS or replica_alias() is None:
+            return None
+        try:
+            func = resolve(request.path_info, getattr(request, "urlconf", None)).func
+        except Resolver404:
+            return None
+        if not getattr(getattr(func, "view_class", func), "read_replica", False):
+            return None
+        return choose(_last_write(request))
@@ -10,13 +10,16 @@ DEBUG = os.getenv('DJANGO_DEBUG', 'False').lower() == 'true'
 ALLOWED_HOSTS = ['*']
 
 INSTALLED_APPS = [
-    'django.contrib.admin','django.contrib.auth','django.contrib.contenttypes','django.contrib.sessions','django.contrib.messages','django.contrib.staticfiles',
-    'unfold','unfold.contrib.filters','inventory',
+    # unfold harus sebelum django.contrib.admin (mengganti admin.site sebelum autodiscover)
+    'unfold','unfold.contrib.filters',
+    'django.contrib.admin','django.contrib.auth','django.contrib.contenttypes','django.contrib.sessions','django.contrib.messages','django.contrib.staticfiles','django.contrib.postgres',
+    'inventory',
     "crispy_forms",
     "crispy_bootstrap5",
 ]
 MIDDLEWARE = [
-  'django.middleware.security.SecurityMiddleware','django.contrib.sessions.middleware.SessionMiddleware','django.middleware.common.CommonMiddleware','django.middleware.csrf.CsrfViewMiddleware','django.contrib.auth.middleware.AuthenticationMiddleware','django.contrib.messages.middleware.MessageMiddleware','django.middleware.clickjacking.XFrameOptionsMiddleware'
+  'warehouse.middleware.SQLInstrumentationMiddleware',
+  'django.middleware.security.SecurityMiddleware','django.contrib.sessions.middleware.SessionMiddleware','django.middleware.common.CommonMiddleware','django.middleware.csrf.CsrfViewMiddleware','django.contrib.auth.middleware.AuthenticationMiddleware','warehouse.replica.ReplicaMiddleware','django.contrib.messages.middleware.MessageMiddleware','django.middleware.clickjacking.XFrameOptionsMiddleware'
 ]
 ROOT_URLCONF='warehouse.urls'
 TEMPLATES=[{
@@ -24,7 +27,20 @@ TEMPLATES=[{
  'OPTIONS':{'context_processors':['django.template.context_processors.debug','django.template.context_processors.request','django.contrib.auth.context_processors.auth','django.contrib.messages.context_processors.messages']}}
 ]
 WSGI_APPLICATION='warehouse.wsgi.application'
-DATABASES={'default':{'ENGINE':'django.db.backends.postgresql','NAME':os.getenv('DB_NAME'),'USER':os.getenv('DB_USER'),'PASSWORD':os.getenv('DB_PASSWORD'),'HOST':os.getenv('DB_HOST','127.0.0.1'),'PORT':os.getenv('DB_PORT','5432')}}
+# koneksi persisten: thread pool view async (inventory/views_async.py) memakai ulang koneksi per thread
+# alih-alih connect baru per bagian ringkasan; 0 = tutup di akhir request/bagian
+DATABASES={'default':{'ENGINE':'django.db.backends.postgresql','NAME':os.getenv('DB_NAME'),'USER':os.getenv('DB_USER'),'PASSWORD':os.getenv('DB_PASSWORD'),'HOST':os.getenv('DB_HOST','127.0.0.1'),'PORT':os.getenv('DB_PORT','5432'),
+    'CONN_MAX_AGE':int(os.getenv('DB_CONN_MAX_AGE','60')),'CONN_HEALTH_CHECKS':True}}
+# replica baca (opsional) untuk laporan/export/daftar (warehouse/replica.py); nilai yang tidak diisi ikut primary,
+# jadi DB_REPLICA_HOST=<host primary> = alias kedua ke database yang sama (uji lokal)
+if os.getenv('DB_REPLICA_HOST') or os.getenv('DB_REPLICA_NAME'):
+    DATABASES['replica']={**DATABASES['default'],
+        **{k:os.getenv(f'DB_REPLICA_{k}') for k in ('NAME','USER','PASSWORD','HOST','PORT') if os.getenv(f'DB_REPLICA_{k}')},
+        'TEST':{'MIRROR':'default'}}
+DATABASE_ROUTERS=['warehouse.replica.ReplicaRouter']
+READ_REPLICA='replica'
+# detik: lag replica maksimum yang diterima, sekaligus lama baca di-pin ke primary sesudah browser menulis
+REPLICA_LAG_TOLERANCE=float(os.getenv('REPLICA_LAG_TOLERANCE','5'))
 AUTH_PASSWORD_VALIDATORS=[]
 LANGUAGE_CODE='id'
 TIME_ZONE='Asia/Jakarta'
@@ -38,3 +54,30 @@ LOGOUT_REDIRECT_URL='login'
 UNFOLD={'SITE_HEADER':'Single Warehouse'}
 CRISPY_ALLOWED_TEMPLATE_PACKS = "bootstrap5"
 CRISPY_TEMPLATE_PACK = "bootstrap5"
+# file hasil export background (command export_worker)
+EXPORT_ROOT = Path(os.getenv('EXPORT_ROOT', BASE_DIR/'exports'))
+# cache hasil ringkasan stok per filter (detik); invalidasi lewat versi ledger (inventory/summary_cache.py)
+SUMMARY_CACHE_TIMEOUT = int(os.getenv('SUMMARY_CACHE_TIMEOUT', '600'))
+
+# instrumentasi SQL per request (warehouse/middleware.py)
+SQL_INSTRUMENTATION = os.getenv('SQL_INSTRUMENTATION', 'True').lower() == 'true'
+SQL_SLOW_REQUEST_MS = float(os.getenv('SQL_SLOW_REQUEST_MS', '500'))
+SQL_SLOW_SAMPLE_RATE = float(os.getenv('SQL_SLOW_SAMPLE_RATE', '0.1'))
+# lewat budget: raise saat DEBUG/test, selain itu log warning (view: atribut query_budget)
+QUERY_BUDGET_STRICT = os.getenv('QUERY_BUDGET_STRICT', str(DEBUG)).lower() == 'true'
+QUERY_BUDGETS = {
+    'admin:inventory_product_changelist': 6,
+    'admin:inventory_transaction_changelist': 8,
+    'admin:inventory_category_changelist': 5,
+    'admin:inventory_uom_changelist': 5,
+    'admin:inventory_product_change': 6,
+    'admin:inventory_transaction_change': 6,
+}
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {'console': {'class': 'logging.StreamHandler'}},
+    'loggers': {
+        'warehouse.sql': {'handlers': ['console'], 'level': os.getenv('SQL_LOG_LEVEL', 'INFO'), 'propagate': False},
+    },
+}